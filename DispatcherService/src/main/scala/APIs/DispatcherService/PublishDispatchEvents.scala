@@ -0,0 +1,64 @@
+package APIs.DispatcherService
+
+import Common.API.API
+import Global.ServiceCenter.DispatcherServiceCode
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+import Objects.DispatcherService.DispatchEvent
+
+/**
+ * PublishDispatchEvents
+ * desc: 向调度服务推送一批状态变更事件，调度服务据此增量维护待分配订单与空闲骑手队列，并立即触发一轮分配
+ * @param events: DispatchEvent (状态变更事件列表)
+ * @return successOrNot: String (接收成功与否)
+ */
+
+case class PublishDispatchEvents(
+  events: List[DispatchEvent]
+) extends API[String](DispatcherServiceCode)
+
+
+
+case object PublishDispatchEvents{
+
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[PublishDispatchEvents] = deriveEncoder
+  private val circeDecoder: Decoder[PublishDispatchEvents] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[PublishDispatchEvents] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[PublishDispatchEvents] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[PublishDispatchEvents]() {})) }
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+
+  // Circe + Jackson 兜底的 Encoder
+  given publishDispatchEventsEncoder: Encoder[PublishDispatchEvents] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given publishDispatchEventsDecoder: Decoder[PublishDispatchEvents] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+}
+
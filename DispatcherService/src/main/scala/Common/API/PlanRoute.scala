@@ -0,0 +1,25 @@
+package Common.API
+
+import cats.effect.IO
+import io.circe.generic.auto.*
+import io.circe.syntax.*
+import io.circe.{Decoder, Encoder, Json, JsonObject}
+
+/**
+ * Routes 路由表中的一项：把已解析的请求体直接解码为 planner 并执行，返回结果的 JSON。
+ * 请求体只在读取时解析一次，planContext 直接写入解析后的 JSON 对象，不再经过字符串往返。
+ */
+trait PlanRoute {
+  def run(messageType: String, body: JsonObject, planContext: PlanContext): IO[Json]
+}
+
+object PlanRoute {
+  def apply[P <: Planner[R], R](using decoder: Decoder[P], encoder: Encoder[R]): PlanRoute =
+    new PlanRoute {
+      def run(messageType: String, body: JsonObject, planContext: PlanContext): IO[Json] =
+        decoder.decodeJson(Json.fromJsonObject(body.add("planContext", planContext.asJson))) match {
+          case Left(err) => IO.raiseError(new Exception(s"Invalid JSON for ${messageType}[${err.getMessage}]"))
+          case Right(planner) => planner.fullPlan(using encoder).map(encoder(_))
+        }
+    }
+}
@@ -0,0 +1,81 @@
+package Common.DBAPI
+
+import Common.API.PlanContext
+import Common.Object.SqlParameter
+import cats.effect.IO
+import cats.implicits.*
+import org.slf4j.LoggerFactory
+
+/**
+ * 声明式的二级索引定义，由各服务在 Process/Init 中列出，交给 ensureIndexes 建立或迁移。
+ * @param name      索引名（同一 schema 内唯一）
+ * @param table     表名
+ * @param columns   索引列表达式，例如 "customer_id, order_time DESC" 或 "name gin_trgm_ops"
+ * @param method    索引方法，默认 btree，三元组索引使用 gin
+ * @param unique    是否唯一索引
+ * @param extension 建索引前需要的扩展（例如 pg_trgm），扩展不可用时跳过该索引
+ */
+case class IndexDefinition(
+                            name: String,
+                            table: String,
+                            columns: String,
+                            method: String = "btree",
+                            unique: Boolean = false,
+                            extension: Option[String] = None
+                          ) {
+  def createSql(schemaName: String): String =
+    s"""CREATE ${if (unique) "UNIQUE " else ""}INDEX CONCURRENTLY IF NOT EXISTS "${name}" ON "${schemaName}"."${table}" USING ${method} (${columns})"""
+}
+
+case object IndexDefinition {
+  private val logger = LoggerFactory.getLogger(getClass)
+
+  /**
+   * 建立缺失的索引，同时作为已有 schema 的迁移路径：
+   * 1. 使用 CREATE INDEX CONCURRENTLY，对已有数据的大表建索引时不阻塞读写；
+   * 2. 之前并发建索引中断会留下 INVALID 索引，IF NOT EXISTS 会直接跳过它，因此先检测并删掉重建；
+   * 3. 单个索引失败只记录日志，不影响服务启动。
+   * CONCURRENTLY 不能在事务中执行，调用方不要放进 startTransaction。
+   */
+  def ensureIndexes(schemaName: String, indexes: List[IndexDefinition])(using PlanContext): IO[Unit] =
+    indexes.traverse_(index => ensureIndex(schemaName, index).handleErrorWith(err =>
+      IO(logger.warn(s"[ensureIndexes] 索引 ${index.name} 建立失败，跳过：${err.getMessage}"))
+    ))
+
+  private def ensureIndex(schemaName: String, index: IndexDefinition)(using PlanContext): IO[Unit] =
+    for {
+      _ <- index.extension.traverse_(ext => writeDB(s"CREATE EXTENSION IF NOT EXISTS ${ext}", List()))
+      valid <- indexValidity(schemaName, index.name)
+      _ <- valid match {
+        case Some(true) =>
+          IO.unit
+        case Some(false) =>
+          IO(logger.warn(s"[ensureIndexes] 发现无效索引 ${index.name}，删除后重建")) >>
+            writeDB(s"""DROP INDEX CONCURRENTLY IF EXISTS "${schemaName}"."${index.name}"""", List()) >>
+            create(schemaName, index)
+        case None =>
+          create(schemaName, index)
+      }
+    } yield ()
+
+  private def create(schemaName: String, index: IndexDefinition)(using PlanContext): IO[Unit] =
+    for {
+      _ <- IO(logger.info(s"[ensureIndexes] 建立索引 ${index.name} ON ${index.table} (${index.columns})"))
+      startMillis <- IO(System.currentTimeMillis())
+      _ <- writeDB(index.createSql(schemaName), List())
+      _ <- IO(logger.info(s"[ensureIndexes] 索引 ${index.name} 建立完成，用时 ${System.currentTimeMillis() - startMillis} ms"))
+    } yield ()
+
+  /** 返回索引是否有效；索引不存在时返回 None */
+  private def indexValidity(schemaName: String, indexName: String)(using PlanContext): IO[Option[Boolean]] =
+    readDBRows(
+      """
+        SELECT i.indisvalid
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_index i ON i.indexrelid = c.oid
+        WHERE n.nspname = ? AND c.relname = ?
+      """,
+      List(SqlParameter("String", schemaName), SqlParameter("String", indexName))
+    ).map(_.headOption.map(row => decodeField[Boolean](row, "indisvalid")))
+}
@@ -0,0 +1,99 @@
+package Common
+
+import Common.API.{ClientPool, TraceID}
+import cats.effect.IO
+
+import java.util.concurrent.atomic.{AtomicLongArray, LongAdder}
+import scala.collection.concurrent.TrieMap
+import scala.concurrent.duration.FiniteDuration
+
+/**
+ * 进程内的延迟直方图，按 (kind, name) 分组：
+ *  - route: 本服务收到的 /api/<name> 请求（Routes.executePlan）
+ *  - send:  本服务发往其他服务的 API 调用，name 为 "<目标服务>/<消息名>"
+ *  - db:    发往 db-manager 的消息，name 为消息类型
+ * 每组额外保留最慢的几次调用及其 TraceID，用来在日志里定位具体请求。
+ * 通过 GET /metrics 以 Prometheus 文本格式导出，同时附上各目标服务连接池的占用情况（见 ClientPool）。
+ */
+object Metrics {
+  val Route = "route"
+  val Send = "send"
+  val DB = "db"
+
+  /** 直方图桶上界（毫秒），最后还有一个 +Inf 桶 */
+  val bucketBoundsMillis: Vector[Double] = Vector(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+  private val slowestKept = 3
+
+  final class Histogram {
+    private val buckets = new AtomicLongArray(bucketBoundsMillis.size + 1)
+    private val count = new LongAdder
+    private val errors = new LongAdder
+    private val sumMicros = new LongAdder
+    /** 按耗时降序的最慢调用 (毫秒, TraceID) */
+    private var slowest: List[(Double, String)] = Nil
+
+    def record(millis: Double, traceID: TraceID, failed: Boolean): Unit = {
+      val bucket = bucketBoundsMillis.indexWhere(millis <= _) match {
+        case -1 => bucketBoundsMillis.size
+        case index => index
+      }
+      buckets.incrementAndGet(bucket)
+      count.increment()
+      sumMicros.add((millis * 1000).toLong)
+      if (failed) errors.increment()
+      synchronized {
+        if (slowest.size < slowestKept || millis > slowest.last._1)
+          slowest = ((millis, traceID.id) :: slowest).sortBy(-_._1).take(slowestKept)
+      }
+    }
+
+    def render(labels: String, out: StringBuilder): Unit = {
+      var cumulative = 0L
+      bucketBoundsMillis.indices.foreach { i =>
+        cumulative += buckets.get(i)
+        out.append(s"""etuan_latency_milliseconds_bucket{${labels},le="${bucketBoundsMillis(i)}"} ${cumulative}\n""")
+      }
+      cumulative += buckets.get(bucketBoundsMillis.size)
+      out.append(s"""etuan_latency_milliseconds_bucket{${labels},le="+Inf"} ${cumulative}\n""")
+      out.append(s"etuan_latency_milliseconds_sum{${labels}} ${sumMicros.sum() / 1000.0}\n")
+      out.append(s"etuan_latency_milliseconds_count{${labels}} ${count.sum()}\n")
+      out.append(s"etuan_errors_total{${labels}} ${errors.sum()}\n")
+      synchronized(slowest).zipWithIndex.foreach { case ((millis, traceID), rank) =>
+        out.append(s"""etuan_slowest_milliseconds{${labels},rank="${rank + 1}",trace_id="${escape(traceID)}"} ${millis}\n""")
+      }
+    }
+  }
+
+  private val histograms: TrieMap[(String, String), Histogram] = TrieMap.empty
+
+  def record(kind: String, name: String, elapsed: FiniteDuration, traceID: TraceID, failed: Boolean): Unit =
+    histograms.getOrElseUpdate(kind -> name, new Histogram).record(elapsed.toNanos / 1e6, traceID, failed)
+
+  /** 计时执行 io，无论成功、失败还是被取消都会记录一次 */
+  def time[A](kind: String, name: String, traceID: TraceID)(io: IO[A]): IO[A] =
+    IO.monotonic.flatMap { start =>
+      io.guaranteeCase { outcome =>
+        IO.monotonic.map(end => record(kind, name, end - start, traceID, !outcome.isSuccess))
+      }
+    }
+
+  /** Prometheus 文本格式 */
+  def render: String = {
+    val out = new StringBuilder
+    out.append("# TYPE etuan_latency_milliseconds histogram\n")
+    out.append("# TYPE etuan_errors_total counter\n")
+    out.append("# TYPE etuan_slowest_milliseconds gauge\n")
+    histograms.toList.sortBy(_._1).foreach { case ((kind, name), histogram) =>
+      histogram.render(s"""kind="${kind}",name="${escape(name)}"""", out)
+    }
+    out.toString
+  }
+
+  def reset(): Unit = {
+    histograms.clear()
+    ClientPool.reset()
+  }
+
+  private def escape(value: String): String =
+    value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+}
@@ -1,5 +1,6 @@
 package Common.Serialize
 
+import Common.Logging
 import Common.Object.IDClass
 import cats.syntax.traverse.*
 import io.circe.parser.parse
@@ -48,7 +49,7 @@ object CustomColumnTypes {
 
   given genericDecoder[T <: CirceSerializable](using baseDecoder: Decoder[T]): Decoder[T] = new Decoder[T] {
     final def apply(c: HCursor): Decoder.Result[T] = {
-      println(c.value) // Debugging: print the JSON value being decoded
+      Logging.payloadUnsafe(c.value.toString) // Debugging: print the JSON value being decoded
       c.value match {
         case jsonObject if jsonObject.isObject =>
           baseDecoder(c)
@@ -58,7 +59,7 @@ object CustomColumnTypes {
           jsonString.as[String].flatMap { str =>
             parse(str) match {
               case Right(parsedJson) =>
-                println(parsedJson) // Debugging: print the parsed JSON
+                Logging.payloadUnsafe(parsedJson.toString) // Debugging: print the parsed JSON
                 parsedJson.as[T](baseDecoder) // Pass the base decoder explicitly
               case Left(err) =>
                 Left(DecodingFailure(s"Failed to parse stringified JSON: ${err.getMessage}", c.history))
@@ -0,0 +1,143 @@
+package Common
+
+import Common.API.PlanContext
+import Global.{GlobalVariables, ServiceCenter}
+import cats.effect.unsafe.IORuntime
+import cats.effect.{IO, IOLocal, Outcome}
+import io.circe.Json
+import io.circe.syntax.*
+import org.slf4j.LoggerFactory
+
+import java.nio.charset.StandardCharsets
+import java.nio.file.{Files, Path, Paths, StandardOpenOption}
+import java.util.UUID
+import java.util.concurrent.ConcurrentLinkedQueue
+import java.util.concurrent.atomic.AtomicInteger
+import scala.concurrent.duration.*
+
+/** 当前所在的 span：traceID 为整条调用链的 ID（入口请求的 TraceID），spanID 为该 span 自己的 ID */
+case class SpanContext(traceID: String, spanID: String)
+
+/** 一个已结束的 span，时间单位为微秒；localTraceID 为本服务给该请求分配的 TraceID，与日志中的一致 */
+case class Span(
+                 traceID: String,
+                 spanID: String,
+                 parentSpanID: Option[String],
+                 service: String,
+                 kind: String,
+                 name: String,
+                 localTraceID: String,
+                 startMicros: Long,
+                 durationMicros: Long,
+                 error: Option[String]
+               )
+
+/**
+ * 调用链记录：在 planner、planner 步骤、服务间调用和 db-manager 消息外包一层 span，
+ * 通过请求头 X-Trace-ID / X-Parent-Span-ID 把调用链延续到下游服务。
+ * 配置了 spanExportPath 时，span 以 JSON Lines 的形式每秒追加写入 <spanExportPath>/<服务名>.jsonl，
+ * 由 backend-test/trace_report.py 还原调用树和关键路径；未配置时只传播调用链，不记录。
+ */
+object Tracing {
+  val Route = "route"
+  val Plan = "plan"
+  val Step = "step"
+
+  val TraceHeader = "X-Trace-ID"
+  val ParentSpanHeader = "X-Parent-Span-ID"
+
+  /** 待写出的 span 上限，写盘跟不上时丢弃新的 span，不让内存无限增长 */
+  private val MaxPending = 100000
+
+  private val logger = LoggerFactory.getLogger(getClass)
+
+  private val current: IOLocal[Option[SpanContext]] =
+    IOLocal(Option.empty[SpanContext]).unsafeRunSync()(using IORuntime.global)
+
+  private val pending = new ConcurrentLinkedQueue[Span]()
+  private val pendingCount = new AtomicInteger(0)
+  @volatile private var exportFile: Option[Path] = None
+
+  val serviceName: String = ServiceCenter.fullNameMap.get(GlobalVariables.serviceCode)
+    .map(_.takeWhile(_ != '（')).getOrElse(GlobalVariables.serviceCode)
+
+  /** 启动时调用：配置了导出目录时开启记录，并启动定期写盘的后台 fiber */
+  def init(spanExportPath: Option[String]): IO[Unit] = spanExportPath match {
+    case None => IO.unit
+    case Some(dir) =>
+      IO.blocking {
+        val directory = Paths.get(dir)
+        Files.createDirectories(directory)
+        exportFile = Some(directory.resolve(s"${serviceName}.jsonl"))
+        logger.info(s"[Tracing] span 导出到 ${exportFile.get.toAbsolutePath}")
+      } >> (IO.sleep(1.second) >> flush()).foreverM.start.void
+  }
+
+  /** 在一个新的 span 中执行 io，父 span 为当前 span；没有当前 span 时以 PlanContext 的 TraceID 开启新的调用链 */
+  def span[A](kind: String, name: String)(io: IO[A])(using context: PlanContext): IO[A] =
+    current.get.flatMap { parent =>
+      val spanContext = SpanContext(parent.map(_.traceID).getOrElse(context.traceID.id), newSpanID())
+      for {
+        startMicros <- IO.realTime.map(_.toMicros)
+        startNanos <- IO.monotonic
+        result <- (current.set(Some(spanContext)) >> io).guaranteeCase { outcome =>
+          val error = outcome match {
+            case Outcome.Succeeded(_) => None
+            case Outcome.Errored(e) => Some(String.valueOf(e.getMessage))
+            case Outcome.Canceled() => Some("canceled")
+          }
+          current.set(parent) >> IO.monotonic.map { endNanos =>
+            record(Span(spanContext.traceID, spanContext.spanID, parent.map(_.spanID), serviceName, kind, name,
+              context.traceID.id, startMicros, (endNanos - startNanos).toMicros, error))
+          }
+        }
+      } yield result
+    }
+
+  /** 入口请求：延续上游传来的调用链，没有上游时 io 中的第一个 span 会开启新的调用链 */
+  def continueFrom[A](traceID: Option[String], parentSpanID: Option[String])(io: IO[A]): IO[A] =
+    (traceID, parentSpanID) match {
+      case (Some(trace), Some(parent)) =>
+        current.get.flatMap(previous => (current.set(Some(SpanContext(trace, parent))) >> io).guarantee(current.set(previous)))
+      case _ => io
+    }
+
+  /** 发往下游服务的请求头 */
+  def propagationHeaders: IO[List[(String, String)]] =
+    current.get.map(_.toList.flatMap(c => List(TraceHeader -> c.traceID, ParentSpanHeader -> c.spanID)))
+
+  private def newSpanID(): String = UUID.randomUUID().toString.replace("-", "").take(16)
+
+  private def record(span: Span): Unit =
+    if (exportFile.isDefined && pendingCount.get < MaxPending) {
+      pending.add(span)
+      pendingCount.incrementAndGet()
+    }
+
+  private def flush(): IO[Unit] = IO.blocking {
+    exportFile.foreach { file =>
+      val lines = new StringBuilder
+      var span = pending.poll()
+      while (span != null) {
+        pendingCount.decrementAndGet()
+        lines.append(toJson(span).noSpaces).append('\n')
+        span = pending.poll()
+      }
+      if (lines.nonEmpty)
+        Files.write(file, lines.toString.getBytes(StandardCharsets.UTF_8), StandardOpenOption.CREATE, StandardOpenOption.APPEND)
+    }
+  }.handleErrorWith(e => IO(logger.warn(s"[Tracing] 写出 span 失败：${e.getMessage}")))
+
+  private def toJson(span: Span): Json = Json.obj(
+    "traceID" -> span.traceID.asJson,
+    "spanID" -> span.spanID.asJson,
+    "parentSpanID" -> span.parentSpanID.asJson,
+    "service" -> span.service.asJson,
+    "kind" -> span.kind.asJson,
+    "name" -> span.name.asJson,
+    "localTraceID" -> span.localTraceID.asJson,
+    "startMicros" -> span.startMicros.asJson,
+    "durationMicros" -> span.durationMicros.asJson,
+    "error" -> span.error.asJson
+  )
+}
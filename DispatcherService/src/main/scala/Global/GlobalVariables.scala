@@ -1,11 +1,19 @@
 package Global
 
 import Global.ServiceCenter.*
+import Utils.{AssignMode, GreedyNearestStrategy, MatchingStrategy}
 
 
 object GlobalVariables {
   lazy val serviceCode : String = DispatcherServiceCode
   val projectIDLength:Int=20
   var isTest:Boolean=false
+  /** 订单分配模式与逐单分配时的最大并发数，启动时由 ServerConfig 覆盖 */
+  var assignMode:AssignMode=AssignMode.Batch
+  var assignParallelism:Int=16
+  /** 骑手匹配策略，启动时由 ServerConfig 覆盖 */
+  var matchingStrategy:MatchingStrategy=GreedyNearestStrategy
+  /** 是否使用事件维护的内存队列，关闭后每轮都全量查询未分配订单与空闲骑手 */
+  var eventDrivenDispatch:Boolean=true
 
 }
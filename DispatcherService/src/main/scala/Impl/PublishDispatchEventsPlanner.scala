@@ -0,0 +1,32 @@
+package Impl
+
+
+import Objects.DispatcherService.DispatchEvent
+import Utils.{DispatchQueue, OrderAssignProcess}
+import Common.API.{PlanContext, Planner}
+import cats.effect.IO
+import Common.TraceLogger
+import io.circe._
+import io.circe.syntax._
+import io.circe.generic.auto._
+import cats.implicits.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+case class PublishDispatchEventsPlanner(
+    events: List[DispatchEvent],
+    override val planContext: PlanContext
+) extends Planner[String] {
+
+  private val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  override def plan(using PlanContext): IO[String] = {
+    for {
+      // Step 1: 按到达顺序把事件应用到内存队列
+      _ <- IO(logger.info(s"收到 ${events.size} 个调度事件"))
+      becameAssignable <- IO(events.map(DispatchQueue.applyEvent).exists(identity))
+
+      // Step 2: 出现新的待分配订单或空闲骑手时立即触发一轮分配（不等待分配完成）
+      _ <- if (becameAssignable && DispatchQueue.hasWork) OrderAssignProcess.requestAssign() else IO.unit
+    } yield "Success"
+  }
+}
@@ -11,6 +11,7 @@ import java.util.UUID
 import Global.DBConfig
 import Process.ProcessUtils.server2DB
 import Global.GlobalVariables
+import scala.concurrent.duration.*
 
 object Init {
   def init(config: ServerConfig): IO[Unit] = {
@@ -19,10 +20,22 @@ object Init {
 
     val program: IO[Unit] = for {
       _ <- IO(GlobalVariables.isTest=config.isTest)
-      _ <- API.init(config.maximumClientConnection)
+      _ <- Common.Tracing.init(config.spanExportPath)
+      _ <- Common.Logging.init(config.productionLogging, config.payloadLogSampleRate)
+      _ <- IO(config.elideReadOnlyTransactions.foreach(Common.API.Planner.elideReadOnlyTransactions = _))
+      _ <- IO(config.assignMode.foreach(mode => GlobalVariables.assignMode = Utils.AssignMode.fromString(mode)))
+      _ <- IO(config.assignParallelism.foreach(GlobalVariables.assignParallelism = _))
+      _ <- IO(config.matchingStrategy.foreach(name => GlobalVariables.matchingStrategy = Utils.MatchingStrategy.fromString(name)))
+      _ <- IO(config.eventDrivenDispatch.foreach(GlobalVariables.eventDrivenDispatch = _))
       _ <- Common.DBAPI.SwitchDataSourceMessage(projectName = Global.ServiceCenter.projectName).send
       _ <- initSchema(schemaName)
-      
+      // 进程内调度器：按积压自适应间隔触发分配，并定期全量对账补上丢失的事件
+      _ <- Utils.DispatchScheduler.start(
+        config.dispatchMinIntervalMillis,
+        config.dispatchMaxIntervalMillis,
+        config.dispatchResyncSeconds.getOrElse(60).seconds
+      )
+
     } yield ()
 
     program.handleErrorWith(err => IO {
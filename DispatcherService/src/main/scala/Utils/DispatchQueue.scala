@@ -0,0 +1,126 @@
+package Utils
+
+import APIs.OrderService.GetUnassignedOrders
+import APIs.UserCenter.GetAllIdleRiders
+import Common.API.PlanContext
+import Objects.DispatcherService.{DispatchEvent, DispatchEventType}
+import Objects.OrderService.{OrderAssignment, OrderStatus}
+import Objects.UserCenter.RiderStatus
+import cats.effect.IO
+import cats.implicits.*
+import org.joda.time.DateTime
+import org.slf4j.LoggerFactory
+
+import java.util.concurrent.ConcurrentLinkedQueue
+import scala.collection.concurrent.TrieMap
+
+/** 等待分配骑手的订单 */
+case class QueuedOrder(orderID: String, merchantID: String, orderTime: DateTime)
+
+/**
+ * 调度服务内存中的待分配订单与空闲骑手队列，由订单服务、用户中心推送的事件增量维护。
+ * synced 为 false 时（刚启动、分配失败后或定期对账）下一轮分配会回退到全量查询并重建队列。
+ * 全量查询期间到达的事件先照常应用，同时记下来，重建队列后再重放一遍，不会被重建覆盖。
+ */
+case object DispatchQueue {
+  private val logger = LoggerFactory.getLogger(getClass)
+
+  private val pendingOrders: TrieMap[String, QueuedOrder] = TrieMap.empty
+  private val idleRiders: TrieMap[String, Unit] = TrieMap.empty
+  @volatile private var synced: Boolean = false
+  /** resync 期间收到的事件，重建队列后重放；不在 resync 中时为 None */
+  @volatile private var eventsDuringResync: Option[ConcurrentLinkedQueue[DispatchEvent]] = None
+
+  def isSynced: Boolean = synced
+
+  /** 标记队列需要在下一轮分配前全量对账 */
+  def invalidate(): Unit = synced = false
+
+  def hasWork: Boolean = pendingOrders.nonEmpty && idleRiders.nonEmpty
+
+  def pendingCount: Int = pendingOrders.size
+
+  def idleRiderCount: Int = idleRiders.size
+
+  /** 最早一个待分配订单的下单时间（毫秒），队列为空时为 None */
+  def oldestPendingMillis: Option[Long] =
+    pendingOrders.values.iterator.map(_.orderTime.getMillis).minOption
+
+  /** 应用一个事件，返回事件是否可能带来新的可分配组合 */
+  def applyEvent(event: DispatchEvent): Boolean = {
+    // 先记录再应用：记录发生在重放之后的事件，其应用也一定发生在重建之后
+    eventsDuringResync.foreach(_.add(event))
+    applyToQueues(event)
+  }
+
+  private def applyToQueues(event: DispatchEvent): Boolean = event.eventType match {
+    case DispatchEventType.OrderCreated | DispatchEventType.OrderStatusChanged =>
+      (event.orderID, event.orderStatus) match {
+        case (Some(orderID), Some(OrderStatus.WaitingForAssign)) =>
+          (event.merchantID, event.orderTime) match {
+            case (Some(merchantID), Some(orderTime)) =>
+              pendingOrders.update(orderID, QueuedOrder(orderID, merchantID, orderTime))
+              true
+            case _ =>
+              logger.warn(s"[DispatchQueue] 订单事件缺少商家或下单时间，等待下次对账：${event}")
+              invalidate()
+              false
+          }
+        case (Some(orderID), Some(_)) =>
+          pendingOrders.remove(orderID)
+          false
+        case _ =>
+          logger.warn(s"[DispatchQueue] 忽略不完整的订单事件：${event}")
+          false
+      }
+    case DispatchEventType.RiderStatusChanged =>
+      (event.riderID, event.riderStatus) match {
+        case (Some(riderID), Some(RiderStatus.Idle)) =>
+          idleRiders.update(riderID, ())
+          true
+        case (Some(riderID), Some(_)) =>
+          idleRiders.remove(riderID)
+          false
+        case _ =>
+          logger.warn(s"[DispatchQueue] 忽略不完整的骑手事件：${event}")
+          false
+      }
+  }
+
+  /** 取当前队列快照：订单按下单时间升序 */
+  def snapshot: (List[QueuedOrder], List[String]) =
+    (pendingOrders.values.toList.sortBy(_.orderTime.getMillis), idleRiders.keys.toList)
+
+  /** 分配成功后立即出队，避免在状态变更事件到达前被下一轮重复分配 */
+  def markAssigned(assignments: List[OrderAssignment]): Unit =
+    assignments.foreach { assignment =>
+      pendingOrders.remove(assignment.orderID)
+      idleRiders.remove(assignment.riderID)
+    }
+
+  /**
+   * 全量查询未分配订单与空闲骑手，并以此重建队列。查询开始前开始记录事件，重建后重放，
+   * 避免查询返回到重建之间应用的事件被清掉。同一时刻只有一轮分配在执行，resync 不会并发。
+   */
+  def resync()(using PlanContext): IO[(List[QueuedOrder], List[String])] =
+    for {
+      buffer <- IO {
+        val buffer = new ConcurrentLinkedQueue[DispatchEvent]()
+        eventsDuringResync = Some(buffer)
+        buffer
+      }
+      fetched <- (GetUnassignedOrders().send, GetAllIdleRiders().send).tupled
+        .onError(_ => IO { eventsDuringResync = None })
+      (orders, riders) = fetched
+      _ <- IO {
+        pendingOrders.clear()
+        idleRiders.clear()
+        orders.foreach(o => pendingOrders.update(o.orderID, QueuedOrder(o.orderID, o.merchantID, o.orderTime)))
+        riders.foreach(r => idleRiders.update(r.userID, ()))
+        eventsDuringResync = None
+        val replayed = Iterator.continually(buffer.poll()).takeWhile(_ != null).map(applyToQueues).size
+        synced = true
+        logger.info(s"[DispatchQueue] 全量对账完成：待分配订单 ${orders.size} 个，空闲骑手 ${riders.size} 名，重放事件 ${replayed} 个")
+      }
+    } yield snapshot
+}
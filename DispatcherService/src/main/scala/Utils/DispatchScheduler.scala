@@ -0,0 +1,125 @@
+package Utils
+
+import Common.API.PlanContext
+import Common.Metrics
+import cats.effect.IO
+import io.circe.Json
+import io.circe.generic.auto.*
+import io.circe.syntax.*
+import org.slf4j.LoggerFactory
+
+import java.util.concurrent.atomic.AtomicReference
+import scala.concurrent.duration.*
+
+/** 调度统计，GET /dispatch/stats 返回 */
+case class DispatchStats(
+  cycles: Long = 0,
+  cycleErrors: Long = 0,
+  ordersAssigned: Long = 0,
+  ordersFailed: Long = 0,
+  lastCycleMillis: Long = 0,
+  maxCycleMillis: Long = 0,
+  lastAssigned: Int = 0,
+  lastMaxAssignWaitMillis: Long = 0,
+  intervalMillis: Long = 0
+)
+
+/**
+ * 进程内的调度器：在一个 fiber 上周期性地触发分配，取代外部定时调用 OrderAssignPlanner。
+ *  - 每轮都经 OrderAssignProcess.requestAssign 触发，与事件触发的分配共用同一把锁，任何时刻最多一轮在执行；
+ *    每轮结束后至少空闲与该轮耗时相同的时间（idleGap）才开始下一轮，事件再密集占空比也不超过一半
+ *  - 间隔随积压自适应：有待分配订单且有空闲骑手时，按上一轮的耗时（不少于 minInterval）紧接着再跑，
+ *    占空比不超过一半；有积压但没有空闲骑手时不超过 baseInterval；队列为空时每轮翻倍，直到 maxInterval
+ *  - 每隔 resyncInterval 把内存队列标记为待对账，下一轮全量查询，补上丢失的事件
+ */
+case object DispatchScheduler {
+  private val logger = LoggerFactory.getLogger(getClass)
+
+  val MetricKind = "dispatch"
+
+  private val baseInterval = 1.second
+  @volatile private var minInterval: FiniteDuration = 200.millis
+  @volatile private var maxInterval: FiniteDuration = 10.seconds
+  @volatile private var interval: FiniteDuration = baseInterval
+  @volatile private var lastCycleTime: FiniteDuration = Duration.Zero
+
+  private val stats = new AtomicReference(DispatchStats(intervalMillis = baseInterval.toMillis))
+
+  def start(minIntervalMillis: Option[Int], maxIntervalMillis: Option[Int], resyncInterval: FiniteDuration): IO[Unit] =
+    IO {
+      minIntervalMillis.foreach(value => minInterval = value.max(1).millis)
+      maxIntervalMillis.foreach(value => maxInterval = value.max(1).millis)
+      if (maxInterval < minInterval) maxInterval = minInterval
+      interval = baseInterval.max(minInterval).min(maxInterval)
+      logger.info(s"[DispatchScheduler] 启动：minInterval=${minInterval}, maxInterval=${maxInterval}, resyncInterval=${resyncInterval}")
+    } >> IO.monotonic.flatMap(loop(_, resyncInterval)).start.void
+
+  private def loop(lastResync: FiniteDuration, resyncInterval: FiniteDuration): IO[Unit] =
+    tick(lastResync, resyncInterval).flatMap(loop(_, resyncInterval))
+
+  /** 等待一个间隔后触发一轮分配，返回最近一次对账的时间 */
+  private def tick(lastResync: FiniteDuration, resyncInterval: FiniteDuration): IO[FiniteDuration] =
+    (IO.defer(IO.sleep(interval)) >> IO.monotonic.flatMap { now =>
+      val resyncDue = now - lastResync >= resyncInterval
+      IO.whenA(resyncDue)(IO(DispatchQueue.invalidate())) >>
+        // 队列已对账且没有可分配的组合时跳过本轮，只把间隔放长
+        (if (resyncDue || !DispatchQueue.isSynced || DispatchQueue.hasWork) OrderAssignProcess.requestAssign()
+         else IO(adjustInterval(Duration.Zero))).as(if (resyncDue) now else lastResync)
+    }).handleErrorWith { e =>
+      IO(logger.error(s"[DispatchScheduler] 调度循环出错：${e.getMessage}")).as(lastResync)
+    }
+
+  /** 根据本轮结束后的队列状态与本轮耗时计算下一轮的间隔 */
+  private def adjustInterval(cycleTime: FiniteDuration): Unit = {
+    val next =
+      if (DispatchQueue.hasWork || !DispatchQueue.isSynced) cycleTime.max(minInterval)
+      else if (DispatchQueue.pendingCount > 0) (interval * 2).min(baseInterval).max(minInterval)
+      else (interval * 2).min(maxInterval)
+    interval = next.min(maxInterval)
+    stats.updateAndGet(_.copy(intervalMillis = interval.toMillis))
+  }
+
+  /** 执行并记录一轮分配：耗时与每个订单从下单到分配的等待时间同时写入 /metrics 的直方图 */
+  def recordCycle(cycle: IO[AssignCycleResult])(using context: PlanContext): IO[AssignCycleResult] =
+    IO.monotonic.flatMap { start =>
+      cycle.attempt.flatMap { outcome =>
+        IO.monotonic.flatMap { end =>
+          val elapsed = end - start
+          IO {
+            Metrics.record(MetricKind, "cycle", elapsed, context.traceID, outcome.isLeft)
+            outcome match {
+              case Right(result) =>
+                result.assignWaitMillis.foreach(wait => Metrics.record(MetricKind, "assignWait", wait.millis, context.traceID, false))
+                stats.updateAndGet(s => s.copy(
+                  cycles = s.cycles + 1,
+                  ordersAssigned = s.ordersAssigned + result.assigned.size,
+                  ordersFailed = s.ordersFailed + result.failed.size,
+                  lastCycleMillis = elapsed.toMillis,
+                  maxCycleMillis = s.maxCycleMillis.max(elapsed.toMillis),
+                  lastAssigned = result.assigned.size,
+                  lastMaxAssignWaitMillis = result.assignWaitMillis.maxOption.getOrElse(0L)
+                ))
+              case Left(_) =>
+                stats.updateAndGet(s => s.copy(cycles = s.cycles + 1, cycleErrors = s.cycleErrors + 1, lastCycleMillis = elapsed.toMillis))
+            }
+            lastCycleTime = elapsed
+            adjustInterval(elapsed)
+          } >> IO.fromEither(outcome)
+        }
+      }
+    }
+
+  /** 一轮分配结束后、下一轮开始前至少空闲的时间 */
+  def idleGap: FiniteDuration = lastCycleTime
+
+  /** 当前统计，附带队列积压情况 */
+  def statsJson: IO[Json] = IO {
+    val now = System.currentTimeMillis()
+    stats.get.asJson.deepMerge(Json.obj(
+      "backlog" -> DispatchQueue.pendingCount.asJson,
+      "idleRiders" -> DispatchQueue.idleRiderCount.asJson,
+      "oldestPendingAgeMillis" -> DispatchQueue.oldestPendingMillis.map(now - _).asJson,
+      "queueSynced" -> DispatchQueue.isSynced.asJson
+    ))
+  }
+}
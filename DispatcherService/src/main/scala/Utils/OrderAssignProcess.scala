@@ -8,12 +8,17 @@ import org.joda.time.DateTime
 import Common.DBAPI._
 import Common.ServiceUtils.schemaName
 import org.slf4j.LoggerFactory
-import APIs.UserCenter.{GetAllIdleRiders, UpdateStatus}
-import APIs.OrderService.{GetUnassignedOrders, UpdateRider}
+import APIs.UserCenter.{BatchUpdateRiderStatus, GetUserLocations}
+import APIs.OrderService.BatchUpdateRider
 import Objects.UserCenter.{RiderStatus, UserInfo}
-import Objects.OrderService.{OrderInfo, OrderStatus}
-import Common.API.PlanContext
+import Objects.OrderService.{OrderAssignment, OrderInfo, OrderStatus}
+import Common.API.{PlanContext, TraceID}
+import Common.Tracing
 import cats.effect.IO
+import java.util.UUID
+import java.util.concurrent.atomic.AtomicBoolean
+import scala.concurrent.duration.*
+import Global.GlobalVariables
 import cats.implicits._
 import Common.Object.SqlParameter
 import cats.implicits.*
@@ -25,60 +30,175 @@ import APIs.OrderService.GetUnassignedOrders
 import Objects.UserCenter.UserType
 import Objects.UserCenter.UserInfo
 import Objects.ProductService.ProductInfo
-import APIs.UserCenter.UpdateStatus
 import Objects.UserCenter.RiderStatus
-import APIs.OrderService.UpdateRider
 import Objects.OrderService.OrderInfo
-import cats.effect.unsafe.implicits.global
+
+/** 订单分配模式：Batch 每个服务一次批量调用；Concurrent 逐单调用，按 parallelism 限制并发 */
+enum AssignMode:
+  case Batch, Concurrent
+
+object AssignMode:
+  def fromString(s: String): AssignMode = s.toLowerCase match
+    case "batch" => Batch
+    case "concurrent" => Concurrent
+    case _ => throw Exception(s"Unknown AssignMode: $s")
+
+/** 一个调度周期的分配结果，failed 中记录每个失败订单及原因，assignWaitMillis 为成功订单从下单到分配的等待时间 */
+case class AssignCycleResult(
+  assigned: List[OrderAssignment],
+  failed: List[(OrderAssignment, String)],
+  assignWaitMillis: List[Long] = Nil
+)
 
 case object OrderAssignProcess {
   private val logger = LoggerFactory.getLogger(getClass)
   //process plan code 预留标志位，不要删除
   
-  def OrderAssignPlanner()(using PlanContext): IO[Option[Any]] = {
+  def OrderAssignPlanner(
+    mode: AssignMode = GlobalVariables.assignMode,
+    parallelism: Int = GlobalVariables.assignParallelism,
+    strategy: MatchingStrategy = GlobalVariables.matchingStrategy,
+    eventDriven: Boolean = GlobalVariables.eventDrivenDispatch
+  )(using PlanContext): IO[AssignCycleResult] = {
     for {
       // 开始流程，记录日志
-      _ <- IO(logger.info(s"[OrderAssignPlanner] 开始执行订单分配流程"))
+      _ <- IO(logger.info(s"[OrderAssignPlanner] 开始执行订单分配流程，mode=${mode}, parallelism=${parallelism}, strategy=${strategy.name}, eventDriven=${eventDriven}"))
       
-      // 调用 API 获取未分配的订单
-      unassignedOrders <- GetUnassignedOrders().send
-      _ <- IO(logger.info(s"[OrderAssignPlanner] 获取未分配订单，共计 ${unassignedOrders.size} 个"))
-      
-      // 调用 API 获取空闲的骑手
-      idleRiders <- GetAllIdleRiders().send
-      _ <- IO(logger.info(s"[OrderAssignPlanner] 获取空闲骑手，共计 ${idleRiders.size} 名"))
+      // 获取未分配的订单与空闲的骑手：事件驱动模式下直接读内存队列，队列未对账时全量查询并重建队列
+      queued <- Tracing.span(Tracing.Step, "loadQueue")(if (eventDriven && DispatchQueue.isSynced) IO(DispatchQueue.snapshot) else DispatchQueue.resync())
+      (unassignedOrders, idleRiders) = queued
+      _ <- IO(logger.info(s"[OrderAssignPlanner] 未分配订单 ${unassignedOrders.size} 个，空闲骑手 ${idleRiders.size} 名"))
   
       // 如果有未分配订单和空闲骑手，开始分配逻辑
-      _ <- if (unassignedOrders.nonEmpty && idleRiders.nonEmpty) {
-        IO(logger.info("[OrderAssignPlanner] 开始分配订单")) >> 
-        IO {
-          unassignedOrders.zipWithIndex.foreach { case (order, index) =>
-            // 选择一名骑手（按索引轮换方式）
-            val riderIndex = index % idleRiders.size
-            val selectedRider = idleRiders(riderIndex)
-  
-            logger.info(s"[OrderAssignPlanner] 分配订单：${order.orderID} 给骑手：${selectedRider.userID}")
-            
-            // 更新骑手和订单信息
-            // 每次更新分别调用 UpdateRider 和 UpdateStatus API
-            val updateFlow = for {
-              _ <- UpdateRider(order.orderID, selectedRider.userID).send
-              _ <- UpdateStatus(selectedRider.userID, RiderStatus.Delivering).send
-              _ <- IO(logger.info(s"[OrderAssignPlanner] 更新成功：骑手 ${selectedRider.userID} 状态为 Delivering"))
-            } yield ()
-            updateFlow.unsafeRunSync() // 同步执行更新逻辑，因为仅在循环体内
+      result <- if (unassignedOrders.nonEmpty && idleRiders.nonEmpty) {
+        for {
+          // 查询商家与骑手的位置，查询失败时不影响分配，只是退化为不考虑距离
+          locations <- GetUserLocations((idleRiders ++ unassignedOrders.map(_.merchantID)).distinct).send
+            .handleErrorWith(e => IO(logger.error(s"[OrderAssignPlanner] 查询位置失败：${e.getMessage}")).as(Nil))
+          locationMap = locations.map(l => l.userID -> GeoPoint(l.latitude, l.longitude)).toMap
+
+          // 先下的订单优先匹配，每名骑手本轮最多分配一个订单
+          assignments <- Tracing.span(Tracing.Step, s"match:${strategy.name}")(IO(strategy.matchOrders(
+            unassignedOrders.sortBy(_.orderTime.getMillis).map(o => PendingOrder(o.orderID, locationMap.get(o.merchantID))),
+            idleRiders.map(riderID => CandidateRider(riderID, locationMap.get(riderID)))
+          )))
+          result <- Tracing.span(Tracing.Step, s"applyAssignments:${mode}")(applyAssignments(assignments, mode, parallelism))
+
+          // 成功的分配立即出队；有失败时队列状态不再可信，下一轮全量对账
+          now <- IO {
+            DispatchQueue.markAssigned(result.assigned)
+            if (result.failed.nonEmpty) DispatchQueue.invalidate()
+            System.currentTimeMillis()
           }
-        }.void
+          orderTimes = unassignedOrders.map(o => o.orderID -> o.orderTime.getMillis).toMap
+        } yield result.copy(assignWaitMillis = result.assigned.flatMap(a => orderTimes.get(a.orderID)).map(now - _))
       } else {
         // 没有需要分配的订单或没有空闲骑手的情况
         IO {
           if (unassignedOrders.isEmpty) logger.info("[OrderAssignPlanner] 无未分配的订单，流程终止")
           if (idleRiders.isEmpty) logger.info("[OrderAssignPlanner] 无空闲骑手，流程终止")
-        }.void
+          AssignCycleResult(Nil, Nil)
+        }
       }
   
       // 记录流程结束
-      _ <- IO(logger.info("[OrderAssignPlanner] 订单分配流程结束"))
-    } yield None
+      _ <- IO(logger.info(s"[OrderAssignPlanner] 订单分配流程结束：成功 ${result.assigned.size} 个，失败 ${result.failed.size} 个"))
+    } yield result
   }
+
+  private val assignRunning = new AtomicBoolean(false)
+  private val assignRequested = new AtomicBoolean(false)
+
+  /**
+   * 请求尽快执行一轮分配（由事件或 DispatchScheduler 触发）。同一时刻最多只有一轮分配在执行，
+   * 执行期间到达的请求合并为执行结束后的下一轮，每轮使用新的 traceID。
+   * 每轮结束后先空闲 DispatchScheduler.idleGap 再处理下一轮请求，空闲期间到达的请求同样合并。
+   */
+  def requestAssign(): IO[Unit] =
+    IO(assignRequested.set(true)) >>
+      IO(assignRunning.compareAndSet(false, true)).flatMap {
+        case true => drainAssignRequests().start.void
+        case false => IO.unit
+      }
+
+  private def drainAssignRequests(): IO[Unit] =
+    IO(assignRequested.getAndSet(false)).flatMap {
+      case true =>
+        given PlanContext = PlanContext(TraceID(UUID.randomUUID().toString), 0)
+        DispatchScheduler.recordCycle(Tracing.span(Tracing.Plan, "OrderAssignCycle")(OrderAssignPlanner()))
+          .handleErrorWith(e => IO(logger.error(s"[OrderAssignPlanner] 分配失败：${e.getMessage}"))).void >>
+          IO.defer(IO.sleep(DispatchScheduler.idleGap)) >>
+          drainAssignRequests()
+      case false =>
+        // 释放后再检查一次，避免在释放前一刻到达的请求被遗漏
+        IO(assignRunning.set(false)) >>
+          IO(assignRequested.get && assignRunning.compareAndSet(false, true)).flatMap {
+            case true => drainAssignRequests()
+            case false => IO.unit
+          }
+    }
+
+  private def applyAssignments(assignments: List[OrderAssignment], mode: AssignMode, parallelism: Int)(using PlanContext): IO[AssignCycleResult] =
+    IO(logger.info(s"[OrderAssignPlanner] 开始分配订单：${assignments.map(a => s"${a.orderID}->${a.riderID}").mkString(", ")}")) >>
+      (mode match {
+        case AssignMode.Batch => assignInBatch(assignments)
+        case AssignMode.Concurrent => assignConcurrently(assignments, parallelism)
+      })
+
+  /**
+   * 每个服务各调用一次批量接口，分别在一个事务中完成全部更新。
+   * 订单服务只返回实际分配成功的订单（已取消或已被分配的订单会被跳过），骑手状态只为这些订单的骑手更新；
+   * 订单分配已提交后即计为成功，骑手状态更新失败只重试、不再把这些订单记为失败。
+   */
+  private def assignInBatch(assignments: List[OrderAssignment])(using PlanContext): IO[AssignCycleResult] =
+    BatchUpdateRider(assignments).send.attempt.flatMap {
+      case Left(e) =>
+        IO(logger.error(s"[OrderAssignPlanner] 批量分配失败：${e.getMessage}")) >>
+          IO.pure(AssignCycleResult(Nil, assignments.map(_ -> e.getMessage)))
+      case Right(assignedOrderIDs) =>
+        val (assigned, skipped) = assignments.partition(a => assignedOrderIDs.contains(a.orderID))
+        markRidersDelivering(assigned.map(_.riderID).distinct) >>
+          IO {
+            logger.info(s"[OrderAssignPlanner] 更新成功：${assigned.size} 个订单，${assigned.map(_.riderID).distinct.size} 名骑手状态为 Delivering")
+            AssignCycleResult(assigned, skipped.map(_ -> skippedReason))
+          }
+    }
+
+  /** 逐单更新订单与骑手状态，最多 parallelism 个订单同时进行；单个订单失败只记录，不影响其他订单 */
+  private def assignConcurrently(assignments: List[OrderAssignment], parallelism: Int)(using PlanContext): IO[AssignCycleResult] = {
+    IO.parTraverseN(parallelism.max(1))(assignments) { assignment =>
+      BatchUpdateRider(List(assignment)).send.flatMap[Either[String, Unit]] {
+        case assignedOrderIDs if assignedOrderIDs.contains(assignment.orderID) =>
+          markRidersDelivering(List(assignment.riderID)) >>
+            IO(logger.info(s"[OrderAssignPlanner] 分配订单：${assignment.orderID} 给骑手：${assignment.riderID}")).as(Right(()))
+        case _ => IO.pure(Left(skippedReason))
+      }.handleError(e => Left(e.getMessage)).map(assignment -> _)
+    }.flatMap { outcomes =>
+      val failed = outcomes.collect { case (assignment, Left(reason)) => assignment -> reason }
+      IO {
+        failed.foreach { case (assignment, reason) =>
+          logger.error(s"[OrderAssignPlanner] 订单 ${assignment.orderID} 分配给骑手 ${assignment.riderID} 失败：${reason}")
+        }
+        AssignCycleResult(outcomes.collect { case (assignment, Right(_)) => assignment }, failed)
+      }
+    }
+  }
+
+  private val skippedReason = "订单已不在等待分配状态"
+  private val riderStatusRetries = 3
+
+  /**
+   * 订单已经分配给骑手后把骑手标记为 Delivering。订单分配已提交、无法随之回滚，所以这里失败时重试；
+   * 重试仍失败时只记录错误，骑手已由 markAssigned 移出内存队列，不会在事件驱动模式下被立即再次分配
+   */
+  private def markRidersDelivering(riderIDs: List[String])(using PlanContext): IO[Unit] =
+    if (riderIDs.isEmpty) IO.unit
+    else {
+      def attempt(remaining: Int): IO[Unit] =
+        BatchUpdateRiderStatus(riderIDs, RiderStatus.Delivering).send.void.handleErrorWith { e =>
+          if (remaining > 1) IO.sleep(200.millis) >> attempt(remaining - 1)
+          else IO(logger.error(s"[OrderAssignPlanner] 订单已分配，但骑手 ${riderIDs.mkString(",")} 状态更新为 Delivering 失败：${e.getMessage}"))
+        }
+      attempt(riderStatusRetries)
+    }
 }
@@ -0,0 +1,255 @@
+package Utils
+
+import Objects.OrderService.OrderAssignment
+
+import scala.collection.mutable
+
+/** 经纬度坐标（WGS84） */
+case class GeoPoint(latitude: Double, longitude: Double)
+
+/** 等待分配的订单，pickup 为商家位置（商家未登记位置时为 None） */
+case class PendingOrder(orderID: String, pickup: Option[GeoPoint])
+
+/** 可分配的空闲骑手，position 为骑手最近上报的位置 */
+case class CandidateRider(riderID: String, position: Option[GeoPoint])
+
+/**
+ * 骑手匹配策略：输入按优先级排好序的订单与本轮空闲骑手，输出分配结果。
+ * 每名骑手在一次调用中最多被分配一次，骑手不足时排在后面的订单留到下一轮。
+ */
+trait MatchingStrategy {
+  def name: String
+  def matchOrders(orders: List[PendingOrder], riders: List[CandidateRider]): List[OrderAssignment]
+}
+
+object MatchingStrategy {
+  def fromString(s: String): MatchingStrategy = s.toLowerCase match
+    case "greedy" => GreedyNearestStrategy
+    case "optimal" => OptimalAssignmentStrategy()
+    case _ => throw Exception(s"Unknown MatchingStrategy: $s")
+
+  /** 没有位置信息的订单 / 骑手无法参与就近匹配，按顺序与剩余骑手配对 */
+  private[Utils] def assignRemaining(
+    orders: List[PendingOrder],
+    index: GridIndex,
+    unlocatedRiders: mutable.Queue[String]
+  ): List[OrderAssignment] =
+    orders.flatMap { order =>
+      val riderID = order.pickup match
+        // 有位置的订单优先取最近的骑手，索引为空时再用没有位置的骑手
+        case Some(pickup) =>
+          index.nearest(pickup).map(_._1).map { id => index.remove(id); id }
+            .orElse(Option.when(unlocatedRiders.nonEmpty)(unlocatedRiders.dequeue()))
+        // 没有位置的订单优先用没有位置的骑手，把有位置的骑手留给能就近匹配的订单
+        case None =>
+          Option.when(unlocatedRiders.nonEmpty)(unlocatedRiders.dequeue())
+            .orElse(index.any.map { id => index.remove(id); id })
+      riderID.map(OrderAssignment(order.orderID, _))
+    }
+
+  private[Utils] def buildIndex(riders: List[CandidateRider]): (GridIndex, mutable.Queue[String]) = {
+    val located = riders.collect { case CandidateRider(id, Some(position)) => id -> position }
+    val index = GridIndex(located)
+    val unlocated = mutable.Queue.from(riders.collect { case CandidateRider(id, None) => id })
+    (index, unlocated)
+  }
+}
+
+/** 贪心最近骑手：订单按优先级依次取离商家最近的空闲骑手，每单期望 O(1) 次网格查询 */
+case object GreedyNearestStrategy extends MatchingStrategy {
+  override val name: String = "greedy"
+
+  override def matchOrders(orders: List[PendingOrder], riders: List[CandidateRider]): List[OrderAssignment] = {
+    val (index, unlocatedRiders) = MatchingStrategy.buildIndex(riders)
+    MatchingStrategy.assignRemaining(orders, index, unlocatedRiders)
+  }
+}
+
+/**
+ * 最优分配：在空间索引给出的每单 candidatesPerOrder 个最近骑手中，用匈牙利算法求总取餐距离最小的分配。
+ * 每轮最多取 min(maxOrders, 骑手数) 个优先级最高的订单参与求解（复杂度 O(n²·m)），其余订单交给贪心兜底，
+ * 既保证先下的订单先被处理，也避免单轮调度耗时失控。
+ */
+case class OptimalAssignmentStrategy(candidatesPerOrder: Int = 8, maxOrders: Int = 300) extends MatchingStrategy {
+  override val name: String = "optimal"
+
+  override def matchOrders(orders: List[PendingOrder], riders: List[CandidateRider]): List[OrderAssignment] = {
+    val (index, unlocatedRiders) = MatchingStrategy.buildIndex(riders)
+    val locatedOrders = orders.filter(_.pickup.isDefined).take(maxOrders.min(index.size))
+    if (locatedOrders.isEmpty || index.size == 0) {
+      MatchingStrategy.assignRemaining(orders, index, unlocatedRiders)
+    } else {
+      // Step 1: 用空间索引为每个订单筛选候选骑手
+      val candidates = locatedOrders.map(order => index.kNearest(order.pickup.get, candidatesPerOrder))
+      val riderIDs = candidates.flatten.map(_._1).distinct.toArray
+      val riderColumn = riderIDs.zipWithIndex.toMap
+
+      // Step 2: 构造代价矩阵，非候选骑手记为不可达
+      val cost = Array.fill(locatedOrders.size, riderIDs.length)(Unreachable)
+      candidates.zipWithIndex.foreach { case (orderCandidates, row) =>
+        orderCandidates.foreach { case (riderID, distance) => cost(row)(riderColumn(riderID)) = distance }
+      }
+
+      // Step 3: 求解并丢弃落在不可达位置上的配对
+      val matched = Hungarian.solve(cost).collect {
+        case (row, column) if cost(row)(column) < Unreachable => locatedOrders(row).orderID -> riderIDs(column)
+      }.toMap
+      matched.values.foreach(index.remove)
+
+      // Step 4: 其余订单按原优先级交给贪心兜底
+      val rest = orders.filterNot(order => matched.contains(order.orderID))
+      val restByOrder = MatchingStrategy.assignRemaining(rest, index, unlocatedRiders).map(a => a.orderID -> a).toMap
+      orders.flatMap { order =>
+        matched.get(order.orderID).map(OrderAssignment(order.orderID, _)).orElse(restByOrder.get(order.orderID))
+      }
+    }
+  }
+
+  private val Unreachable: Double = 1e12
+}
+
+/**
+ * 均匀网格空间索引：先把经纬度按等距矩形投影换算成平面米坐标，再按 cellMeters 分桶。
+ * 最近邻查询由近及远逐圈扫描网格，找到的最近距离不超过未扫描圈的下界即可停止。
+ */
+class GridIndex private (originLatitude: Double, cellMeters: Double) {
+  private val cells = mutable.HashMap.empty[(Int, Int), mutable.LinkedHashMap[String, (Double, Double)]]
+  private val positions = mutable.LinkedHashMap.empty[String, (Double, Double)]
+  private var minCell = (Int.MaxValue, Int.MaxValue)
+  private var maxCell = (Int.MinValue, Int.MinValue)
+
+  def size: Int = positions.size
+
+  def insert(id: String, point: GeoPoint): Unit = {
+    val xy = project(point)
+    val cell = cellOf(xy)
+    positions.update(id, xy)
+    cells.getOrElseUpdate(cell, mutable.LinkedHashMap.empty).update(id, xy)
+    minCell = (minCell._1.min(cell._1), minCell._2.min(cell._2))
+    maxCell = (maxCell._1.max(cell._1), maxCell._2.max(cell._2))
+  }
+
+  def remove(id: String): Unit =
+    positions.remove(id).foreach { xy =>
+      val cell = cellOf(xy)
+      cells.get(cell).foreach { bucket =>
+        bucket.remove(id)
+        if (bucket.isEmpty) cells.remove(cell)
+      }
+    }
+
+  /** 任取一个元素（按插入顺序），用于没有位置的订单 */
+  def any: Option[String] = positions.headOption.map(_._1)
+
+  def nearest(point: GeoPoint): Option[(String, Double)] = kNearest(point, 1).headOption
+
+  /** 返回距离 point 最近的 k 个元素及其距离（米），按距离升序 */
+  def kNearest(point: GeoPoint, k: Int): List[(String, Double)] = {
+    if (positions.isEmpty || k <= 0) return Nil
+    val xy = project(point)
+    val (cx, cy) = cellOf(xy)
+    val maxRing = List(cx - minCell._1, maxCell._1 - cx, cy - minCell._2, maxCell._2 - cy).max.max(0)
+    val found = mutable.ArrayBuffer.empty[(String, Double)]
+    var ring = 0
+    var done = false
+    while (!done && ring <= maxRing) {
+      // 查询点远离所有骑手时逐圈扫描比直接遍历更慢，此时退化为线性扫描
+      if (8 * ring > cells.size) {
+        return positions.iterator.map { case (id, other) => id -> distance(xy, other) }.toList.sortBy(_._2).take(k)
+      }
+      ringCells(cx, cy, ring).foreach { cell =>
+        cells.get(cell).foreach(_.foreach { case (id, other) => found += id -> distance(xy, other) })
+      }
+      // 第 ring + 1 圈及以外的点距离至少为 ring * cellMeters
+      if (found.size >= k) {
+        found.sortInPlaceBy(_._2)
+        done = found(k - 1)._2 <= ring * cellMeters
+      }
+      ring += 1
+    }
+    found.sortInPlaceBy(_._2).take(k).toList
+  }
+
+  private def ringCells(cx: Int, cy: Int, ring: Int): Iterator[(Int, Int)] =
+    if (ring == 0) Iterator.single((cx, cy))
+    else
+      (for (dx <- -ring to ring; dy <- -ring to ring if dx.abs == ring || dy.abs == ring) yield (cx + dx, cy + dy)).iterator
+
+  private def project(point: GeoPoint): (Double, Double) = {
+    val x = math.toRadians(point.longitude) * math.cos(math.toRadians(originLatitude)) * GridIndex.EarthRadiusMeters
+    val y = math.toRadians(point.latitude) * GridIndex.EarthRadiusMeters
+    (x, y)
+  }
+
+  private def cellOf(xy: (Double, Double)): (Int, Int) =
+    (math.floor(xy._1 / cellMeters).toInt, math.floor(xy._2 / cellMeters).toInt)
+
+  private def distance(a: (Double, Double), b: (Double, Double)): Double =
+    math.hypot(a._1 - b._1, a._2 - b._2)
+}
+
+object GridIndex {
+  val EarthRadiusMeters: Double = 6371000.0
+
+  /** 按点的分布自动选取网格大小，使每个格子平均约有一个点 */
+  def apply(points: List[(String, GeoPoint)], minCellMeters: Double = 200.0): GridIndex = {
+    val originLatitude = if (points.isEmpty) 0.0 else points.map(_._2.latitude).sum / points.size
+    val index =
+      if (points.size < 2) new GridIndex(originLatitude, minCellMeters)
+      else {
+        val probe = new GridIndex(originLatitude, 1.0)
+        val projected = points.map(p => probe.project(p._2))
+        val width = projected.map(_._1).max - projected.map(_._1).min
+        val height = projected.map(_._2).max - projected.map(_._2).min
+        new GridIndex(originLatitude, math.sqrt(width.max(1.0) * height.max(1.0) / points.size).max(minCellMeters))
+      }
+    points.foreach { case (id, point) => index.insert(id, point) }
+    index
+  }
+}
+
+/** 匈牙利算法（Kuhn-Munkres），求行数 <= 列数的矩形代价矩阵的最小代价完全匹配，返回 (行, 列) */
+object Hungarian {
+  def solve(cost: Array[Array[Double]]): List[(Int, Int)] = {
+    val rows = cost.length
+    if (rows == 0) return Nil
+    val columns = cost(0).length
+    if (rows > columns) {
+      // 订单多于候选骑手时转置求解，多出的订单不分配
+      val transposed = Array.tabulate(columns, rows)((c, r) => cost(r)(c))
+      return solve(transposed).map { case (c, r) => (r, c) }
+    }
+    val u = Array.fill(rows + 1)(0.0)
+    val v = Array.fill(columns + 1)(0.0)
+    val matchOfColumn = Array.fill(columns + 1)(0)
+    val way = Array.fill(columns + 1)(0)
+    for (row <- 1 to rows) {
+      matchOfColumn(0) = row
+      var column0 = 0
+      val minV = Array.fill(columns + 1)(Double.MaxValue)
+      val used = Array.fill(columns + 1)(false)
+      while (matchOfColumn(column0) != 0) {
+        used(column0) = true
+        val row0 = matchOfColumn(column0)
+        var delta = Double.MaxValue
+        var column1 = 0
+        for (column <- 1 to columns if !used(column)) {
+          val current = cost(row0 - 1)(column - 1) - u(row0) - v(column)
+          if (current < minV(column)) { minV(column) = current; way(column) = column0 }
+          if (minV(column) < delta) { delta = minV(column); column1 = column }
+        }
+        for (column <- 0 to columns) {
+          if (used(column)) { u(matchOfColumn(column)) += delta; v(column) -= delta }
+          else minV(column) -= delta
+        }
+        column0 = column1
+      }
+      while (column0 != 0) {
+        val column1 = way(column0)
+        matchOfColumn(column0) = matchOfColumn(column1)
+        column0 = column1
+      }
+    }
+    (1 to columns).collect { case column if matchOfColumn(column) != 0 => (matchOfColumn(column) - 1, column - 1) }.toList
+  }
+}
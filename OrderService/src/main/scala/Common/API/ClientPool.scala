@@ -0,0 +1,117 @@
+package Common.API
+
+import Common.ServiceUtils.serviceName
+import cats.effect.{IO, Resource}
+import cats.syntax.all.*
+import org.http4s.client.Client
+import org.http4s.ember.client.EmberClientBuilder
+import org.http4s.ember.core.h2.H2Keys
+import org.http4s.{Request, Response}
+
+import java.util.concurrent.atomic.{AtomicInteger, LongAdder}
+import scala.concurrent.duration.FiniteDuration
+
+/**
+ * 发往各目标服务的 HTTP 客户端。每个目标服务（按 serviceCode）一个独立的 Ember 连接池，
+ * db-manager 与各微服务互不挤占连接；连接池的生命周期由 resource 决定，与 HTTP server 一致，
+ * 服务关闭时随之释放。
+ *
+ * 每个连接池额外统计并发中的请求数，在 /metrics 中导出：
+ *  - etuan_client_in_flight / etuan_client_in_flight_max：当前 / 峰值并发
+ *  - etuan_client_pool_limit：连接数上限
+ *  - etuan_client_requests_total / etuan_client_saturated_total：请求总数 / 发出时连接已用满、需要排队的请求数
+ */
+object ClientPool {
+
+  /**
+   * @param defaultMaxConnections    未单独配置的目标服务的连接数上限
+   * @param maxConnectionsPerTarget  按目标 serviceCode 配置的连接数上限
+   * @param idleTimeInPool           空闲连接在池中保留（keep-alive）的时间
+   * @param idleConnectionTime       单个请求读写的空闲超时
+   * @param requestTimeout           单个请求的总超时
+   * @param http2Targets             以 HTTP/2（h2c prior knowledge）访问的目标 serviceCode，对方需开启 HTTP/2
+   */
+  case class Settings(
+    defaultMaxConnections: Int,
+    maxConnectionsPerTarget: Map[String, Int],
+    idleTimeInPool: FiniteDuration,
+    idleConnectionTime: FiniteDuration,
+    requestTimeout: FiniteDuration,
+    http2Targets: Set[String]
+  )
+
+  final class TargetPool(val target: String, client: Client[IO], val limit: Int, http2: Boolean) {
+    private val inFlight = new AtomicInteger(0)
+    private val peak = new AtomicInteger(0)
+    private val requests = new LongAdder
+    private val saturated = new LongAdder
+
+    private val acquire: IO[Unit] = IO {
+      val current = inFlight.incrementAndGet()
+      peak.accumulateAndGet(current, math.max)
+      requests.increment()
+      // HTTP/1.1 下一个请求占用一条连接，超过上限的请求要在池中等待空闲连接
+      if (current > limit) saturated.increment()
+    }
+
+    def run(request: Request[IO]): Resource[IO, Response[IO]] =
+      Resource.make(acquire)(_ => IO(inFlight.decrementAndGet()).void) >>
+        client.run(if (http2) request.withAttribute(H2Keys.Http2PriorKnowledge, ()) else request)
+
+    def render(out: StringBuilder): Unit = {
+      val labels = s"""target="${serviceName(target)}""""
+      out.append(s"etuan_client_in_flight{${labels}} ${inFlight.get}\n")
+      out.append(s"etuan_client_in_flight_max{${labels}} ${peak.get}\n")
+      out.append(s"etuan_client_pool_limit{${labels}} ${limit}\n")
+      out.append(s"etuan_client_requests_total{${labels}} ${requests.sum()}\n")
+      out.append(s"etuan_client_saturated_total{${labels}} ${saturated.sum()}\n")
+    }
+
+    def reset(): Unit = {
+      peak.set(inFlight.get)
+      requests.reset()
+      saturated.reset()
+    }
+  }
+
+  @volatile private var pools: Map[String, TargetPool] = Map.empty
+
+  private def build(target: String, settings: Settings): Resource[IO, TargetPool] = {
+    val limit = settings.maxConnectionsPerTarget.getOrElse(target, settings.defaultMaxConnections).max(1)
+    val http2 = settings.http2Targets.contains(target)
+    val builder = EmberClientBuilder.default[IO]
+      .withMaxTotal(limit)
+      .withMaxPerKey(_ => limit)
+      .withIdleTimeInPool(settings.idleTimeInPool)
+      .withIdleConnectionTime(settings.idleConnectionTime)
+      .withTimeout(settings.requestTimeout)
+    (if (http2) builder.withHttp2 else builder).build.map(new TargetPool(target, _, limit, http2))
+  }
+
+  /** 为 ServiceCenter 中的每个服务建立连接池；resource 结束时关闭全部连接 */
+  def resource(settings: Settings): Resource[IO, Unit] =
+    Global.ServiceCenter.fullNameMap.keys.toList
+      .traverse(target => build(target, settings).map(target -> _))
+      .flatMap { built =>
+        Resource.make(IO { pools = built.toMap })(_ => IO { pools = Map.empty })
+      }
+
+  def run(targetServiceCode: String, request: Request[IO]): Resource[IO, Response[IO]] =
+    pools.get(targetServiceCode) match {
+      case Some(pool) => pool.run(request)
+      case None => Resource.raiseError[IO, Response[IO], Throwable](
+        new IllegalStateException(s"没有发往 ${targetServiceCode} 的连接池，ClientPool 未初始化或 serviceCode 不存在"))
+    }
+
+  /** Prometheus 文本格式，由 Metrics.render 拼接 */
+  def render(out: StringBuilder): Unit = {
+    out.append("# TYPE etuan_client_in_flight gauge\n")
+    out.append("# TYPE etuan_client_in_flight_max gauge\n")
+    out.append("# TYPE etuan_client_pool_limit gauge\n")
+    out.append("# TYPE etuan_client_requests_total counter\n")
+    out.append("# TYPE etuan_client_saturated_total counter\n")
+    pools.values.toList.sortBy(_.target).foreach(_.render(out))
+  }
+
+  def reset(): Unit = pools.values.foreach(_.reset())
+}
@@ -0,0 +1,53 @@
+package Common
+
+import java.util.concurrent.atomic.AtomicLong
+
+/**
+ * 带过期时间的有界 LRU 缓存，线程安全。
+ * 超过 maxEntries 时淘汰最久未访问的条目，淘汰或删除时调用 onRemove（用于维护外部索引）。
+ */
+class TtlCache[K, V](maxEntries: Int, onRemove: (K, V) => Unit = (_: K, _: V) => ()) {
+  private case class Entry(value: V, expireAtMillis: Long)
+
+  private val entries = new java.util.LinkedHashMap[K, Entry](16, 0.75f, true) {
+    override def removeEldestEntry(eldest: java.util.Map.Entry[K, Entry]): Boolean = {
+      val evict = size() > maxEntries
+      if (evict) onRemove(eldest.getKey, eldest.getValue.value)
+      evict
+    }
+  }
+
+  val hits: AtomicLong = new AtomicLong(0)
+  val misses: AtomicLong = new AtomicLong(0)
+
+  def get(key: K): Option[V] = {
+    val result = synchronized {
+      Option(entries.get(key)) match {
+        case Some(entry) if entry.expireAtMillis > System.currentTimeMillis() => Some(entry.value)
+        case Some(entry) =>
+          entries.remove(key)
+          onRemove(key, entry.value)
+          None
+        case None => None
+      }
+    }
+    (if (result.isDefined) hits else misses).incrementAndGet()
+    result
+  }
+
+  def put(key: K, value: V, expireAtMillis: Long): Unit =
+    if (expireAtMillis > System.currentTimeMillis()) synchronized {
+      Option(entries.put(key, Entry(value, expireAtMillis))).foreach(old => onRemove(key, old.value))
+    }
+
+  def remove(key: K): Unit = synchronized {
+    Option(entries.remove(key)).foreach(entry => onRemove(key, entry.value))
+  }
+
+  def clear(): Unit = synchronized {
+    entries.forEach((key, entry) => onRemove(key, entry.value))
+    entries.clear()
+  }
+
+  def size: Int = synchronized(entries.size())
+}
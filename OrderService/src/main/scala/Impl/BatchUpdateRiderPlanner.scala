@@ -0,0 +1,80 @@
+package Impl
+
+
+import Objects.OrderService.{OrderAssignment, OrderStatus}
+import Common.API.{PlanContext, Planner}
+import Common.DBAPI._
+import Common.Object.SqlParameter
+import Common.ServiceUtils.schemaName
+import Objects.DispatcherService.{DispatchEvent, DispatchEventType}
+import Utils.OrderManagementProcess.{orderEvent, publishDispatchEvents}
+import Utils.OrderEventHub
+import cats.effect.IO
+import Common.TraceLogger
+import io.circe._
+import io.circe.syntax._
+import io.circe.generic.auto._
+import cats.implicits.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+case class BatchUpdateRiderPlanner(
+    assignments: List[OrderAssignment],
+    override val planContext: PlanContext
+) extends Planner[List[String]] {
+
+  private val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  override def plan(using PlanContext): IO[List[String]] = {
+    for {
+      // Step 1: 校验输入参数
+      _ <- IO(logger.info(s"开始批量分配订单，共 ${assignments.size} 条"))
+      _ <- validateAssignments()
+
+      // Step 2: 一条语句批量写入骑手ID与订单状态（planWithErrorControl 已经开启事务）
+      rows <- if (assignments.isEmpty) IO.pure(Nil) else updateAssignments()
+      assignedOrderIDs = rows.map(row => decodeField[String](row, "order_id"))
+      _ <- afterCommit(publishDispatchEvents(rows.map { row =>
+        DispatchEvent(
+          eventType = DispatchEventType.OrderStatusChanged,
+          orderID = Some(decodeField[String](row, "order_id")),
+          orderStatus = Some(OrderStatus.Delivering),
+          riderID = decodeField[Option[String]](row, "rider_id")
+        )
+      }))
+      _ <- afterCommit(OrderEventHub.publish(rows.map(row => orderEvent(decodeField[String](row, "order_id"), row, OrderStatus.Delivering))))
+
+      // Step 3: 返回实际写入的订单ID，已取消或已被其他调度周期分配的订单不在其中
+      _ <- IO(logger.info(s"批量分配订单完成：${assignedOrderIDs.size}/${assignments.size} 条已分配"))
+    } yield assignedOrderIDs
+  }
+
+  private def validateAssignments(): IO[Unit] = {
+    val duplicatedOrderIDs = assignments.groupBy(_.orderID).collect { case (orderID, items) if items.size > 1 => orderID }
+    if (assignments.exists(a => a.orderID.isEmpty || a.riderID.isEmpty)) {
+      IO(logger.error("订单ID或骑手ID为空")) >>
+        IO.raiseError(new IllegalArgumentException("orderID and riderID cannot be empty"))
+    } else if (duplicatedOrderIDs.nonEmpty) {
+      IO(logger.error(s"同一订单被重复分配：${duplicatedOrderIDs.mkString(",")}")) >>
+        IO.raiseError(new IllegalArgumentException(s"Duplicated orderID in assignments: ${duplicatedOrderIDs.mkString(",")}"))
+    } else {
+      IO.unit
+    }
+  }
+
+  private def updateAssignments()(using PlanContext): IO[List[Json]] = {
+    // 只更新仍在等待分配的订单，避免覆盖已被其他调度周期处理过的订单；RETURNING 只返回实际更新的行
+    val sql =
+      s"""
+         UPDATE ${schemaName}.order_table AS o
+         SET rider_id = v.rider_id, order_status = ?
+         FROM (VALUES ${assignments.map(_ => "(?, ?)").mkString(", ")}) AS v(order_id, rider_id)
+         WHERE o.order_id = v.order_id AND o.order_status = ?
+         RETURNING o.order_id, o.customer_id, o.merchant_id, o.rider_id
+        """
+    val parameters =
+      SqlParameter("String", OrderStatus.Delivering.toString) ::
+        assignments.flatMap(assignment => List(SqlParameter("String", assignment.orderID), SqlParameter("String", assignment.riderID))) :+
+        SqlParameter("String", OrderStatus.WaitingForAssign.toString)
+    readDBRows(sql, parameters)
+  }
+}
@@ -4,14 +4,14 @@ package Impl
 import Objects.OrderService.{OrderInfo, OrderStatus}
 import Objects.UserCenter.{UserInfo, UserType, RiderStatus}
 import Objects.ProductService.ProductInfo
-import APIs.UserCenter.GetUserInfoByToken
+import Utils.{ProductCache, UserInfoCache}
 import Utils.OrderManagementProcess.createOrderRecord
 import Common.API.{PlanContext, Planner}
 import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import cats.effect.IO
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import org.joda.time.DateTime
 import io.circe.syntax._
 import io.circe.generic.auto._
@@ -45,28 +45,34 @@ case class CreateOrderPlanner(
                                override val planContext: PlanContext
                              ) extends Planner[String] {
 
-  private val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  private val logger = TraceLogger(this.getClass, planContext.traceID)
 
   override def plan(using PlanContext): IO[String] = {
     for {
       // Step 1: Validate customerToken and retrieve customerID
       _ <- IO(logger.info(s"Validating customerToken: $customerToken"))
-      userInfo <- validateCustomerToken()
+      userInfo <- step("validateCustomerToken")(validateCustomerToken())
 
-      // Step 2: Build the OrderInfo object and save to database
+      // Step 2: Verify the cart against ProductService and take name/price from the server side
+      _ <- IO(logger.info(s"Verifying ${productList.size} products of merchantID: $merchantID"))
+      verifiedProducts <- step("verifyProducts")(verifyProducts())
+
+      // Step 3: Build the OrderInfo object and save to database
       _ <- IO(logger.info(s"Building order info for customerID: ${userInfo.userID}"))
-      orderInfo <- buildOrderInfo(userInfo.userID)
+      orderInfo <- buildOrderInfo(userInfo.userID, verifiedProducts)
       _ <- IO(logger.info(s"Saving order to database: $orderInfo"))
-      orderID <- createOrderRecord(orderInfo)
+      created <- step("createOrderRecord")(createOrderRecord(orderInfo))
+      (orderID, notifications) = created
+      _ <- afterCommit(notifications.publish)
 
-      // Step 3: Return the generated orderID
+      // Step 4: Return the generated orderID
       _ <- IO(logger.info(s"Order created successfully, orderID: $orderID"))
     } yield orderID
   }
 
   // Validates the customer token and retrieves the UserInfo object if valid.
   private def validateCustomerToken()(using PlanContext): IO[UserInfo] = {
-    GetUserInfoByToken(customerToken).send.flatMap { userInfo =>
+    UserInfoCache.getUserInfoByToken(customerToken).flatMap { userInfo =>
       if (userInfo.userType != UserType.Customer) {
         val error = s"Invalid token: The provided token does not belong to a customer."
         IO(logger.error(error)) *> IO.raiseError(new IllegalArgumentException(error))
@@ -76,8 +82,24 @@ case class CreateOrderPlanner(
     }
   }
 
+  // Looks up every product of the cart in one batch and replaces the client-supplied fields with the stored ones.
+  // Unknown products, or products of another merchant, fail the whole order.
+  private def verifyProducts()(using PlanContext): IO[List[ProductInfo]] =
+    if (productList.isEmpty) IO.raiseError(new IllegalArgumentException("Invalid orderInfo input: productList cannot be empty."))
+    else ProductCache.getProducts(merchantID, productList.map(_.productID)).flatMap { products =>
+      val unknown = productList.map(_.productID).distinct.filterNot(products.contains)
+      if (unknown.nonEmpty) {
+        val error = s"Products not found for merchant $merchantID: ${unknown.mkString(", ")}"
+        IO(logger.error(error)) *> IO.raiseError(new IllegalArgumentException(error))
+      } else {
+        val repriced = productList.count(item => products(item.productID).price != item.price)
+        IO.whenA(repriced > 0)(IO(logger.warn(s"$repriced items carried a client price different from the stored price"))) *>
+          IO.pure(productList.map(item => products(item.productID)))
+      }
+    }
+
   // Builds the OrderInfo object for the provided customer ID.
-  private def buildOrderInfo(customerID: String)(using PlanContext): IO[OrderInfo] = {
+  private def buildOrderInfo(customerID: String, products: List[ProductInfo])(using PlanContext): IO[OrderInfo] = {
     IO {
       val currentTime = DateTime.now
       OrderInfo(
@@ -85,7 +107,7 @@ case class CreateOrderPlanner(
         customerID = customerID,
         merchantID = merchantID,
         riderID = None, // Rider not assigned at creation
-        productList = productList,
+        productList = products,
         destinationAddress = destinationAddress,
         orderStatus = OrderStatus.WaitingForDish, // Initial order status
         orderTime = currentTime // Current time of order creation
@@ -9,7 +9,7 @@ import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import cats.effect.IO
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import org.joda.time.DateTime
 import io.circe._
 import io.circe.syntax._
@@ -32,8 +32,13 @@ import io.circe.generic.auto._
 import cats.implicits.*
 import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
 
+import Utils.OrderManagementProcess.{attachOrderItems, decodeOrderRow, orderFields}
+
 case class GetOrderDetailsPlanner(orderID: String, override val planContext: PlanContext) extends Planner[OrderInfo] {
-  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  /** 只包含读语句，不开启事务 */
+  override def readOnly: Boolean = true
 
   // Main plan function
   override def plan(using PlanContext): IO[OrderInfo] = for {
@@ -62,7 +67,7 @@ case class GetOrderDetailsPlanner(orderID: String, override val planContext: Pla
   private def fetchOrderData(orderID: String)(using PlanContext): IO[Json] = {
     val sqlQuery =
       s"""
-        SELECT order_id, customer_id, merchant_id, rider_id, product_list, destination_address, order_status, order_time
+        SELECT ${orderFields.selectList}
         FROM ${schemaName}.order_table
         WHERE order_id = ?;
       """.stripMargin
@@ -74,18 +79,8 @@ case class GetOrderDetailsPlanner(orderID: String, override val planContext: Pla
     }
   }
 
-  // Step 3.1: Map database fields to an OrderInfo object
-  private def mapOrderDataToOrderInfo(orderData: Json)(using PlanContext): IO[OrderInfo] = IO {
-    logger.info(s"Mapping order data to OrderInfo object: ${orderData.noSpaces}")
-    OrderInfo(
-      orderID = decodeField[String](orderData, "order_id"),
-      customerID = decodeField[String](orderData, "customer_id"),
-      merchantID = decodeField[String](orderData, "merchant_id"),
-      riderID = decodeField[Option[String]](orderData, "rider_id"),
-      productList = decodeType[List[ProductInfo]](decodeField[String](orderData, "product_list")),
-      destinationAddress = decodeField[String](orderData, "destination_address"),
-      orderStatus = OrderStatus.fromString(decodeField[String](orderData, "order_status")),
-      orderTime = new DateTime(decodeField[String](orderData, "order_time").toLong)
-    )
-  }
+  // Step 3.1: Map database fields to an OrderInfo object, then load its items from order_item_table
+  private def mapOrderDataToOrderInfo(orderData: Json)(using PlanContext): IO[OrderInfo] =
+    IO(logger.info(s"Mapping order data to OrderInfo object: ${orderData.noSpaces}")) >>
+      attachOrderItems(List(decodeOrderRow(orderData))).map(_.head)
 }
\ No newline at end of file
@@ -0,0 +1,121 @@
+package Impl
+
+
+import Utils.UserInfoCache
+import Utils.OrderManagementProcess.{attachOrderItems, decodeOrderRow}
+import Objects.OrderService.{OrderInfo, OrderPage, OrderStatus}
+import Objects.UserCenter.{UserInfo, UserType}
+import Common.API.{PlanContext, Planner}
+import Common.DBAPI._
+import Common.Object.SqlParameter
+import Common.ServiceUtils.schemaName
+import cats.effect.IO
+import Common.TraceLogger
+import io.circe._
+import io.circe.syntax._
+import io.circe.generic.auto._
+import org.joda.time.DateTime
+import cats.implicits.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+case class QueryOrdersByUserPagePlanner(
+    userToken: String,
+    pageSize: Option[Int] = None,
+    cursor: Option[String] = None,
+    orderStatus: Option[OrderStatus] = None,
+    startTime: Option[DateTime] = None,
+    endTime: Option[DateTime] = None,
+    override val planContext: PlanContext
+) extends Planner[OrderPage] {
+
+  private val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  /** 只包含读语句，不开启事务 */
+  override def readOnly: Boolean = true
+
+  private val DefaultPageSize = 20
+  private val MaxPageSize = 100
+
+  override def plan(using PlanContext): IO[OrderPage] = {
+    for {
+      // Step 1: 校验分页参数并解析游标
+      _ <- IO(logger.info(s"[Step 1] 校验分页参数：pageSize=${pageSize}, cursor=${cursor}, orderStatus=${orderStatus}, startTime=${startTime}, endTime=${endTime}"))
+      limit <- validatePageSize()
+      position <- IO.fromEither(cursor.traverse(QueryOrdersByUserPagePlanner.decodeCursor))
+      _ <- (startTime, endTime) match {
+        case (Some(start), Some(end)) if !start.isBefore(end) =>
+          IO.raiseError(new IllegalArgumentException("startTime must be earlier than endTime"))
+        case _ => IO.unit
+      }
+
+      // Step 2: 校验用户令牌
+      _ <- IO(logger.info("[Step 2] 开始校验用户令牌"))
+      userInfo <- UserInfoCache.getUserInfoByToken(userToken)
+
+      // Step 3: 按 (order_time, order_id) 倒序取一页，多取一行用来判断是否还有下一页
+      _ <- IO(logger.info(s"[Step 3] 查询用户订单：userID=${userInfo.userID}, userType=${userInfo.userType}"))
+      rows <- queryPage(userInfo, limit, position)
+      orders <- attachOrderItems(rows.take(limit).map(decodeOrderRow))
+      nextCursor = if (rows.size > limit) orders.lastOption.map(QueryOrdersByUserPagePlanner.encodeCursor) else None
+
+      // Step 4: 返回结果
+      _ <- IO(logger.info(s"[Step 4] 本页订单数量: ${orders.size}, nextCursor=${nextCursor}"))
+    } yield OrderPage(orders, nextCursor)
+  }
+
+  private def validatePageSize(): IO[Int] = pageSize match {
+    case None => IO.pure(DefaultPageSize)
+    case Some(size) if size <= 0 || size > MaxPageSize =>
+      IO(logger.error(s"pageSize 超出范围: ${size}")) >>
+        IO.raiseError(new IllegalArgumentException(s"pageSize must be between 1 and ${MaxPageSize}"))
+    case Some(size) => IO.pure(size)
+  }
+
+  private def queryPage(userInfo: UserInfo, limit: Int, position: Option[(DateTime, String)])(using PlanContext): IO[List[Json]] = {
+    val queryField = userInfo.userType match {
+      case UserType.Customer => "customer_id"
+      case UserType.Merchant => "merchant_id"
+      case UserType.Rider    => "rider_id"
+    }
+
+    // 每个可选条件对应一段 SQL 和它的参数，未给出的条件不出现在语句中
+    val conditions: List[(String, List[SqlParameter])] = List(
+      Some(s"${queryField} = ?" -> List(SqlParameter("String", userInfo.userID))),
+      orderStatus.map(status => "order_status = ?" -> List(SqlParameter("String", status.toString))),
+      startTime.map(start => "order_time >= ?" -> List(SqlParameter("DateTime", start.getMillis.toString))),
+      endTime.map(end => "order_time < ?" -> List(SqlParameter("DateTime", end.getMillis.toString))),
+      position.map { case (orderTime, orderID) =>
+        "(order_time, order_id) < (?, ?)" -> List(
+          SqlParameter("DateTime", orderTime.getMillis.toString),
+          SqlParameter("String", orderID)
+        )
+      }
+    ).flatten
+
+    val querySql =
+      s"""
+         |SELECT order_id, customer_id, merchant_id, rider_id, product_list, destination_address, order_status, order_time
+         |FROM ${schemaName}.order_table
+         |WHERE ${conditions.map(_._1).mkString(" AND ")}
+         |ORDER BY order_time DESC, order_id DESC
+         |LIMIT ?;
+       """.stripMargin
+    val queryParams = conditions.flatMap(_._2) :+ SqlParameter("Int", (limit + 1).toString)
+
+    readDBRows(querySql, queryParams)
+  }
+}
+
+case object QueryOrdersByUserPagePlanner {
+
+  /** 游标格式为 "<下单时间毫秒>:<订单ID>"，指向上一页的最后一个订单 */
+  def encodeCursor(order: OrderInfo): String = s"${order.orderTime.getMillis}:${order.orderID}"
+
+  def decodeCursor(cursor: String): Either[IllegalArgumentException, (DateTime, String)] =
+    cursor.split(":", 2) match {
+      case Array(millis, orderID) if orderID.nonEmpty && millis.toLongOption.isDefined =>
+        Right(new DateTime(millis.toLong) -> orderID)
+      case _ =>
+        Left(new IllegalArgumentException(s"Invalid cursor: ${cursor}"))
+    }
+}
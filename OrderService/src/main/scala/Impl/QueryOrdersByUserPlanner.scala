@@ -1,13 +1,13 @@
 package Impl
 
 
-import APIs.UserCenter.GetUserInfoByToken
+import Utils.UserInfoCache
 import Objects.OrderService.{OrderInfo, OrderStatus}
 import Objects.UserCenter.{UserInfo, UserType}
-import Utils.OrderManagementProcess.queryOrdersByUserID
+import Utils.OrderManagementProcess.{attachOrderItems, decodeOrderRow, orderFields, queryOrdersByUserID}
 import Common.API.{PlanContext, Planner}
 import cats.effect.IO
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import io.circe._
 import io.circe.syntax._
 import io.circe.generic.auto._
@@ -42,7 +42,10 @@ case class QueryOrdersByUserPlanner(
     override val planContext: PlanContext
 ) extends Planner[List[OrderInfo]] {
 
-  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  /** 只包含读语句，不开启事务 */
+  override def readOnly: Boolean = true
 
   /** Plan method to implement the logic for QueryOrdersByUser */
   override def plan(using planContext: PlanContext): IO[List[OrderInfo]] = {
@@ -64,7 +67,7 @@ case class QueryOrdersByUserPlanner(
   private def validateUserTokenAndFetchUserInfo()(using PlanContext): IO[UserInfo] = {
     for {
       _ <- IO(logger.info(s"验证令牌，调用GetUserInfoByToken接口: userToken=${userToken}"))
-      userInfo <- GetUserInfoByToken(userToken).send
+      userInfo <- UserInfoCache.getUserInfoByToken(userToken)
       _ <- IO(logger.info(s"用户信息验证成功，解析用户信息: userID=${userInfo.userID}, userType=${userInfo.userType}"))
     } yield userInfo
   }
@@ -93,42 +96,19 @@ case class QueryOrdersByUserPlanner(
   private def queryOrdersFromDatabase(userID: String, queryField: String)(using PlanContext): IO[List[OrderInfo]] = {
     val querySql =
       s"""
-         |SELECT order_id, customer_id, merchant_id, rider_id, product_list, destination_address, order_status, order_time
+         |SELECT ${orderFields.selectList}
          |FROM ${schemaName}.order_table
-         |WHERE ${queryField} = ?;
+         |WHERE ${queryField} = ?
+         |ORDER BY order_time DESC, order_id DESC;
        """.stripMargin
 
     val queryParams = List(SqlParameter("String", userID))
 
+    // 一次读出全部订单，商品明细按批读取后补全
     for {
       rows <- readDBRows(querySql, queryParams)
-      _ <- IO(logger.info(s"[数据库查询] 查询到 ${rows.size} 行订单数据"))
-      orders <- IO {
-        rows.map { row =>
-          val orderID = decodeField[String](row, "order_id")
-          val customerID = decodeField[String](row, "customer_id")
-          val merchantID = decodeField[String](row, "merchant_id")
-          val riderID = decodeField[Option[String]](row, "rider_id")
-          val rawProductList = decodeField[String](row, "product_list")
-          val productList = decodeType[List[ProductInfo]](rawProductList)
-          val destinationAddress = decodeField[String](row, "destination_address")
-          val orderStatusStr = decodeField[String](row, "order_status")
-          val orderStatus = OrderStatus.fromString(orderStatusStr)
-          val orderTime = decodeField[DateTime](row, "order_time")
-
-          // Construct OrderInfo object
-          OrderInfo(
-            orderID = orderID,
-            customerID = customerID,
-            merchantID = merchantID,
-            riderID = riderID,
-            productList = productList,
-            destinationAddress = destinationAddress,
-            orderStatus = orderStatus,
-            orderTime = orderTime
-          )
-        }
-      }
+      orders <- attachOrderItems(rows.map(decodeOrderRow))
+      _ <- IO(logger.info(s"[数据库查询] 查询到 ${orders.size} 行订单数据"))
     } yield orders
   }
-}
\ No newline at end of file
+}
@@ -18,7 +18,7 @@ import Common.Object.SqlParameter
 import Objects.OrderService.OrderStatus
 import Utils.OrderManagementProcess.updateOrderStatus
 import cats.effect.IO
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import io.circe.Json
 import cats.implicits._
 import io.circe._
@@ -47,7 +47,7 @@ case class UpdateOrderStatusPlanner(
     newStatus: OrderStatus,
     override val planContext: PlanContext
 ) extends Planner[String] {
-  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  val logger = TraceLogger(this.getClass, planContext.traceID)
 
   override def plan(using planContext: PlanContext): IO[String] = {
     for {
@@ -95,6 +95,6 @@ WHERE order_id = ?
    * 更新订单状态
    */
   private def updateOrderStatusImpl(orderID: String, newStatus: OrderStatus)(using PlanContext): IO[String] = {
-    updateOrderStatus(orderID, newStatus)
+    updateOrderStatus(orderID, newStatus).flatMap(notifications => afterCommit(notifications.publish)).as("Success")
   }
 }
\ No newline at end of file
@@ -3,7 +3,9 @@ package Impl
 
 import Objects.OrderService.OrderStatus
 import Objects.OrderService.OrderInfo
-import Utils.OrderManagementProcess.updateOrderStatus
+import Utils.OrderManagementProcess.{orderEvent, publishDispatchEvents}
+import Utils.OrderEventHub
+import Objects.DispatcherService.{DispatchEvent, DispatchEventType}
 import Objects.UserCenter.UserType
 import Objects.UserCenter.UserInfo
 import Objects.ProductService.ProductInfo
@@ -13,7 +15,7 @@ import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import cats.effect.IO
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import org.joda.time.DateTime
 import io.circe._
 import io.circe.syntax._
@@ -38,46 +40,23 @@ import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
 case class UpdateRiderMessage(orderID: String, newRider: String) extends API[String]("UpdateRider")
 
 case class UpdateRiderPlanner(orderID: String, newRider: String, override val planContext: PlanContext) extends Planner[String] {
-  private val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  private val logger = TraceLogger(this.getClass, planContext.traceID)
 
   override def plan(using PlanContext): IO[String] = {
     for {
-      // Step 1: Validate OrderID and RiderID
+      // Step 1: Validate RiderID
       _ <- IO(logger.info(s"Starting validation for orderID=${orderID} and newRider=${newRider}"))
-      _ <- validateOrderID(orderID)
       _ <- validateRiderID(newRider)
 
-      // Step 2: Update Order Status and RiderID
+      // Step 2: Update order status and riderID in one statement; an empty RETURNING means the order does not exist
       _ <- IO(logger.info(s"Updating order status to Delivering and riderID for orderID=${orderID}"))
-      _ <- updateOrderStatus(orderID, OrderStatus.Delivering)
-      _ <- updateRiderInfo(orderID, newRider)
+      _ <- assignRider(orderID, newRider)
 
       // Step 3: Return success result
       _ <- IO(logger.info(s"Successfully updated rider for orderID=${orderID} to newRider=${newRider}"))
     } yield "Success"
   }
 
-  private def validateOrderID(orderID: String)(using PlanContext): IO[Unit] = {
-    for {
-      _ <- IO(logger.info(s"Validating existence of orderID=${orderID}"))
-      sql <- IO {
-        s"""
-           SELECT * 
-           FROM ${schemaName}.order_table
-           WHERE order_id = ?
-          """
-      }
-      orderOpt <- readDBJsonOptional(sql, List(SqlParameter("String", orderID)))
-      _ <- orderOpt match {
-        case None =>
-          IO(logger.error(s"Order with orderID=${orderID} does not exist")) >>
-          IO.raiseError(new IllegalArgumentException(s"Order with orderID=${orderID} does not exist"))
-        case Some(_) =>
-          IO(logger.info(s"Order with orderID=${orderID} exists"))
-      }
-    } yield ()
-  }
-
   private def validateRiderID(riderID: String)(using PlanContext): IO[Unit] = {
     for {
       _ <- IO(logger.info(s"Validating riderID=${riderID}"))
@@ -105,24 +84,39 @@ case class UpdateRiderPlanner(orderID: String, newRider: String, override val pl
     } yield ()
   }
 
-  private def updateRiderInfo(orderID: String, newRider: String)(using PlanContext): IO[Unit] = {
+  private def assignRider(orderID: String, newRider: String)(using PlanContext): IO[Unit] = {
+    val sql =
+      s"""
+         UPDATE ${schemaName}.order_table
+         SET rider_id = ?, order_status = ?
+         WHERE order_id = ?
+         RETURNING customer_id, merchant_id, rider_id, order_time
+        """
     for {
-      _ <- IO(logger.info(s"Updating riderID to ${newRider} for orderID=${orderID}"))
-      sql <- IO {
-        s"""
-           UPDATE ${schemaName}.order_table
-           SET rider_id = ?
-           WHERE order_id = ?
-          """
-      }
-      result <- writeDB(
+      rows <- readDBRows(
         sql,
         List(
           SqlParameter("String", newRider),
+          SqlParameter("String", OrderStatus.Delivering.toString),
           SqlParameter("String", orderID)
         )
       )
-      _ <- IO(logger.info(s"Successfully updated riderID for orderID=${orderID}. Result: ${result}"))
+      row <- rows.headOption match {
+        case None =>
+          IO(logger.error(s"Order with orderID=${orderID} does not exist")) >>
+          IO.raiseError(new IllegalArgumentException(s"Order with orderID=${orderID} does not exist"))
+        case Some(json) =>
+          IO(logger.info(s"Successfully updated riderID and status for orderID=${orderID}")).as(json)
+      }
+      _ <- afterCommit(publishDispatchEvents(List(DispatchEvent(
+        eventType = DispatchEventType.OrderStatusChanged,
+        orderID = Some(orderID),
+        merchantID = Some(decodeField[String](row, "merchant_id")),
+        orderStatus = Some(OrderStatus.Delivering),
+        orderTime = Some(decodeField[DateTime](row, "order_time")),
+        riderID = Some(newRider)
+      ))))
+      _ <- afterCommit(OrderEventHub.publish(List(orderEvent(orderID, row, OrderStatus.Delivering))))
     } yield ()
   }
-}
\ No newline at end of file
+}
@@ -4,12 +4,12 @@ package Impl
 import Utils.OrderManagementProcess.updateOrderStatus
 import Objects.UserCenter.{UserType, UserInfo}
 import Objects.OrderService.OrderStatus
-import APIs.UserCenter.GetUserInfoByToken
+import Utils.UserInfoCache
 import Common.API.{PlanContext, Planner}
 import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import io.circe._
 import cats.effect.IO
 import cats.implicits._
@@ -42,7 +42,7 @@ case class UpdateStatusPlanner(
   override val planContext: PlanContext
 ) extends Planner[String] {
 
-  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  val logger = TraceLogger(this.getClass, planContext.traceID)
 
   override def plan(using planContext: PlanContext): IO[String] = {
     for {
@@ -60,15 +60,16 @@ case class UpdateStatusPlanner(
 
       // Step 4: Update order status
       _ <- IO(logger.info(s"[Step 4] Updating order status for orderID=${orderID} to newStatus=${newStatus}"))
-      updateResult <- updateOrderStatus(orderID, newStatus)
+      notifications <- updateOrderStatus(orderID, newStatus)
+      _ <- afterCommit(notifications.publish)
 
       // Step 5: Log and return result
-      _ <- IO(logger.info(s"[Step 5] Order status updated successfully for orderID=${orderID}, result=${updateResult}"))
+      _ <- IO(logger.info(s"[Step 5] Order status updated successfully for orderID=${orderID}"))
     } yield "Success"
   }
 
   private def validateUserToken(token: String)(using PlanContext): IO[UserInfo] = {
-    GetUserInfoByToken(token).send.map { userInfo =>
+    UserInfoCache.getUserInfoByToken(token).map { userInfo =>
       logger.info(s"User token is valid. Fetched userInfo: ${userInfo}")
       userInfo
     }
@@ -0,0 +1,54 @@
+package Objects.DispatcherService
+
+import com.fasterxml.jackson.databind.annotation.{JsonDeserialize, JsonSerialize}
+import com.fasterxml.jackson.core.{JsonGenerator, JsonParser}
+import com.fasterxml.jackson.databind.{DeserializationContext, JsonDeserializer, JsonSerializer, SerializerProvider}
+import io.circe.{Decoder, Encoder}
+
+@JsonSerialize(`using` = classOf[DispatchEventTypeSerializer])
+@JsonDeserialize(`using` = classOf[DispatchEventTypeDeserializer])
+enum DispatchEventType(val desc: String):
+
+  override def toString: String = this.desc
+
+  case OrderCreated extends DispatchEventType("订单创建") // 订单创建
+  case OrderStatusChanged extends DispatchEventType("订单状态变更") // 订单状态变更
+  case RiderStatusChanged extends DispatchEventType("骑手状态变更") // 骑手状态变更
+
+
+object DispatchEventType:
+  given encode: Encoder[DispatchEventType] = Encoder.encodeString.contramap[DispatchEventType](toString)
+
+  given decode: Decoder[DispatchEventType] = Decoder.decodeString.emap(fromStringEither)
+
+  def fromString(s: String):DispatchEventType  = s match
+    case "订单创建" => OrderCreated
+    case "订单状态变更" => OrderStatusChanged
+    case "骑手状态变更" => RiderStatusChanged
+    case _ => throw Exception(s"Unknown DispatchEventType: $s")
+
+  def fromStringEither(s: String):Either[String, DispatchEventType]  = s match
+    case "订单创建" => Right(OrderCreated)
+    case "订单状态变更" => Right(OrderStatusChanged)
+    case "骑手状态变更" => Right(RiderStatusChanged)
+    case _ => Left(s"Unknown DispatchEventType: $s")
+
+  def toString(t: DispatchEventType): String = t match
+    case OrderCreated => "订单创建"
+    case OrderStatusChanged => "订单状态变更"
+    case RiderStatusChanged => "骑手状态变更"
+
+
+// Jackson 序列化器
+class DispatchEventTypeSerializer extends JsonSerializer[DispatchEventType] {
+  override def serialize(value: DispatchEventType, gen: JsonGenerator, serializers: SerializerProvider): Unit = {
+    gen.writeString(DispatchEventType.toString(value)) // 直接写出字符串
+  }
+}
+
+// Jackson 反序列化器
+class DispatchEventTypeDeserializer extends JsonDeserializer[DispatchEventType] {
+  override def deserialize(p: JsonParser, ctxt: DeserializationContext): DispatchEventType = {
+    DispatchEventType.fromString(p.getText)
+  }
+}
@@ -0,0 +1,72 @@
+package Objects.OrderService
+
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+
+
+/**
+ * OrderAssignment
+ * desc: 订单分配结果，一条记录表示把一个订单分配给一名骑手
+ * @param orderID: String (订单ID)
+ * @param riderID: String (分配到的骑手ID)
+ */
+
+case class OrderAssignment(
+  orderID: String,
+  riderID: String
+){
+
+  //process class code 预留标志位，不要删除
+
+
+}
+
+
+case object OrderAssignment{
+
+
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[OrderAssignment] = deriveEncoder
+  private val circeDecoder: Decoder[OrderAssignment] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[OrderAssignment] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[OrderAssignment] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[OrderAssignment]() {})) }
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+
+  // Circe + Jackson 兜底的 Encoder
+  given orderAssignmentEncoder: Encoder[OrderAssignment] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given orderAssignmentDecoder: Decoder[OrderAssignment] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+
+  //process object code 预留标志位，不要删除
+
+
+}
+
@@ -2,7 +2,7 @@
 package Process
 
 import Common.API.{API, PlanContext, TraceID}
-import Common.DBAPI.{initSchema, writeDB}
+import Common.DBAPI.{IndexDefinition, initSchema, writeDB}
 import Common.ServiceUtils.schemaName
 import Global.ServerConfig
 import cats.effect.IO
@@ -13,13 +13,27 @@ import Process.ProcessUtils.server2DB
 import Global.GlobalVariables
 
 object Init {
+  /** 订单服务的二级索引，列中带上 order_time 以便按时间排序的查询直接走索引 */
+  val indexes: List[IndexDefinition] = List(
+    IndexDefinition("order_table_customer_time_idx", "order_table", "customer_id, order_time DESC"),
+    IndexDefinition("order_table_merchant_time_idx", "order_table", "merchant_id, order_time DESC"),
+    IndexDefinition("order_table_rider_time_idx", "order_table", "rider_id, order_time DESC"),
+    // GetUnassignedOrders 按状态筛选并按下单时间取单
+    IndexDefinition("order_table_status_time_idx", "order_table", "order_status, order_time"),
+    // 按商品统计销量等分析查询
+    IndexDefinition("order_item_table_product_idx", "order_item_table", "product_id")
+  )
+
   def init(config: ServerConfig): IO[Unit] = {
     given PlanContext = PlanContext(traceID = TraceID(UUID.randomUUID().toString), 0)
     given DBConfig = server2DB(config)
 
     val program: IO[Unit] = for {
       _ <- IO(GlobalVariables.isTest=config.isTest)
-      _ <- API.init(config.maximumClientConnection)
+      _ <- Common.Tracing.init(config.spanExportPath)
+      _ <- Common.Logging.init(config.productionLogging, config.payloadLogSampleRate)
+      _ <- IO(config.elideReadOnlyTransactions.foreach(Common.API.Planner.elideReadOnlyTransactions = _))
+      _ <- IO(config.orderStreamBufferSize.foreach(Utils.OrderEventHub.bufferSize = _))
       _ <- Common.DBAPI.SwitchDataSourceMessage(projectName = Global.ServiceCenter.projectName).send
       _ <- initSchema(schemaName)
             /** 订单表，包含订单的基本信息
@@ -27,7 +41,7 @@ object Init {
        * customer_id: 顾客ID
        * merchant_id: 商家ID
        * rider_id: 骑手ID（可为空）
-       * product_list: 商品信息列表
+       * product_list: 旧版本以 JSON 存放的商品信息列表，迁移后为 "[]"，商品明细见 order_item_table
        * destination_address: 送达地址
        * order_status: 当前订单状态 (WaitingForDish/WaitingForDelivery/Delivering/Completed)
        * order_time: 订单创建时间
@@ -48,6 +62,32 @@ object Init {
         """,
         List()
       )
+      /** 订单商品明细表，每行是订单中的一件商品
+       * order_id: 订单ID
+       * item_index: 商品在订单中的序号，从 0 开始
+       * product_id / merchant_id / name / price / description: 下单时的商品信息快照
+       */
+      _ <- writeDB(
+        s"""
+        CREATE TABLE IF NOT EXISTS "${schemaName}"."order_item_table" (
+            order_id VARCHAR NOT NULL,
+            item_index INT NOT NULL,
+            product_id TEXT NOT NULL,
+            merchant_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            price DOUBLE PRECISION NOT NULL,
+            description TEXT NOT NULL,
+            PRIMARY KEY (order_id, item_index)
+        );
+        """,
+        List()
+      )
+      // 二级索引：缺失的在后台并发建立，不阻塞服务启动，已有 schema 也由此完成迁移
+      _ <- IndexDefinition.ensureIndexes(schemaName, indexes).start
+      // 旧订单的 product_list 在后台拆到 order_item_table；未迁移的订单读取时仍按 JSON 解析
+      _ <- Utils.OrderManagementProcess.migrateLegacyProductLists()
+        .handleErrorWith(err => IO(println(s"[Warning] 迁移 order_item_table 失败：${err.getMessage}")))
+        .start
     } yield ()
 
     program.handleErrorWith(err => IO {
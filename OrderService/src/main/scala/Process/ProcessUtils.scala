@@ -2,10 +2,14 @@ package Process
 
 import Global.ServerConfig
 import Global.DBConfig
+import Global.ServiceCenter
+import Common.API.ClientPool
+import Common.ServiceUtils.serviceName
 import cats.effect.{IO, Resource}
 import io.circe.generic.auto.*
 import io.circe.parser.decode
 
+import scala.concurrent.duration.*
 import scala.io.{BufferedSource, Source}
 
 object ProcessUtils {
@@ -43,6 +47,20 @@ object ProcessUtils {
       maximumServerConnection = serviceConfig.maximumServerConnection
     )
   }
-  
-}
 
+  def server2ClientPool(serviceConfig: ServerConfig): ClientPool.Settings = {
+    val serviceCodes = ServiceCenter.fullNameMap.keys.toList
+    val perTarget = serviceConfig.clientConnectionsPerTarget.getOrElse(Map.empty)
+    ClientPool.Settings(
+      defaultMaxConnections = serviceConfig.maximumClientConnection,
+      maxConnectionsPerTarget = serviceCodes.flatMap(code => perTarget.get(serviceName(code)).map(code -> _)).toMap,
+      idleTimeInPool = serviceConfig.clientIdleTimeInPoolSeconds.getOrElse(60).seconds,
+      idleConnectionTime = 30.seconds,
+      requestTimeout = 30.seconds,
+      http2Targets =
+        if (serviceConfig.http2.contains(true))
+          serviceCodes.filterNot(code => code == ServiceCenter.tongWenDBServiceCode || code == ServiceCenter.tongWenServiceCode).toSet
+        else Set.empty
+    )
+  }
+}
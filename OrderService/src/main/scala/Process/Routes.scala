@@ -1,14 +1,15 @@
 
 package Process
 
-import Common.API.PlanContext
+import Common.API.{PlanContext, PlanRoute}
 import Common.DBAPI.DidRollbackException
+import Common.{Logging, Metrics, Tracing}
+import org.typelevel.ci.CIString
 import cats.effect.*
 import fs2.concurrent.Topic
 import io.circe.*
 import io.circe.derivation.Configuration
 import io.circe.generic.auto.*
-import io.circe.parser.decode
 import io.circe.syntax.*
 import org.http4s.*
 import org.http4s.client.Client
@@ -16,13 +17,17 @@ import org.http4s.dsl.io.*
 import scala.collection.concurrent.TrieMap
 import Common.Serialize.CustomColumnTypes.*
 import Impl.QueryOrdersByUserPlanner
+import Impl.QueryOrdersByUserPagePlanner
 import Impl.CreateOrderPlanner
 import Impl.GetUnassignedOrdersPlanner
 import Impl.UpdateStatusPlanner
 import Impl.UpdateRiderPlanner
 import Impl.UpdateOrderStatusPlanner
 import Impl.GetOrderDetailsPlanner
+import Impl.BatchUpdateRiderPlanner
 import Common.API.TraceID
+import Objects.OrderService.{OrderInfo, OrderPage}
+import Utils.{OrderEventHub, UserInfoCache}
 import org.joda.time.DateTime
 import org.http4s.circe.*
 import java.util.UUID
@@ -31,80 +36,69 @@ import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
 object Routes:
   val projects: TrieMap[String, Topic[IO, String]] = TrieMap.empty
 
-  private def executePlan(messageType: String, str: String): IO[String] =
-    messageType match {
-      case "QueryOrdersByUser" =>
-        IO(
-          decode[QueryOrdersByUserPlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for QueryOrdersByUser[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
-      case "CreateOrder" =>
-        IO(
-          decode[CreateOrderPlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for CreateOrder[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
-      case "GetUnassignedOrders" =>
-        IO(
-          decode[GetUnassignedOrdersPlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetUnassignedOrders[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
-      case "UpdateStatus" =>
-        IO(
-          decode[UpdateStatusPlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for UpdateStatus[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
-      case "UpdateRider" =>
-        IO(
-          decode[UpdateRiderPlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for UpdateRider[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
-      case "UpdateOrderStatus" =>
-        IO(
-          decode[UpdateOrderStatusPlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for UpdateOrderStatus[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
-      case "GetOrderDetails" =>
-        IO(
-          decode[GetOrderDetailsPlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetOrderDetails[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
+  object UserTokenQueryParam extends QueryParamDecoderMatcher[String]("userToken")
 
-      case "test" =>
-        for {
-          output  <- Utils.Test.test(str)(using  PlanContext(TraceID(""), 0))
-        } yield output
-      case _ =>
+  /** 消息名 -> 处理函数，启动时构建一次 */
+  private val planRoutes: Map[String, PlanRoute] = Map(
+    "QueryOrdersByUser" -> PlanRoute[QueryOrdersByUserPlanner, List[OrderInfo]],
+    "QueryOrdersByUserPage" -> PlanRoute[QueryOrdersByUserPagePlanner, OrderPage],
+    "CreateOrder" -> PlanRoute[CreateOrderPlanner, String],
+    "GetUnassignedOrders" -> PlanRoute[GetUnassignedOrdersPlanner, List[OrderInfo]],
+    "UpdateStatus" -> PlanRoute[UpdateStatusPlanner, String],
+    "UpdateRider" -> PlanRoute[UpdateRiderPlanner, String],
+    "UpdateOrderStatus" -> PlanRoute[UpdateOrderStatusPlanner, String],
+    "GetOrderDetails" -> PlanRoute[GetOrderDetailsPlanner, OrderInfo],
+    "BatchUpdateRider" -> PlanRoute[BatchUpdateRiderPlanner, List[String]]
+  )
+
+  private def executePlan(messageType: String, body: JsonObject, planContext: PlanContext): IO[Json] =
+    planRoutes.get(messageType) match {
+      case Some(route) => route.run(messageType, body, planContext)
+      case None if messageType == "test" =>
+        Utils.Test.test(Json.fromJsonObject(body).noSpaces)(using PlanContext(TraceID(""), 0)).map(Json.fromString)
+      case None =>
         IO.raiseError(new Exception(s"Unknown type: $messageType"))
     }
 
-  def handlePostRequest(req: Request[IO]): IO[String] = {
-    req.as[Json].map {
-      bodyJson => {
-        val planContext = PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0)
-        val planContextJson = planContext.asJson
-        val updatedJson = bodyJson.deepMerge(Json.obj("planContext" -> planContextJson))
-        updatedJson.toString
+  /** 为请求分配新的 TraceID，返回 planContext 与解析后的请求体；请求体从字节流直接解析为 JSON，只解析一次 */
+  def readPostRequest(req: Request[IO]): IO[(PlanContext, JsonObject)] =
+    req.as[Json].flatMap { bodyJson =>
+      bodyJson.asObject match {
+        case Some(body) => IO.pure(PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0) -> body)
+        case None => IO.raiseError(new Exception("Request body must be a JSON object"))
       }
     }
-  }
+
   val service: HttpRoutes[IO] = HttpRoutes.of[IO] {
     case GET -> Root / "health" =>
       Ok("OK")
+
+    case GET -> Root / "metrics" =>
+      Ok(Metrics.render)
+
+    case DELETE -> Root / "metrics" =>
+      IO(Metrics.reset()) >> Ok("OK")
+
+    /** 运行时切换日志模式，便于对比两种模式下的吞吐 */
+    case POST -> Root / "logging" / mode =>
+      mode match {
+        case "production" => Logging.setMode(true) >> Ok("OK")
+        case "development" => Logging.setMode(false) >> Ok("OK")
+        case _ => BadRequest(s"Unknown logging mode: $mode".asJson.toString)
+      }
       
+    /** 订阅当前用户（顾客、商家或骑手）相关订单的变更事件，SSE 格式；EventSource 无法带请求头，令牌经查询参数传入 */
+    case GET -> Root / "stream" / "orders" :? UserTokenQueryParam(userToken) =>
+      UserInfoCache.getUserInfoByToken(userToken)(using PlanContext(TraceID(UUID.randomUUID().toString), 0)).attempt.flatMap {
+        case Left(e) =>
+          BadRequest(s"Invalid user token: ${e.getMessage}".asJson.toString)
+        case Right(userInfo) =>
+          OrderEventHub.subscribe(userInfo.userID) match {
+            case Some(stream) => Ok(stream)
+            case None => TooManyRequests(s"Too many order streams for user ${userInfo.userID}".asJson.toString)
+          }
+      }
+
     case GET -> Root / "stream" / projectName =>
       projects.get(projectName) match {
         case Some(topic) =>
@@ -123,8 +117,11 @@ object Routes:
           }
       }
     case req@POST -> Root / "api" / name =>
-      handlePostRequest(req).flatMap {
-        executePlan(name, _)
+      readPostRequest(req).flatMap { (planContext, body) =>
+        val header = (key: String) => req.headers.get(CIString(key)).map(_.head.value)
+        Tracing.continueFrom(header(Tracing.TraceHeader), header(Tracing.ParentSpanHeader)) {
+          Tracing.span(Tracing.Route, name)(Metrics.time(Metrics.Route, name, planContext.traceID)(executePlan(name, body, planContext)))(using planContext)
+        }
       }.flatMap(Ok(_))
       .handleErrorWith {
         case e: DidRollbackException =>
@@ -1,5 +1,6 @@
 package Process
 
+import Common.API.ClientPool
 import Process.Routes.service
 import cats.effect.*
 import com.comcast.ip4s.*
@@ -33,10 +34,12 @@ object Server extends IOApp:
     ProcessUtils.readConfig(args.headOption.getOrElse("server_config.json"))
       .flatMap { config =>
         (for {
+          // 发往各服务的连接池与 server 同生命周期，Init 中的请求也经由它发出
+          _ <- ClientPool.resource(ProcessUtils.server2ClientPool(config))
           _ <- Resource.eval(Init.init(config))
           app <- Resource.eval(CORS.policy.withAllowOriginAll(httpApp))
 
-          server <- EmberServerBuilder.default[IO]
+          builder = EmberServerBuilder.default[IO]
             .withHost(Host.fromString(config.serverIP).getOrElse(
               throw new IllegalArgumentException(s"Invalid IPv4 address: ${config.serverIP}")
             ))
@@ -48,7 +51,7 @@ object Server extends IOApp:
             .withRequestHeaderReceiveTimeout(30.minutes)
             .withMaxConnections(config.maximumServerConnection)
             .withHttpApp(app)
-            .build
+          server <- (if (config.http2.contains(true)) builder.withHttp2 else builder).build
         } yield server)
           .use(_ => IO.never)
           .as(ExitCode.Success)
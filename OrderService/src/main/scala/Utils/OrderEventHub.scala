@@ -0,0 +1,83 @@
+package Utils
+
+import Objects.OrderService.OrderEvent
+import cats.effect.IO
+import cats.effect.std.Queue
+import cats.implicits.*
+import fs2.Stream
+import io.circe.syntax.*
+import org.http4s.ServerSentEvent
+import org.slf4j.LoggerFactory
+
+import java.util.concurrent.atomic.LongAdder
+import scala.collection.concurrent.TrieMap
+import scala.concurrent.duration.*
+
+/**
+ * 按用户划分的订单事件通道，GET /stream/orders 的 SSE 订阅由这里提供。
+ * 订单创建、状态变更、分配骑手的事务提交后，把 OrderEvent 推给该订单的顾客、商家和骑手，客户端不必轮询订单详情。
+ *  - 每个订阅者一个有界队列（bufferSize），发布方只做 tryOffer，慢订阅者不会阻塞下单、改状态等请求
+ *  - 队列满时丢掉该订阅者积压的事件，改发一条 resync 事件，客户端收到后重新查询一次订单即可追上
+ *  - 连接空闲时定期发送注释行作为心跳，避免被代理或浏览器判定超时
+ */
+case object OrderEventHub {
+  private val logger = LoggerFactory.getLogger(getClass)
+
+  /** 每个订阅者最多缓冲的事件数，可通过配置 orderStreamBufferSize 调整 */
+  @volatile var bufferSize: Int = 64
+  /** 每个用户同时保持的订阅数上限，超出时拒绝新的订阅 */
+  val maxSubscriptionsPerUser = 8
+  private val heartbeatInterval = 20.seconds
+
+  private val connected = ServerSentEvent(comment = Some("connected"))
+  private val heartbeat = ServerSentEvent(comment = Some("heartbeat"))
+  private val resync = ServerSentEvent(data = Some("{}"), eventType = Some("resync"))
+
+  private final class Subscription(val queue: Queue[IO, ServerSentEvent])
+
+  private val channels: TrieMap[String, Set[Subscription]] = TrieMap.empty
+  private val overflows = new LongAdder
+
+  def hasSubscribers: Boolean = channels.nonEmpty
+
+  def subscriptionCount(userID: String): Int = channels.get(userID).fold(0)(_.size)
+
+  /** 订阅 userID 的订单事件；订阅数已满时返回 None。流结束（客户端断开）时自动注销 */
+  def subscribe(userID: String): Option[Stream[IO, ServerSentEvent]] =
+    Option.when(subscriptionCount(userID) < maxSubscriptionsPerUser) {
+      Stream.eval(Queue.bounded[IO, ServerSentEvent](bufferSize.max(1))).flatMap { queue =>
+        val subscription = new Subscription(queue)
+        Stream.bracket(IO(register(userID, subscription)))(_ => IO(unregister(userID, subscription))) >>
+          (Stream.emit(connected) ++ Stream.fromQueueUnterminated(queue))
+            .mergeHaltL(Stream.awakeEvery[IO](heartbeatInterval).as(heartbeat))
+      }
+    }
+
+  private def register(userID: String, subscription: Subscription): Unit =
+    channels.updateWith(userID)(current => Some(current.getOrElse(Set.empty) + subscription))
+
+  private def unregister(userID: String, subscription: Subscription): Unit =
+    channels.updateWith(userID)(_.map(_ - subscription).filter(_.nonEmpty))
+
+  /** 把事件推给订单的顾客、商家和骑手；不会阻塞，也不会失败 */
+  def publish(events: List[OrderEvent]): IO[Unit] =
+    IO.whenA(hasSubscribers) {
+      events.traverse_ { event =>
+        val message = ServerSentEvent(data = Some(event.asJson.noSpaces))
+        (List(event.customerID, event.merchantID) ++ event.riderID)
+          .filter(_.nonEmpty).distinct
+          .flatMap(userID => channels.getOrElse(userID, Set.empty))
+          .traverse_(offer(_, message))
+      }
+    }
+
+  private def offer(subscription: Subscription, message: ServerSentEvent): IO[Unit] =
+    subscription.queue.tryOffer(message).flatMap {
+      case true => IO.unit
+      case false =>
+        subscription.queue.tryTakeN(None) >> subscription.queue.tryOffer(resync) >> IO {
+          overflows.increment()
+          logger.warn(s"订单事件订阅者积压超过 ${bufferSize} 条，已丢弃积压并要求客户端重新同步（累计 ${overflows.sum()} 次）")
+        }
+    }
+}
@@ -10,6 +10,7 @@ import Common.ServiceUtils.schemaName
 import org.slf4j.LoggerFactory
 import Objects.OrderService.OrderStatus
 import Objects.OrderService.OrderInfo
+import Objects.OrderService.OrderEvent
 import Objects.ProductService.ProductInfo
 import Common.API.{PlanContext, Planner}
 import Common.Object.SqlParameter
@@ -20,11 +21,134 @@ import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
 import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
 import Common.API.PlanContext
 import Common.Object.{ParameterList, SqlParameter}
+import APIs.DispatcherService.PublishDispatchEvents
+import Objects.DispatcherService.{DispatchEvent, DispatchEventType}
+
+/** 订单写操作产生的通知，须在事务提交后推送：由 planner 通过 afterCommit 登记 publish */
+case class OrderNotifications(dispatchEvents: List[DispatchEvent] = Nil, orderEvents: List[OrderEvent] = Nil) {
+  def publish(using PlanContext): IO[Unit] =
+    OrderManagementProcess.publishDispatchEvents(dispatchEvents) >> OrderEventHub.publish(orderEvents)
+}
 
 case object OrderManagementProcess {
   private val logger = LoggerFactory.getLogger(getClass)
   //process plan code 预留标志位，不要删除
   
+  /** order_table 的全部列，查询时用 orderFields.selectList 作为列清单，解码时按预先算好的字段名取值 */
+  val orderFields: FieldMapping = FieldMapping(
+    "order_id", "customer_id", "merchant_id", "rider_id", "product_list", "destination_address", "order_status", "order_time"
+  )
+
+  /** order_item_table 的列，一行是订单中的一件商品 */
+  val orderItemFields: FieldMapping = FieldMapping(
+    "order_id", "item_index", "product_id", "merchant_id", "name", "price", "description"
+  )
+
+  /** 商品明细已迁到 order_item_table 后 product_list 列保留的值 */
+  val migratedProductList = "[]"
+
+  /** 每次按订单号批量读取商品明细时 IN 列表的最大长度 */
+  private val itemFetchBatchSize = 500
+
+  /**
+   * 把 order_table 的一行（含全部列）解码为 OrderInfo。
+   * 商品明细存放在 order_item_table，需要再经 attachOrderItems 补全；
+   * 这里只解析尚未迁移的旧订单在 product_list 中的 JSON。
+   */
+  def decodeOrderRow(row: Json): OrderInfo = {
+    val productList = orderFields.get[String](row, "product_list")
+    OrderInfo(
+      orderID = orderFields.get[String](row, "order_id"),
+      customerID = orderFields.get[String](row, "customer_id"),
+      merchantID = orderFields.get[String](row, "merchant_id"),
+      riderID = orderFields.get[Option[String]](row, "rider_id"),
+      productList = if (productList == migratedProductList) Nil else decodeType[List[ProductInfo]](productList),
+      destinationAddress = orderFields.get[String](row, "destination_address"),
+      orderStatus = OrderStatus.fromString(orderFields.get[String](row, "order_status")),
+      orderTime = orderFields.get[DateTime](row, "order_time")
+    )
+  }
+
+  /** 按订单号批量读取商品明细，返回 订单号 -> 按下单顺序排列的商品 */
+  def fetchOrderItems(orderIDs: List[String])(using PlanContext): IO[Map[String, List[ProductInfo]]] =
+    orderIDs.distinct.grouped(itemFetchBatchSize).toList.traverse { batch =>
+      val sql =
+        s"""
+           |SELECT ${orderItemFields.selectList}
+           |FROM ${schemaName}.order_item_table
+           |WHERE order_id IN (${batch.map(_ => "?").mkString(", ")})
+           |ORDER BY order_id, item_index
+         """.stripMargin
+      readDBRows(sql, batch.map(SqlParameter("String", _)))
+    }.map { batches =>
+      batches.flatten.groupMap(row => orderItemFields.get[String](row, "order_id")) { row =>
+        ProductInfo(
+          productID = orderItemFields.get[String](row, "product_id"),
+          merchantID = orderItemFields.get[String](row, "merchant_id"),
+          name = orderItemFields.get[String](row, "name"),
+          price = orderItemFields.get[Double](row, "price"),
+          description = orderItemFields.get[String](row, "description")
+        )
+      }
+    }
+
+  /** 为 decodeOrderRow 得到的订单补全 order_item_table 中的商品明细，一批订单只发一次查询 */
+  def attachOrderItems(orders: List[OrderInfo])(using PlanContext): IO[List[OrderInfo]] =
+    if (orders.isEmpty) IO.pure(orders)
+    else fetchOrderItems(orders.map(_.orderID)).map { items =>
+      orders.map(order => items.get(order.orderID).fold(order)(list => order.copy(productList = list)))
+    }
+
+  /** 批量写入一个订单的商品明细 */
+  def insertOrderItems(orderID: String, productList: List[ProductInfo])(using PlanContext): IO[String] = {
+    val sql =
+      s"""
+         |INSERT INTO ${schemaName}.order_item_table (${orderItemFields.selectList})
+         |VALUES (?, ?, ?, ?, ?, ?, ?)
+         |ON CONFLICT (order_id, item_index) DO NOTHING
+       """.stripMargin
+    writeDBList(sql, productList.zipWithIndex.map { (product, index) =>
+      ParameterList(List(
+        SqlParameter("String", orderID),
+        SqlParameter("Int", index.toString),
+        SqlParameter("String", product.productID),
+        SqlParameter("String", product.merchantID),
+        SqlParameter("String", product.name),
+        SqlParameter("Double", product.price.toString),
+        SqlParameter("String", product.description)
+      ))
+    })
+  }
+
+  /**
+   * 把旧订单 product_list 中的 JSON 拆到 order_item_table，随后把 product_list 置为 "[]"。
+   * 每批先写明细再改标记，中途失败重跑时已写入的明细会被 ON CONFLICT 跳过，可以重复执行。
+   */
+  def migrateLegacyProductLists(batchSize: Int = 500)(using PlanContext): IO[Int] = {
+    val selectSql =
+      s"""
+         |SELECT order_id, product_list
+         |FROM ${schemaName}.order_table
+         |WHERE product_list <> ?
+         |LIMIT ?
+       """.stripMargin
+    val markSql = s"UPDATE ${schemaName}.order_table SET product_list = ? WHERE order_id = ?"
+
+    def loop(migrated: Int): IO[Int] =
+      readDBRows(selectSql, List(SqlParameter("String", migratedProductList), SqlParameter("Int", batchSize.toString))).flatMap { rows =>
+        if (rows.isEmpty) IO.pure(migrated)
+        else {
+          val orders = rows.map(row => decodeField[String](row, "order_id") -> decodeType[List[ProductInfo]](decodeField[String](row, "product_list")))
+          orders.traverse_((orderID, productList) => IO.whenA(productList.nonEmpty)(insertOrderItems(orderID, productList).void)) >>
+            writeDBList(markSql, orders.map((orderID, _) => ParameterList(List(SqlParameter("String", migratedProductList), SqlParameter("String", orderID))))) >>
+            IO(logger.info(s"Migrated product lists of ${migrated + orders.size} orders to order_item_table")) >>
+            loop(migrated + orders.size)
+        }
+      }
+
+    loop(0)
+  }
+
   def queryOrdersByUserID(userID: String)(using PlanContext): IO[List[OrderInfo]] = {
     // Step 1: Validate input parameter
     if (userID.isEmpty) {
@@ -32,7 +156,7 @@ case object OrderManagementProcess {
     } else {
       val querySql = 
         s"""
-  SELECT order_id, customer_id, merchant_id, rider_id, product_list, destination_address, order_status, order_time
+  SELECT ${orderFields.selectList}
   FROM ${schemaName}.order_table
   WHERE customer_id = ? OR merchant_id = ? OR rider_id = ?;
   """.stripMargin
@@ -53,33 +177,8 @@ case object OrderManagementProcess {
         // Log number of rows fetched
         _ <- IO(logger.info(s"Fetched ${rows.size} rows from the database"))
   
-        // Map the results to List[OrderInfo]
-        orders <- IO {
-          rows.map { row =>
-            val orderID = decodeField[String](row, "order_id")
-            val customerID = decodeField[String](row, "customer_id")
-            val merchantID = decodeField[String](row, "merchant_id")
-            val riderID = decodeField[Option[String]](row, "rider_id")
-            val productList = decodeField[List[ProductInfo]](row, "product_list")
-            val destinationAddress = decodeField[String](row, "destination_address")
-            val orderStatusStr = decodeField[String](row, "order_status")
-            val orderStatus = OrderStatus.fromString(orderStatusStr)
-            val orderTimeMillis = decodeField[Long](row, "order_time")
-            val orderTime = new DateTime(orderTimeMillis)
-  
-            // Construct and return the OrderInfo object
-            OrderInfo(
-              orderID = orderID,
-              customerID = customerID,
-              merchantID = merchantID,
-              riderID = riderID,
-              productList = productList,
-              destinationAddress = destinationAddress,
-              orderStatus = orderStatus,
-              orderTime = orderTime
-            )
-          }
-        }
+        // Map the results to List[OrderInfo], then fetch the items of all orders in one batch
+        orders <- attachOrderItems(rows.map(decodeOrderRow))
   
         // Log the number of orders mapped
         _ <- IO(logger.info(s"Successfully mapped ${orders.size} orders for userID: ${userID}"))
@@ -87,7 +186,8 @@ case object OrderManagementProcess {
     }
   }
   
-  def updateOrderStatus(orderID: String, newStatus: OrderStatus)(using PlanContext): IO[String] = {
+  /** 更新订单状态，返回的通知由调用方在事务提交后推送 */
+  def updateOrderStatus(orderID: String, newStatus: OrderStatus)(using PlanContext): IO[OrderNotifications] = {
   // val logger = LoggerFactory.getLogger(getClass)  // 同文后端处理: logger 统一
   
     for {
@@ -110,7 +210,7 @@ case object OrderManagementProcess {
       _ <- IO(logger.info(s"Checking if order with orderID=${orderID} exists in the database"))
       querySql <- IO {
         s"""
-  SELECT order_status
+  SELECT order_status, customer_id, merchant_id, rider_id, order_time
   FROM ${schemaName}.order_table
   WHERE order_id = ?
            """.stripMargin
@@ -141,12 +241,24 @@ case object OrderManagementProcess {
       }
       updateResult <- writeDB(updateSql, updateParams)
   
-      // Step 4: Log the update result and return success
+      // Step 4: Log the update result and notify the dispatcher
       _ <- IO(logger.info(s"Order status update result: ${updateResult}"))
-    } yield "Success"
+    } yield OrderNotifications(
+      dispatchEvents = orderOpt.toList.map { row =>
+        DispatchEvent(
+          eventType = DispatchEventType.OrderStatusChanged,
+          orderID = Some(orderID),
+          merchantID = Some(decodeField[String](row, "merchant_id")),
+          orderStatus = Some(newStatus),
+          orderTime = Some(new DateTime(decodeField[Long](row, "order_time")))
+        )
+      },
+      orderEvents = orderOpt.toList.map(row => orderEvent(orderID, row, newStatus))
+    )
   }
   
-  def createOrderRecord(orderInfo: OrderInfo)(using PlanContext): IO[String] = {
+  /** 写入订单记录，返回订单ID与需要在事务提交后推送的通知 */
+  def createOrderRecord(orderInfo: OrderInfo)(using PlanContext): IO[(String, OrderNotifications)] = {
     // Logger initialization
   // val logger = LoggerFactory.getLogger(getClass)  // 同文后端处理: logger 统一
   
@@ -187,18 +299,56 @@ case object OrderManagementProcess {
           SqlParameter("String", orderInfo.customerID),
           SqlParameter("String", orderInfo.merchantID),
           SqlParameter("String", orderInfo.riderID.getOrElse("")), // Option field
-          SqlParameter("String", orderInfo.productList.asJson.noSpaces), // Convert List[ProductInfo] to JSON
+          SqlParameter("String", migratedProductList), // 商品明细写入 order_item_table
           SqlParameter("String", orderInfo.destinationAddress),
           SqlParameter("String", orderInfo.orderStatus.toString), // Enum to string
           SqlParameter("DateTime", orderInfo.orderTime.getMillis.toString)
         )
   
         IO(logger.info(s"Executing SQL to insert order record: SQL=${sql}, parameters=${parameters.map(_.value).mkString(", ")}")) >>
-          writeDB(sql, parameters).map { result =>
+          writeDB(sql, parameters).flatTap(_ => insertOrderItems(orderID, orderInfo.productList)).map { result =>
             logger.info(s"Insert operation result: ${result}")
             // Step 4: Return the generated order ID
-            orderID
+            orderID -> OrderNotifications(
+              dispatchEvents = List(DispatchEvent(
+                eventType = DispatchEventType.OrderCreated,
+                orderID = Some(orderID),
+                merchantID = Some(orderInfo.merchantID),
+                orderStatus = Some(orderInfo.orderStatus),
+                orderTime = Some(orderInfo.orderTime)
+              )),
+              orderEvents = List(OrderEvent(
+                orderID = orderID,
+                customerID = orderInfo.customerID,
+                merchantID = orderInfo.merchantID,
+                riderID = orderInfo.riderID.filter(_.nonEmpty),
+                orderStatus = orderInfo.orderStatus,
+                eventTime = DateTime.now()
+              ))
+            )
           }
       }
   }
+
+  /** 由含 customer_id / merchant_id / rider_id 的一行构造推送给用户的订单事件 */
+  def orderEvent(orderID: String, row: Json, orderStatus: OrderStatus): OrderEvent =
+    OrderEvent(
+      orderID = orderID,
+      customerID = decodeField[String](row, "customer_id"),
+      merchantID = decodeField[String](row, "merchant_id"),
+      riderID = decodeField[Option[String]](row, "rider_id").filter(_.nonEmpty),
+      orderStatus = orderStatus,
+      eventTime = DateTime.now()
+    )
+
+  /**
+   * 把订单事件异步推送给调度服务，不等待结果，推送失败只记录日志，不影响当前请求。
+   * 只应在事务提交后调用（见 Planner.afterCommit），否则调度服务可能收到随后被回滚的变更。
+   * 调度服务会定期全量对账，个别事件丢失只会推迟分配，不会造成错误分配。
+   */
+  def publishDispatchEvents(events: List[DispatchEvent])(using PlanContext): IO[Unit] =
+    if (events.isEmpty) IO.unit
+    else PublishDispatchEvents(events).send
+      .handleErrorWith(e => IO(logger.warn(s"Failed to publish ${events.size} dispatch events: ${e.getMessage}")))
+      .start.void
 }
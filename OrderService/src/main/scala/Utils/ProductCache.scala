@@ -0,0 +1,38 @@
+package Utils
+
+import APIs.ProductService.FetchProductsByIDsMessage
+import Common.API.PlanContext
+import Common.TtlCache
+import Objects.ProductService.ProductInfo
+import cats.effect.IO
+import cats.implicits.*
+
+/**
+ * 下单校验用的 productID -> ProductInfo 缓存，缺失的商品按商家合并成一次 FetchProductsByIDsMessage 回源。
+ * 商品只能新增和删除，不会原地改价，缓存只需要保证已删除的商品在 ttlMillis 后不再能下单。
+ */
+case object ProductCache {
+  private val maxEntries = 20000
+  private val ttlMillis = 10 * 1000L
+  /** 与 ProductService 的 FetchProductsByIDsMessagePlanner.maxProductIDs 保持一致 */
+  private val fetchBatchSize = 500
+
+  private val cache = new TtlCache[String, ProductInfo](maxEntries)
+
+  /** 查询某个商家的一批商品，返回 productID -> ProductInfo；不存在或不属于该商家的ID不在结果中 */
+  def getProducts(merchantID: String, productIDs: List[String])(using PlanContext): IO[Map[String, ProductInfo]] =
+    IO {
+      productIDs.distinct.map(id => id -> cache.get(id).filter(_.merchantID == merchantID))
+    }.flatMap { lookups =>
+      val cached = lookups.collect { case (id, Some(product)) => id -> product }.toMap
+      val missing = lookups.collect { case (id, None) => id }
+      if (missing.isEmpty) IO.pure(cached)
+      else missing.grouped(fetchBatchSize).toList.flatTraverse(batch => FetchProductsByIDsMessage(merchantID, batch).send).flatMap { fetched =>
+        IO {
+          val expireAt = System.currentTimeMillis() + ttlMillis
+          fetched.foreach(product => cache.put(product.productID, product, expireAt))
+          cached ++ fetched.map(product => product.productID -> product)
+        }
+      }
+    }
+}
@@ -0,0 +1,21 @@
+/**
+ * PublishDispatchEvents
+ * desc: 向调度服务推送一批状态变更事件，调度服务据此增量维护待分配订单与空闲骑手队列，并立即触发一轮分配
+ * @param events: DispatchEvent (状态变更事件列表)
+ * @return successOrNot: String (接收成功与否)
+ */
+import { TongWenMessage } from 'Plugins/TongWenAPI/TongWenMessage'
+import { DispatchEvent } from 'Plugins/DispatcherService/Objects/DispatchEvent';
+
+
+export class PublishDispatchEvents extends TongWenMessage {
+    constructor(
+        public  events: DispatchEvent[]
+    ) {
+        super()
+    }
+    getAddress(): string {
+        return "127.0.0.1:10013"
+    }
+}
+
@@ -0,0 +1,33 @@
+/**
+ * DispatchEvent
+ * desc: 调度相关的状态变更事件，由订单服务和用户中心推送给调度服务
+ * @param eventType: DispatchEventType (事件类型)
+ * @param orderID: String (订单ID，订单事件必填)
+ * @param merchantID: String (订单所属商家ID，订单进入等待分配状态时必填)
+ * @param orderStatus: OrderStatus (变更后的订单状态，订单事件必填)
+ * @param orderTime: DateTime (订单创建时间，订单进入等待分配状态时必填)
+ * @param riderID: String (骑手ID，骑手事件必填)
+ * @param riderStatus: RiderStatus (变更后的骑手状态，骑手事件必填)
+ */
+import { Serializable } from 'Plugins/CommonUtils/Send/Serializable'
+
+import { DispatchEventType } from 'Plugins/DispatcherService/Objects/DispatchEventType';
+import { OrderStatus } from 'Plugins/OrderService/Objects/OrderStatus';
+import { RiderStatus } from 'Plugins/UserCenter/Objects/RiderStatus';
+
+
+export class DispatchEvent extends Serializable {
+    constructor(
+        public  eventType: DispatchEventType,
+        public  orderID: string | null,
+        public  merchantID: string | null,
+        public  orderStatus: OrderStatus | null,
+        public  orderTime: number | null,
+        public  riderID: string | null,
+        public  riderStatus: RiderStatus | null
+    ) {
+        super()
+    }
+}
+
+
@@ -0,0 +1,11 @@
+export enum DispatchEventType {
+    OrderCreated = '订单创建',
+    OrderStatusChanged = '订单状态变更',
+    RiderStatusChanged = '骑手状态变更'
+}
+
+export const dispatchEventTypeList = Object.values(DispatchEventType)
+
+export function getDispatchEventType(newType: string): DispatchEventType {
+    return dispatchEventTypeList.filter(t => t === newType)[0]
+}
@@ -0,0 +1,21 @@
+/**
+ * BatchUpdateRider
+ * desc: 在同一个事务中批量为订单分配骑手，并把订单状态更新为正在配送；只会更新仍处于等待分配骑手状态的订单
+ * @param assignments: OrderAssignment (订单分配列表，每一项包含订单ID与骑手ID)
+ * @return assignedOrderIDs: String (实际分配了骑手的订单ID；已取消或已被分配的订单不在其中)
+ */
+import { TongWenMessage } from 'Plugins/TongWenAPI/TongWenMessage'
+import { OrderAssignment } from 'Plugins/OrderService/Objects/OrderAssignment';
+
+
+export class BatchUpdateRider extends TongWenMessage {
+    constructor(
+        public  assignments: OrderAssignment[]
+    ) {
+        super()
+    }
+    getAddress(): string {
+        return "127.0.0.1:10011"
+    }
+}
+
@@ -0,0 +1,31 @@
+/**
+ * QueryOrdersByUserPage
+ * desc: 通过用户令牌分页查询用户的订单，按下单时间倒序，可按状态和时间范围筛选
+ * @param userToken: String (用户令牌，用于标识并验证当前访问的用户身份)
+ * @param pageSize: Int (每页订单数，默认 20，最大 100)
+ * @param cursor: String (上一页返回的 nextCursor，为空时从最新的订单开始)
+ * @param orderStatus: OrderStatus (只返回该状态的订单)
+ * @param startTime: DateTime (下单时间下界，包含)
+ * @param endTime: DateTime (下单时间上界，不包含)
+ * @return orderPage: OrderPage (本页订单与下一页游标)
+ */
+import { TongWenMessage } from 'Plugins/TongWenAPI/TongWenMessage'
+import { OrderStatus } from 'Plugins/OrderService/Objects/OrderStatus';
+
+
+export class QueryOrdersByUserPage extends TongWenMessage {
+    constructor(
+        public  userToken: string,
+        public  pageSize: number | null,
+        public  cursor: string | null,
+        public  orderStatus: OrderStatus | null,
+        public  startTime: number | null,
+        public  endTime: number | null
+    ) {
+        super()
+    }
+    getAddress(): string {
+        return "127.0.0.1:10011"
+    }
+}
+
@@ -0,0 +1,20 @@
+/**
+ * OrderAssignment
+ * desc: 订单分配结果，一条记录表示把一个订单分配给一名骑手
+ * @param orderID: String (订单ID)
+ * @param riderID: String (分配到的骑手ID)
+ */
+import { Serializable } from 'Plugins/CommonUtils/Send/Serializable'
+
+
+
+export class OrderAssignment extends Serializable {
+    constructor(
+        public  orderID: string,
+        public  riderID: string
+    ) {
+        super()
+    }
+}
+
+
@@ -0,0 +1,29 @@
+/**
+ * OrderEvent
+ * desc: 推送给顾客、商家和骑手的订单变更事件，经 GET /stream/orders 以 SSE 推送
+ * @param orderID: String (订单ID)
+ * @param customerID: String (顾客ID)
+ * @param merchantID: String (商家ID)
+ * @param riderID: String (骑手ID（空表示未分配）)
+ * @param orderStatus: OrderStatus (变更后的订单状态)
+ * @param eventTime: DateTime (事件发生时间)
+ */
+import { Serializable } from 'Plugins/CommonUtils/Send/Serializable'
+
+import { OrderStatus } from 'Plugins/OrderService/Objects/OrderStatus';
+
+
+export class OrderEvent extends Serializable {
+    constructor(
+        public  orderID: string,
+        public  customerID: string,
+        public  merchantID: string,
+        public  riderID: string | null,
+        public  orderStatus: OrderStatus,
+        public  eventTime: number
+    ) {
+        super()
+    }
+}
+
+
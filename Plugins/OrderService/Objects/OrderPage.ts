@@ -0,0 +1,21 @@
+/**
+ * OrderPage
+ * desc: 按时间倒序分页的订单列表
+ * @param orders: OrderInfo (本页订单，按下单时间倒序)
+ * @param nextCursor: String (下一页游标，没有更多订单时为空)
+ */
+import { Serializable } from 'Plugins/CommonUtils/Send/Serializable'
+
+import { OrderInfo } from 'Plugins/OrderService/Objects/OrderInfo';
+
+
+export class OrderPage extends Serializable {
+    constructor(
+        public  orders: OrderInfo[],
+        public  nextCursor: string | null
+    ) {
+        super()
+    }
+}
+
+
@@ -0,0 +1,22 @@
+/**
+ * FetchProductsByIDsMessage
+ * desc: 按商品ID批量查询某个商家的商品，一次查询返回所有存在的商品
+ * @param merchantID: String (商家ID，只返回属于该商家的商品)
+ * @param productIDs: String (要查询的商品ID列表，至多 500 个)
+ * @return products: ProductInfo:1065 (查到的商品，不存在或不属于该商家的ID不会出现在结果中)
+ */
+import { TongWenMessage } from 'Plugins/TongWenAPI/TongWenMessage'
+
+
+export class FetchProductsByIDsMessage extends TongWenMessage {
+    constructor(
+        public  merchantID: string,
+        public  productIDs: string[]
+    ) {
+        super()
+    }
+    getAddress(): string {
+        return "127.0.0.1:10012"
+    }
+}
+
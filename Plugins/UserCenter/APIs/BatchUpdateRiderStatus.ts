@@ -0,0 +1,23 @@
+/**
+ * BatchUpdateRiderStatus
+ * desc: 在同一个事务中批量更新骑手状态，供调度服务在分配订单后使用
+ * @param riderIDs: String (需要更新状态的骑手ID列表)
+ * @param newStatus: RiderStatus (需要更新的新骑手状态)
+ * @return successOrNot: String (更新成功与否)
+ */
+import { TongWenMessage } from 'Plugins/TongWenAPI/TongWenMessage'
+import { RiderStatus } from 'Plugins/UserCenter/Objects/RiderStatus';
+
+
+export class BatchUpdateRiderStatus extends TongWenMessage {
+    constructor(
+        public  riderIDs: string[],
+        public  newStatus: RiderStatus
+    ) {
+        super()
+    }
+    getAddress(): string {
+        return "127.0.0.1:10010"
+    }
+}
+
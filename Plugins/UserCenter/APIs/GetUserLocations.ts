@@ -0,0 +1,20 @@
+/**
+ * GetUserLocations
+ * desc: 批量查询用户的位置坐标，没有登记位置的用户不会出现在结果中
+ * @param userIDs: String (需要查询位置的用户ID列表)
+ * @return locations: UserLocation (已登记位置的用户坐标列表)
+ */
+import { TongWenMessage } from 'Plugins/TongWenAPI/TongWenMessage'
+
+
+export class GetUserLocations extends TongWenMessage {
+    constructor(
+        public  userIDs: string[]
+    ) {
+        super()
+    }
+    getAddress(): string {
+        return "127.0.0.1:10010"
+    }
+}
+
@@ -0,0 +1,24 @@
+/**
+ * UpdateUserLocation
+ * desc: 更新当前用户的位置坐标，骑手用于上报实时位置，商家用于登记门店位置
+ * @param userToken: String (用户令牌，用于验证用户身份)
+ * @param latitude: Double (纬度，取值范围 [-90, 90])
+ * @param longitude: Double (经度，取值范围 [-180, 180])
+ * @return successOrNot: String (更新成功与否)
+ */
+import { TongWenMessage } from 'Plugins/TongWenAPI/TongWenMessage'
+
+
+export class UpdateUserLocation extends TongWenMessage {
+    constructor(
+        public  userToken: string,
+        public  latitude: number,
+        public  longitude: number
+    ) {
+        super()
+    }
+    getAddress(): string {
+        return "127.0.0.1:10010"
+    }
+}
+
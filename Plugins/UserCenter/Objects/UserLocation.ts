@@ -0,0 +1,22 @@
+/**
+ * UserLocation
+ * desc: 用户的位置坐标（WGS84），骑手上报当前位置，商家登记门店位置
+ * @param userID: String (用户ID)
+ * @param latitude: Double (纬度)
+ * @param longitude: Double (经度)
+ */
+import { Serializable } from 'Plugins/CommonUtils/Send/Serializable'
+
+
+
+export class UserLocation extends Serializable {
+    constructor(
+        public  userID: string,
+        public  latitude: number,
+        public  longitude: number
+    ) {
+        super()
+    }
+}
+
+
@@ -0,0 +1,75 @@
+package APIs.OrderService
+
+import Common.API.API
+import Global.ServiceCenter.OrderServiceCode
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+import Objects.OrderService.OrderPage
+import Objects.OrderService.OrderStatus
+
+/**
+ * QueryOrdersByUserPage
+ * desc: 通过用户令牌分页查询用户的订单，按下单时间倒序，可按状态和时间范围筛选
+ * @param userToken: String (用户令牌，用于标识并验证当前访问的用户身份)
+ * @param pageSize: Int (每页订单数，默认 20，最大 100)
+ * @param cursor: String (上一页返回的 nextCursor，为空时从最新的订单开始)
+ * @param orderStatus: OrderStatus (只返回该状态的订单)
+ * @param startTime: DateTime (下单时间下界，包含)
+ * @param endTime: DateTime (下单时间上界，不包含)
+ * @return orderPage: OrderPage (本页订单与下一页游标)
+ */
+
+case class QueryOrdersByUserPage(
+  userToken: String,
+  pageSize: Option[Int] = None,
+  cursor: Option[String] = None,
+  orderStatus: Option[OrderStatus] = None,
+  startTime: Option[DateTime] = None,
+  endTime: Option[DateTime] = None
+) extends API[OrderPage](OrderServiceCode)
+
+
+
+case object QueryOrdersByUserPage{
+
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[QueryOrdersByUserPage] = deriveEncoder
+  private val circeDecoder: Decoder[QueryOrdersByUserPage] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[QueryOrdersByUserPage] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[QueryOrdersByUserPage] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[QueryOrdersByUserPage]() {})) }
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+
+  // Circe + Jackson 兜底的 Encoder
+  given queryOrdersByUserPageEncoder: Encoder[QueryOrdersByUserPage] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given queryOrdersByUserPageDecoder: Decoder[QueryOrdersByUserPage] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+}
+
@@ -0,0 +1,66 @@
+package APIs.ProductService
+
+import Common.API.API
+import Global.ServiceCenter.ProductServiceCode
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+import Objects.ProductService.ProductInfo
+
+/**
+ * FetchProductsByIDsMessage
+ * desc: 按商品ID批量查询某个商家的商品，一次查询返回所有存在的商品
+ * @param merchantID: String (商家ID，只返回属于该商家的商品)
+ * @param productIDs: String (要查询的商品ID列表，至多 500 个)
+ * @return products: ProductInfo:1065 (查到的商品，不存在或不属于该商家的ID不会出现在结果中)
+ */
+
+case class FetchProductsByIDsMessage(
+  merchantID: String,
+  productIDs: List[String]
+) extends API[List[ProductInfo]](ProductServiceCode)
+
+
+
+case object FetchProductsByIDsMessage{
+
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[FetchProductsByIDsMessage] = deriveEncoder
+  private val circeDecoder: Decoder[FetchProductsByIDsMessage] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[FetchProductsByIDsMessage] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[FetchProductsByIDsMessage] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[FetchProductsByIDsMessage]() {})) }
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+
+  // Circe + Jackson 兜底的 Encoder
+  given fetchProductsByIDsMessageEncoder: Encoder[FetchProductsByIDsMessage] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given fetchProductsByIDsMessageDecoder: Decoder[FetchProductsByIDsMessage] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+}
+
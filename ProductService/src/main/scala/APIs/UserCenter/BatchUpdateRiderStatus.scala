@@ -0,0 +1,66 @@
+package APIs.UserCenter
+
+import Common.API.API
+import Global.ServiceCenter.UserCenterCode
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+import Objects.UserCenter.RiderStatus
+
+/**
+ * BatchUpdateRiderStatus
+ * desc: 在同一个事务中批量更新骑手状态，供调度服务在分配订单后使用
+ * @param riderIDs: String (需要更新状态的骑手ID列表)
+ * @param newStatus: RiderStatus (需要更新的新骑手状态)
+ * @return successOrNot: String (更新成功与否)
+ */
+
+case class BatchUpdateRiderStatus(
+  riderIDs: List[String],
+  newStatus: RiderStatus
+) extends API[String](UserCenterCode)
+
+
+
+case object BatchUpdateRiderStatus{
+
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[BatchUpdateRiderStatus] = deriveEncoder
+  private val circeDecoder: Decoder[BatchUpdateRiderStatus] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[BatchUpdateRiderStatus] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[BatchUpdateRiderStatus] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[BatchUpdateRiderStatus]() {})) }
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+
+  // Circe + Jackson 兜底的 Encoder
+  given batchUpdateRiderStatusEncoder: Encoder[BatchUpdateRiderStatus] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given batchUpdateRiderStatusDecoder: Decoder[BatchUpdateRiderStatus] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+}
+
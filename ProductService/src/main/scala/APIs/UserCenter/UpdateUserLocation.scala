@@ -0,0 +1,68 @@
+package APIs.UserCenter
+
+import Common.API.API
+import Global.ServiceCenter.UserCenterCode
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+
+
+/**
+ * UpdateUserLocation
+ * desc: 更新当前用户的位置坐标，骑手用于上报实时位置，商家用于登记门店位置
+ * @param userToken: String (用户令牌，用于验证用户身份)
+ * @param latitude: Double (纬度，取值范围 [-90, 90])
+ * @param longitude: Double (经度，取值范围 [-180, 180])
+ * @return successOrNot: String (更新成功与否)
+ */
+
+case class UpdateUserLocation(
+  userToken: String,
+  latitude: Double,
+  longitude: Double
+) extends API[String](UserCenterCode)
+
+
+
+case object UpdateUserLocation{
+
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[UpdateUserLocation] = deriveEncoder
+  private val circeDecoder: Decoder[UpdateUserLocation] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[UpdateUserLocation] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[UpdateUserLocation] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[UpdateUserLocation]() {})) }
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+
+  // Circe + Jackson 兜底的 Encoder
+  given updateUserLocationEncoder: Encoder[UpdateUserLocation] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given updateUserLocationDecoder: Decoder[UpdateUserLocation] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+}
+
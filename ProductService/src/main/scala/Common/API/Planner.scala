@@ -1,24 +1,60 @@
 package Common.API
 
 import Common.DBAPI.startTransaction
+import Common.{Logging, Tracing}
 import cats.effect.IO
+import cats.implicits.*
 import io.circe.Encoder
 
+import java.util.concurrent.ConcurrentLinkedQueue
+
 trait Planner[ReturnType]:
   def plan(using planContext: PlanContext): IO[ReturnType]
 
+  /**
+   * 只读的 planner 复写为 true：不开启 db-manager 事务，省去 StartTransaction / EndTransaction 两次往返。
+   * 只适用于只执行读语句、且不要求多条语句读到同一快照的 planner；
+   * 用 streamDBRows 流式读取的 planner 依赖事务内的游标，不要标记为只读。
+   */
+  def readOnly: Boolean = false
+
   def planWithErrorControl(using planContext:PlanContext, encoder: Encoder[ReturnType]):IO[ReturnType]=
-    startTransaction{
+    (if (readOnly && Planner.elideReadOnlyTransactions) plan else startTransaction{
       plan
-    }.onError{e=>
+    }).onError{e=>
+      IO(afterCommitActions.clear())>>  //事务已回滚，登记的提交后动作不再执行
       errorRecovery>>  //这里会运行定制化的error recovery
       IO.println("error:"+e)
-    }
+    }.flatTap(_ => runAfterCommitActions)
+
+  private val afterCommitActions = new ConcurrentLinkedQueue[IO[Unit]]()
+
+  /**
+   * 登记一个在事务提交之后才执行的动作，例如推送事件、失效缓存。
+   * 这类动作如果在 plan 中直接执行，其他请求可能看到随后被回滚的数据。
+   * 动作按登记顺序执行；plan 失败时全部丢弃；单个动作失败只打印错误，不影响请求结果。
+   */
+  def afterCommit(action: IO[Unit]): IO[Unit] = IO(afterCommitActions.add(action)).void
+
+  private def runAfterCommitActions: IO[Unit] =
+    IO(Iterator.continually(afterCommitActions.poll()).takeWhile(_ != null).toList).flatMap(
+      _.traverse_(_.handleErrorWith(e => IO.println("afterCommit error:"+e)))
+    )
 
   /** 默认是不做任何error recovery的。但是如果在文件系统中出了问题，应该需要调用writeToLocalGitMessage把local的内容重置一遍才对 */
   def errorRecovery(using planContext:PlanContext):IO[Unit]=IO.unit
 
   def fullPlan(using encoder: Encoder[ReturnType]): IO[ReturnType] =
-    IO.println(this) >> planWithErrorControl(using this.planContext, encoder)
+    Logging.payload(this.toString) >> Tracing.span(Tracing.Plan, this.getClass.getSimpleName)(
+      planWithErrorControl(using this.planContext, encoder)
+    )(using this.planContext)
+
+  /** 把 planner 中的一个步骤记录为 span，便于在调用链中看到各步骤的耗时 */
+  def step[A](name: String)(io: IO[A])(using PlanContext): IO[A] = Tracing.span(Tracing.Step, name)(io)
 
   val planContext: PlanContext = PlanContext(TraceID(""), 0)
+
+object Planner {
+  /** 为 false 时只读 planner 也照常开启事务，可通过配置 elideReadOnlyTransactions 关闭优化 */
+  @volatile var elideReadOnlyTransactions: Boolean = true
+}
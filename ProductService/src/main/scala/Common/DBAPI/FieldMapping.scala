@@ -0,0 +1,24 @@
+package Common.DBAPI
+
+import io.circe.{Decoder, Json}
+
+/**
+ * 一种查询结果形状的列名映射：列名（snake_case）到行 JSON 字段名（camelCase）的转换只在构造时做一次，
+ * 逐行解码时直接按预先算好的字段名取值，避免 decodeField 每个字段都重新拆分字符串。
+ * 通常作为查询所在对象的常量定义，例如 FieldMapping("order_id", "customer_id", ...)。
+ */
+case class FieldMapping(columns: List[String]) {
+  private val fieldNames: Map[String, String] = columns.map(column => column -> snakeToCamel(column)).toMap
+
+  /** SELECT 语句中的列清单 */
+  val selectList: String = columns.mkString(", ")
+
+  def get[T: Decoder](row: Json, column: String): T = {
+    val fieldName = fieldNames.getOrElse(column, throw new IllegalArgumentException(s"Column ${column} is not part of this mapping"))
+    row.hcursor.downField(fieldName).as[T].fold(throw _, value => value)
+  }
+}
+
+case object FieldMapping {
+  def apply(columns: String*): FieldMapping = new FieldMapping(columns.toList)
+}
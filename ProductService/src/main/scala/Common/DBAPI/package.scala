@@ -11,6 +11,10 @@ import org.joda.time.DateTime
 import io.circe.parser.decode
 import org.http4s.client.Client
 import org.joda.time.format.ISODateTimeFormat
+import fs2.Stream
+
+import java.util.UUID
+import scala.collection.concurrent.TrieMap
 
 
 package object DBAPI {
@@ -41,11 +45,9 @@ package object DBAPI {
     for {
       _ <- startTransactionAction // Start the transaction if this is the first level
       result <- block(using newContext).attempt // Execute the block with the new (incremented) transaction context
-      _ <- IO.println("Step result")
-
       _ <- result match
         case Left(value) => IO.pure(value.printStackTrace())
-        case Right(value) => IO.println(s"result = ${result}")
+        case Right(value) => Logging.payload(s"Step result = ${result}")
 
       finalResult <- commitOrRollbackAction(result)
     } yield finalResult
@@ -81,6 +83,26 @@ package object DBAPI {
       convertedResult = resultParam.startsWith("t")
     } yield convertedResult
 
+  /**
+   * 以流的形式逐行读取查询结果，内存占用只与 chunkSize 有关。
+   * 在事务中（planner 的 plan 都在事务中执行）使用服务端游标：DECLARE 后每次 FETCH chunkSize 行，读完或流被提前终止时关闭游标；
+   * 不在事务中时游标无法跨语句存在，退回为一次性读取。sqlQuery 需要自带 ORDER BY 才能保证顺序。
+   */
+  def streamDBRows(sqlQuery: String, parameters: List[SqlParameter], chunkSize: Int = 500)(using context: PlanContext): Stream[IO, Json] =
+    if (context.transactionLevel == 0) Stream.eval(readDBRows(sqlQuery, parameters)).flatMap(Stream.emits)
+    else {
+      val cursorName = "row_stream_" + UUID.randomUUID().toString.replace("-", "")
+      val declare = writeDB(s"DECLARE ${cursorName} NO SCROLL CURSOR FOR ${sqlQuery.trim.stripSuffix(";")}", parameters)
+      val close = writeDB(s"CLOSE ${cursorName}", List()).void.handleError(_ => ())
+      Stream.bracket(declare)(_ => close) >>
+        Stream.unfoldChunkEval(true) { hasMore =>
+          if (!hasMore) IO.pure(None)
+          else readDBRows(s"FETCH FORWARD ${chunkSize} FROM ${cursorName}", List()).map { rows =>
+            if (rows.isEmpty) None else Some(fs2.Chunk.from(rows) -> (rows.size == chunkSize))
+          }
+        }
+    }
+
   def writeDB(sqlQuery: String, parameters: List[SqlParameter])(using PlanContext): IO[String] = WriteDBMessage(sqlQuery, parameters).send
 
   def writeDBList(sqlQuery: String, parameters: List[ParameterList])(using PlanContext): IO[String] = WriteDBListMessage(sqlQuery, parameters).send
@@ -101,7 +123,12 @@ package object DBAPI {
     decode[T](st).fold(IO.raiseError, IO.pure)
   }
 
-  def snakeToCamel(snake: String): String = {
+  /** 列名转换结果的缓存：列名的种类有限，decodeField 对每行每个字段都会调用 snakeToCamel */
+  private val camelNames: TrieMap[String, String] = TrieMap.empty
+
+  def snakeToCamel(snake: String): String = camelNames.getOrElseUpdate(snake, convertSnakeToCamel(snake))
+
+  private def convertSnakeToCamel(snake: String): String = {
     snake.split("_").toList match {
       case head :: tail =>
         head + tail.map {
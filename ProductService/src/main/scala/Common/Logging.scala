@@ -0,0 +1,126 @@
+package Common
+
+import Common.API.TraceID
+import ch.qos.logback.classic.encoder.PatternLayoutEncoder
+import ch.qos.logback.classic.spi.ILoggingEvent
+import ch.qos.logback.classic.{AsyncAppender, Level, LoggerContext}
+import ch.qos.logback.core.ConsoleAppender
+import cats.effect.IO
+import org.slf4j.{Logger, LoggerFactory}
+
+import java.util.concurrent.ThreadLocalRandom
+import scala.jdk.CollectionConverters.*
+
+/**
+ * 日志模式：
+ *  - 开发模式（默认）：保持原来的行为，请求/响应等完整内容直接打印到标准输出，日志按 logback 原有配置同步输出
+ *  - 生产模式：日志经 AsyncAppender 异步写出，队列满时丢弃而不阻塞请求线程；只输出 INFO 及以上；
+ *    请求/响应等大段内容按 payloadSampleRate 抽样并截断后记录
+ * 可通过配置 productionLogging / payloadLogSampleRate 设置，也可在运行时 POST /logging/<production|development> 切换。
+ */
+object Logging {
+  private val pattern = "%d{HH:mm:ss.SSS} [%thread] %-5level %logger{36} - %msg%n"
+  /** 异步队列长度，满了之后直接丢弃新日志 */
+  private val asyncQueueSize = 8192
+  /** 抽样记录的内容最多保留的字符数 */
+  val maxPayloadChars = 2000
+
+  @volatile var production: Boolean = false
+  @volatile var payloadSampleRate: Double = 0.01
+
+  val logger: Logger = LoggerFactory.getLogger("Payload")
+
+  def init(productionLogging: Option[Boolean], sampleRate: Option[Double]): IO[Unit] =
+    IO {
+      sampleRate.foreach(rate => payloadSampleRate = rate.max(0.0).min(1.0))
+    } >> IO.whenA(productionLogging.contains(true))(setMode(true))
+
+  private val asyncAppenderName = "ASYNC_ROOT"
+  /** 第一次切换前 root logger 的级别（logback.xml 或默认配置），回到开发模式时恢复 */
+  private var configuredLevel: Option[Level] = None
+
+  /**
+   * 只调整 root logger 的 appender 与级别，不重置 LoggerContext，logback.xml 中的 appender、各 logger 的级别都保留：
+   *  - 生产模式把 root 上现有的 appender 挂到一个 AsyncAppender 下，root 只保留这个 AsyncAppender，级别设为 INFO
+   *  - 开发模式把这些 appender 挂回 root，停掉 AsyncAppender，并恢复原来的级别
+   */
+  def setMode(productionMode: Boolean): IO[Unit] = IO(synchronized {
+    val context = LoggerFactory.getILoggerFactory.asInstanceOf[LoggerContext]
+    val root = context.getLogger(org.slf4j.Logger.ROOT_LOGGER_NAME)
+    if (configuredLevel.isEmpty) configuredLevel = Option(root.getLevel)
+    val installed = Option(root.getAppender(asyncAppenderName)).collect { case async: AsyncAppender => async }
+
+    (productionMode, installed) match {
+      case (true, None) =>
+        val appenders = root.iteratorForAppenders().asScala.toList
+        val async = new AsyncAppender
+        async.setName(asyncAppenderName)
+        async.setContext(context)
+        async.setQueueSize(asyncQueueSize)
+        async.setNeverBlock(true)
+        (if (appenders.isEmpty) List(consoleAppender(context)) else appenders).foreach(async.addAppender)
+        async.start()
+        root.addAppender(async)
+        appenders.foreach(root.detachAppender)
+        root.setLevel(Level.INFO)
+      case (false, Some(async)) =>
+        val appenders = async.iteratorForAppenders().asScala.toList
+        appenders.foreach(root.addAppender)
+        root.detachAppender(async)
+        // AsyncAppender 停止时会一并停止挂在它下面的 appender，先把它们摘下来
+        appenders.foreach(async.detachAppender)
+        async.stop()
+        root.setLevel(configuredLevel.getOrElse(Level.DEBUG))
+      case _ => ()
+    }
+    production = productionMode
+  })
+
+  /** root 上没有任何 appender 时使用的控制台输出 */
+  private def consoleAppender(context: LoggerContext): ConsoleAppender[ILoggingEvent] = {
+    val encoder = new PatternLayoutEncoder
+    encoder.setContext(context)
+    encoder.setPattern(pattern)
+    encoder.start()
+
+    val console = new ConsoleAppender[ILoggingEvent]
+    console.setContext(context)
+    console.setEncoder(encoder)
+    console.start()
+    console
+  }
+
+  /** 记录请求体、响应体、中间结果等大段内容：开发模式全量打印，生产模式抽样并截断 */
+  def payload(message: => String): IO[Unit] = IO(payloadUnsafe(message))
+
+  def payloadUnsafe(message: => String): Unit =
+    if (!production) println(message)
+    else if (payloadSampleRate > 0 && ThreadLocalRandom.current().nextDouble() < payloadSampleRate && logger.isInfoEnabled) {
+      val text = message
+      logger.info(if (text.length <= maxPayloadChars) text else text.take(maxPayloadChars) + s"...(${text.length} chars)")
+    }
+}
+
+/**
+ * 带 TraceID 前缀的 logger。各 planner 共用按类创建的 slf4j logger，
+ * 不再为每个请求按 "<类名>_<TraceID>" 新建 logger（logback 会把每个名字永久缓存在 LoggerContext 里）。
+ * 消息按名传递，日志级别关闭时不会拼接字符串。
+ */
+final class TraceLogger(underlying: Logger, traceID: TraceID) {
+  def info(message: => String): Unit =
+    if (underlying.isInfoEnabled) underlying.info(s"[${traceID.id}] ${message}")
+
+  def warn(message: => String): Unit =
+    if (underlying.isWarnEnabled) underlying.warn(s"[${traceID.id}] ${message}")
+
+  def error(message: => String): Unit =
+    if (underlying.isErrorEnabled) underlying.error(s"[${traceID.id}] ${message}")
+
+  def error(message: => String, cause: Throwable): Unit =
+    if (underlying.isErrorEnabled) underlying.error(s"[${traceID.id}] ${message}", cause)
+}
+
+object TraceLogger {
+  def apply(owner: Class[?], traceID: TraceID): TraceLogger =
+    new TraceLogger(LoggerFactory.getLogger(owner), traceID)
+}
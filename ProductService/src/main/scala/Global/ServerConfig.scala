@@ -18,7 +18,7 @@ case class ServerConfig(
                          /** 最大连接数 */
                          maximumServerConnection: Int,
 
-                         /** 最大的同时往内部微服务发送的请求个数，原则上和最大连接数相同 */
+                         /** 发往单个目标服务的最大连接数（每个目标服务一个连接池），未在 clientConnectionsPerTarget 中配置的目标使用此值 */
                          maximumClientConnection: Int,
 
                          /** 数据库地址，例如：jdbc:postgresql://localhost:5432/db */
@@ -42,7 +42,28 @@ case class ServerConfig(
                          /** connection的最长存活时间 */
                          connectionLiveMinutes: Int,
 
-                         isTest:Boolean
+                         isTest:Boolean,
+
+                         /** span 导出目录，配置后每个服务把调用链 span 写入 <目录>/<服务名>.jsonl，缺省不记录 */
+                         spanExportPath: Option[String] = None,
+
+                         /** 生产日志模式：异步输出日志、只记录 INFO 及以上，请求/响应内容按比例抽样，缺省为开发模式 */
+                         productionLogging: Option[Boolean] = None,
+
+                         /** 生产日志模式下请求/响应内容的抽样比例（0~1），缺省 0.01 */
+                         payloadLogSampleRate: Option[Double] = None,
+
+                         /** 只读 planner 是否跳过 db-manager 事务，缺省 true */
+                         elideReadOnlyTransactions: Option[Boolean] = None,
+
+                         /** 按目标服务名（如 "db-manager"、"orderservice"）单独配置的最大连接数 */
+                         clientConnectionsPerTarget: Option[Map[String, Int]] = None,
+
+                         /** 空闲连接在连接池中保留的秒数，缺省 60 */
+                         clientIdleTimeInPoolSeconds: Option[Int] = None,
+
+                         /** 微服务之间是否使用 HTTP/2（h2c），需所有服务一致开启；发往 db-manager 的请求始终使用 HTTP/1.1，缺省 false */
+                         http2: Option[Boolean] = None
                        )
 
 case object ServerConfig{
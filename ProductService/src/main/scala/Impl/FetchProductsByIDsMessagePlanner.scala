@@ -0,0 +1,75 @@
+package Impl
+
+
+/**
+ * Planner for FetchProductsByIDsMessage.
+ * 按商品ID批量查询某个商家的商品，一条 SQL 返回所有存在的商品，供下单时统一校验和定价。
+ */
+import Common.API.{PlanContext, Planner}
+import Common.DBAPI._
+import Common.Object.SqlParameter
+import Common.ServiceUtils.schemaName
+import Objects.ProductService.ProductInfo
+import cats.effect.IO
+import Common.TraceLogger
+import io.circe.Json
+import io.circe.generic.auto._
+import cats.implicits._
+import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
+
+case class FetchProductsByIDsMessagePlanner(
+                                             merchantID: String,
+                                             productIDs: List[String],
+                                             override val planContext: PlanContext
+                                           ) extends Planner[List[ProductInfo]] {
+
+  val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  /** 只包含读语句，不开启事务 */
+  override def readOnly: Boolean = true
+
+  override def plan(using planContext: PlanContext): IO[List[ProductInfo]] = {
+    val distinctIDs = productIDs.distinct
+    for {
+      // Step 1: 校验参数
+      _ <- IO(logger.info(s"[Step 1] 校验参数：merchantID=${merchantID}, 商品ID数=${distinctIDs.size}"))
+      _ <- validateParameters(distinctIDs)
+
+      // Step 2: 一次查询取出所有属于该商家的商品
+      _ <- IO(logger.info(s"[Step 2] 批量查询商品"))
+      products <- fetchProducts(distinctIDs)
+
+      // Step 3: 返回结果，缺失的ID由调用方处理
+      _ <- IO(logger.info(s"[Step 3] 查到 ${products.size}/${distinctIDs.size} 个商品"))
+    } yield products
+  }
+
+  private def validateParameters(distinctIDs: List[String])(using PlanContext): IO[Unit] = {
+    val error =
+      if (merchantID.trim.isEmpty) Some("merchantID cannot be empty.")
+      else if (distinctIDs.isEmpty) Some("productIDs cannot be empty.")
+      else if (distinctIDs.size > FetchProductsByIDsMessagePlanner.maxProductIDs)
+        Some(s"At most ${FetchProductsByIDsMessagePlanner.maxProductIDs} productIDs can be fetched at once.")
+      else None
+    error match {
+      case Some(message) => IO(logger.error(message)) >> IO.raiseError(new IllegalArgumentException(message))
+      case None => IO.unit
+    }
+  }
+
+  private def fetchProducts(distinctIDs: List[String])(using PlanContext): IO[List[ProductInfo]] = {
+    val sql =
+      s"""
+         |SELECT product_id, merchant_id, name, price, description
+         |FROM ${schemaName}.product_table
+         |WHERE merchant_id = ? AND product_id IN (${distinctIDs.map(_ => "?").mkString(", ")});
+         |""".stripMargin
+    val parameters = SqlParameter("String", merchantID) :: distinctIDs.map(SqlParameter("String", _))
+    readDBRows(sql, parameters).map(_.map(decodeType[ProductInfo]))
+  }
+}
+
+object FetchProductsByIDsMessagePlanner {
+  /** 单次查询的商品ID上限，防止 IN 列表过长 */
+  val maxProductIDs = 500
+}
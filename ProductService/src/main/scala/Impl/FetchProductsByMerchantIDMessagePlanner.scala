@@ -10,8 +10,9 @@ import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import Objects.ProductService.ProductInfo
+import Utils.ProductCatalogCache
 import cats.effect.IO
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import io.circe.Json
 import io.circe.generic.auto._
 import org.joda.time.DateTime
@@ -39,7 +40,10 @@ case class FetchProductsByMerchantIDMessagePlanner(
                                                     override val planContext: PlanContext
                                                   ) extends Planner[List[ProductInfo]] {
 
-  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  /** 只包含读语句，不开启事务 */
+  override def readOnly: Boolean = true
 
   /**
    * 核心方法：执行 FetchProductsByMerchantIDMessage 请求流程。
@@ -50,9 +54,9 @@ case class FetchProductsByMerchantIDMessagePlanner(
       _ <- IO(logger.info(s"[Step 1] Validating merchantID: ${merchantID}"))
       _ <- validateMerchantID()
 
-      // Step 2: Query products from ProductTable by merchantID
-      _ <- IO(logger.info(s"[Step 2] Fetching products for merchantID: ${merchantID} from database"))
-      products <- fetchProductsByMerchantID()
+      // Step 2: Read the merchant's catalog, loading it from ProductTable on a cache miss
+      _ <- IO(logger.info(s"[Step 2] Fetching products for merchantID: ${merchantID}"))
+      products <- ProductCatalogCache.catalog(merchantID)(fetchProductsByMerchantID()).map(_.products)
 
       // Step 3: Logging the result
       _ <- IO(logger.info(s"[Step 3] Fetched ${products.length} products for merchantID: ${merchantID}"))
@@ -6,8 +6,9 @@ import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import Objects.ProductService.ProductInfo
+import Utils.ProductCatalogCache
 import cats.effect.IO
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import io.circe.Json
 import io.circe.generic.auto._
 import org.joda.time.DateTime
@@ -36,22 +37,22 @@ case class FetchProductsByNameAndMerchantIDMessagePlanner(
                                                            override val planContext: PlanContext
                                                          ) extends Planner[Option[List[ProductInfo]]] {
 
-  private val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  private val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  /** 只包含读语句，不开启事务 */
+  override def readOnly: Boolean = true
 
   override def plan(using PlanContext): IO[Option[List[ProductInfo]]] = {
     for {
       // Step 1: Validate input parameters
       _ <- validateParameters()
 
-      // Step 2: Query products by merchant ID and name
+      // Step 2: Search the merchant's cached catalog; names containing LIKE wildcards still go to the database
       _ <- IO(logger.info(s"查询商家ID为${merchantID}且名称包含${name}的商品"))
-      productsJson <- queryProductsByMerchantIDAndName()
-
-      // Step 3: Convert results to ProductInfo objects
-      _ <- IO(logger.info("将查询结果转换为ProductInfo对象"))
-      products <- IO { productsJson.map(decodeType[ProductInfo]) }
+      products <- if (ProductCatalogCache.searchable(name)) ProductCatalogCache.catalog(merchantID)(loadCatalog()).map(_.search(name))
+                  else queryProductsByMerchantIDAndName().map(_.map(decodeType[ProductInfo]))
 
-      // Step 4: Return results as Option
+      // Step 3: Return results as Option
       result = if (products.isEmpty) None else Some(products)
       _ <- IO(logger.info(s"查询到的商品数量为${products.size}, 返回结果为${result.isDefined}"))
     } yield result
@@ -69,6 +70,17 @@ case class FetchProductsByNameAndMerchantIDMessagePlanner(
     }
   }
 
+  private def loadCatalog()(using PlanContext): IO[List[ProductInfo]] = {
+    val sql =
+      s"""
+        SELECT product_id, merchant_id, name, price, description
+        FROM ${schemaName}.product_table
+        WHERE merchant_id = ?;
+       """
+    IO(logger.info(s"商家ID为${merchantID}的菜单未缓存，从数据库加载")) >>
+      readDBRows(sql, List(SqlParameter("String", merchantID))).map(_.map(decodeType[ProductInfo]))
+  }
+
   private def queryProductsByMerchantIDAndName()(using PlanContext): IO[List[Json]] = {
     val sql =
       s"""
@@ -1,7 +1,7 @@
 package Impl
 
 
-import APIs.UserCenter.GetUserInfoByToken
+import Utils.{ProductCatalogCache, UserInfoCache}
 import Objects.UserCenter.UserType
 import Objects.UserCenter.UserInfo
 import Objects.UserCenter.RiderStatus
@@ -14,7 +14,7 @@ import io.circe._
 import io.circe.syntax._
 import io.circe.generic.auto._
 import org.joda.time.DateTime
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import io.circe._
 import io.circe.syntax._
 import io.circe.generic.auto._
@@ -38,7 +38,13 @@ case class MerchantAddProductMessagePlanner(
                                              description: String,
                                              override val planContext: PlanContext
                                            ) extends Planner[String] {
-  private val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  private val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  /** 事务提交后再让该商家的菜单缓存失效，避免并发的读取把提交前的菜单重新放回缓存 */
+  override def planWithErrorControl(using planContext: PlanContext, encoder: Encoder[String]): IO[String] =
+    super.planWithErrorControl.flatTap { _ =>
+      UserInfoCache.getUserInfoByToken(merchantToken).flatMap(userInfo => ProductCatalogCache.invalidate(userInfo.userID)).handleError(_ => ())
+    }
 
   override def plan(using planContext: PlanContext): IO[String] = {
     for {
@@ -50,23 +56,18 @@ case class MerchantAddProductMessagePlanner(
       - <- IO(logger.info(s"[Step 1.5] 验证产品是否合理,name=${name}, price=${price}, description=${description} "))
       - <- validateProductInfo(name, price)
 
-      // Step 2: Check if product name already exists for this merchant
-      _ <- IO(logger.info(s"[Step 2] 检查该商家是否已存在同名商品，name=${name}, merchantID=${merchantInfo.userID}"))
-      exists <- checkProductNameExists(merchantInfo.userID, name)
-      - <- if (exists) {
-        val errorMessage = s"[Step 2] 商品名称 ${name} 已存在，不能重复添加"
-        IO(logger.error(errorMessage)) *> IO.raiseError(new IllegalArgumentException(errorMessage))
-      } else IO.unit
-
-      // Step 3: Generate unique product ID
-      _ <- IO(logger.info(s"[Step 3] 开始生成商品唯一编号"))
+      // Step 2: Generate unique product ID
+      _ <- IO(logger.info(s"[Step 2] 开始生成商品唯一编号"))
       productID <- IO(generateProductID())
-      _ <- IO(logger.info(s"[Step 3] 成功生成商品唯一编号：productID=${productID}"))
+      _ <- IO(logger.info(s"[Step 2] 成功生成商品唯一编号：productID=${productID}"))
 
-      // Step 4: Insert product into ProductTable
-      _ <- IO(logger.info(s"[Step 4] 准备插入商品信息到 ProductTable：productID=${productID}, merchantID=${merchantInfo.userID}, name=${name}, price=${price}, description=${description}"))
-      _ <- insertProduct(productID, merchantInfo.userID, name, price, description)
-      _ <- IO(logger.info("[Step 4] 商品信息插入成功"))
+      // Step 3: Insert product into ProductTable unless the merchant already has a product with the same name
+      _ <- IO(logger.info(s"[Step 3] 准备插入商品信息到 ProductTable：productID=${productID}, merchantID=${merchantInfo.userID}, name=${name}, price=${price}, description=${description}"))
+      inserted <- insertProductIfNameAbsent(productID, merchantInfo.userID, name, price, description)
+      _ <- if (!inserted) {
+        val errorMessage = s"[Step 3] 商品名称 ${name} 已存在，不能重复添加"
+        IO(logger.error(errorMessage)) *> IO.raiseError(new IllegalArgumentException(errorMessage))
+      } else IO(logger.info("[Step 3] 商品信息插入成功"))
 
     } yield {
       logger.info("[All Steps Done] 商品添加操作完成，状态为：Success")
@@ -76,32 +77,8 @@ case class MerchantAddProductMessagePlanner(
     IO(logger.error("[Operation Failed] 商品添加操作失败！", error)) *> IO.pure("Failure")
   }
 
-  private def checkProductNameExists(merchantID: String, name: String)(using PlanContext): IO[Boolean] = {
-    val querySQL =
-      s"""
-         |SELECT COUNT(*) AS count FROM ${schemaName}.product_table
-         |WHERE merchant_id = ? AND name = ?
-         |""".stripMargin
-
-    val parameters = List(
-      SqlParameter("String", merchantID),
-      SqlParameter("String", name)
-    )
-
-    readDBJson(querySQL, parameters).map { json =>
-      val count = (json \\ "count")
-        .headOption
-        .flatMap(_.as[Long].toOption)
-        .getOrElse(0L)
-      count > 0
-    }.handleErrorWith { error =>
-      val errorMessage = s"[Step 2] 查询商品名称是否重复失败：${error.getMessage}"
-      IO(logger.error(errorMessage, error)) *> IO.pure(false) // 查询失败时允许插入（安全策略可自定义）
-    }
-  }
-  
   private def validateMerchantIdentity(merchantToken: String)(using PlanContext): IO[UserInfo] = {
-    GetUserInfoByToken(merchantToken).send.flatMap { userInfo =>
+    UserInfoCache.getUserInfoByToken(merchantToken).flatMap { userInfo =>
       if (userInfo.userType == UserType.Merchant) {
         IO(logger.info(s"[Step 1.1] 商家身份验证通过，merchantID=${userInfo.userID}, name=${userInfo.name}")) *> IO.pure(userInfo)
       } else {
@@ -118,12 +95,19 @@ case class MerchantAddProductMessagePlanner(
     UUID.randomUUID().toString
   }
 
-  private def insertProduct(productID: String, merchantID: String, name: String, price: Double, description: String)(using PlanContext): IO[Unit] = {
+  /**
+   * 查重与插入合并为一条语句：同一商家已有同名商品时不插入，返回是否插入成功。
+   */
+  private def insertProductIfNameAbsent(productID: String, merchantID: String, name: String, price: Double, description: String)(using PlanContext): IO[Boolean] = {
     val insertSQL =
       s"""
          |INSERT INTO ${schemaName}.product_table
          |(product_id, merchant_id, name, price, description)
-         |VALUES (?, ?, ?, ?, ?);
+         |SELECT ?, ?, ?, ?, ?
+         |WHERE NOT EXISTS (
+         |  SELECT 1 FROM ${schemaName}.product_table WHERE merchant_id = ? AND name = ?
+         |)
+         |RETURNING product_id;
        """.stripMargin
 
     val parameters = List(
@@ -131,12 +115,15 @@ case class MerchantAddProductMessagePlanner(
       SqlParameter("String", merchantID),
       SqlParameter("String", name),
       SqlParameter("Double", price.toString),
-      SqlParameter("String", description)
+      SqlParameter("String", description),
+      SqlParameter("String", merchantID),
+      SqlParameter("String", name)
     )
 
-    writeDB(insertSQL, parameters).map { _ => 
-      logger.info(s"[Step 3] 成功将商品信息写入数据库，productID=${productID}")
-    }.void
+    readDBRows(insertSQL, parameters).map { rows =>
+      if (rows.nonEmpty) logger.info(s"[Step 3] 成功将商品信息写入数据库，productID=${productID}")
+      rows.nonEmpty
+    }
   }
 
   private def validateProductInfo(name: String, price: Double)(using PlanContext) = {
@@ -1,7 +1,7 @@
 package Impl
 
 
-import APIs.UserCenter.GetUserInfoByToken
+import Utils.{ProductCatalogCache, UserInfoCache}
 import Objects.UserCenter.UserType
 import Objects.UserCenter.UserInfo
 import Objects.ProductService.ProductInfo
@@ -11,7 +11,7 @@ import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import cats.effect.IO
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import io.circe.Json
 import Common.Serialize.CustomColumnTypes._
 import org.joda.time.DateTime
@@ -42,7 +42,13 @@ case class MerchantRemoveProductMessagePlanner(
     override val planContext: PlanContext
 ) extends Planner[String] {
 
-  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  /** 事务提交后再让该商家的菜单缓存失效，避免并发的读取把提交前的菜单重新放回缓存 */
+  override def planWithErrorControl(using planContext: PlanContext, encoder: Encoder[String]): IO[String] =
+    super.planWithErrorControl.flatTap { _ =>
+      UserInfoCache.getUserInfoByToken(merchantToken).flatMap(userInfo => ProductCatalogCache.invalidate(userInfo.userID)).handleError(_ => ())
+    }
 
   override def plan(using planContext: PlanContext): IO[String] = {
     for {
@@ -77,7 +83,7 @@ case class MerchantRemoveProductMessagePlanner(
 
   // 验证商家身份
   private def validateMerchant()(using PlanContext): IO[UserInfo] = {
-    GetUserInfoByToken(merchantToken).send.handleErrorWith { error =>
+    UserInfoCache.getUserInfoByToken(merchantToken).handleErrorWith { error =>
       val errorMessage = s"[Step 1.1] 无法通过令牌 merchantToken=$merchantToken 获取用户信息: ${error.getMessage}"
       IO(logger.error(errorMessage)) >>
         IO.raiseError(new IllegalStateException("Unauthorized"))
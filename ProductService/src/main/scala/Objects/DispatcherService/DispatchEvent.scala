@@ -0,0 +1,84 @@
+package Objects.DispatcherService
+
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+import Objects.DispatcherService.DispatchEventType
+import Objects.OrderService.OrderStatus
+import Objects.UserCenter.RiderStatus
+
+/**
+ * DispatchEvent
+ * desc: 调度相关的状态变更事件，由订单服务和用户中心推送给调度服务
+ * @param eventType: DispatchEventType (事件类型)
+ * @param orderID: String (订单ID，订单事件必填)
+ * @param merchantID: String (订单所属商家ID，订单进入等待分配状态时必填)
+ * @param orderStatus: OrderStatus (变更后的订单状态，订单事件必填)
+ * @param orderTime: DateTime (订单创建时间，订单进入等待分配状态时必填)
+ * @param riderID: String (骑手ID，骑手事件必填)
+ * @param riderStatus: RiderStatus (变更后的骑手状态，骑手事件必填)
+ */
+
+case class DispatchEvent(
+  eventType: DispatchEventType,
+  orderID: Option[String] = None,
+  merchantID: Option[String] = None,
+  orderStatus: Option[OrderStatus] = None,
+  orderTime: Option[DateTime] = None,
+  riderID: Option[String] = None,
+  riderStatus: Option[RiderStatus] = None
+){
+
+  //process class code 预留标志位，不要删除
+
+
+}
+
+
+case object DispatchEvent{
+
+
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[DispatchEvent] = deriveEncoder
+  private val circeDecoder: Decoder[DispatchEvent] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[DispatchEvent] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[DispatchEvent] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[DispatchEvent]() {})) }
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+
+  // Circe + Jackson 兜底的 Encoder
+  given dispatchEventEncoder: Encoder[DispatchEvent] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given dispatchEventDecoder: Decoder[DispatchEvent] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+
+  //process object code 预留标志位，不要删除
+
+
+}
+
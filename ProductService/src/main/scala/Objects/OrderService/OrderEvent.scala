@@ -0,0 +1,80 @@
+package Objects.OrderService
+
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+import Objects.OrderService.OrderStatus
+
+/**
+ * OrderEvent
+ * desc: 推送给顾客、商家和骑手的订单变更事件，经 GET /stream/orders 以 SSE 推送
+ * @param orderID: String (订单ID)
+ * @param customerID: String (顾客ID)
+ * @param merchantID: String (商家ID)
+ * @param riderID: String (骑手ID（空表示未分配）)
+ * @param orderStatus: OrderStatus (变更后的订单状态)
+ * @param eventTime: DateTime (事件发生时间)
+ */
+
+case class OrderEvent(
+  orderID: String,
+  customerID: String,
+  merchantID: String,
+  riderID: Option[String] = None,
+  orderStatus: OrderStatus,
+  eventTime: DateTime
+){
+
+  //process class code 预留标志位，不要删除
+
+
+}
+
+
+case object OrderEvent{
+
+
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[OrderEvent] = deriveEncoder
+  private val circeDecoder: Decoder[OrderEvent] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[OrderEvent] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[OrderEvent] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[OrderEvent]() {})) }
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+
+  // Circe + Jackson 兜底的 Encoder
+  given orderEventEncoder: Encoder[OrderEvent] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given orderEventDecoder: Decoder[OrderEvent] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+
+  //process object code 预留标志位，不要删除
+
+
+}
+
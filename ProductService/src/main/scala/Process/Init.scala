@@ -2,7 +2,7 @@
 package Process
 
 import Common.API.{API, PlanContext, TraceID}
-import Common.DBAPI.{initSchema, writeDB}
+import Common.DBAPI.{IndexDefinition, initSchema, writeDB}
 import Common.ServiceUtils.schemaName
 import Global.ServerConfig
 import cats.effect.IO
@@ -13,13 +13,23 @@ import Process.ProcessUtils.server2DB
 import Global.GlobalVariables
 
 object Init {
+  /** 商品服务的二级索引 */
+  val indexes: List[IndexDefinition] = List(
+    // 商家内按名称精确查找、前缀匹配（text_pattern_ops 使 LIKE 'x%' 也能走索引）
+    IndexDefinition("product_table_merchant_name_idx", "product_table", "merchant_id, name text_pattern_ops"),
+    // 名称包含搜索 LIKE '%x%' 使用三元组索引，pg_trgm 不可用时跳过，查询仍可走上面的商家索引
+    IndexDefinition("product_table_name_trgm_idx", "product_table", "name gin_trgm_ops", method = "gin", extension = Some("pg_trgm"))
+  )
+
   def init(config: ServerConfig): IO[Unit] = {
     given PlanContext = PlanContext(traceID = TraceID(UUID.randomUUID().toString), 0)
     given DBConfig = server2DB(config)
 
     val program: IO[Unit] = for {
       _ <- IO(GlobalVariables.isTest=config.isTest)
-      _ <- API.init(config.maximumClientConnection)
+      _ <- Common.Tracing.init(config.spanExportPath)
+      _ <- Common.Logging.init(config.productionLogging, config.payloadLogSampleRate)
+      _ <- IO(config.elideReadOnlyTransactions.foreach(Common.API.Planner.elideReadOnlyTransactions = _))
       _ <- Common.DBAPI.SwitchDataSourceMessage(projectName = Global.ServiceCenter.projectName).send
       _ <- initSchema(schemaName)
             /** 商品信息表，包含商品的基础信息
@@ -42,6 +52,8 @@ object Init {
         """,
         List()
       )
+      // 二级索引：缺失的在后台并发建立，不阻塞服务启动，已有 schema 也由此完成迁移
+      _ <- IndexDefinition.ensureIndexes(schemaName, indexes).start
     } yield ()
 
     program.handleErrorWith(err => IO {
@@ -1,14 +1,15 @@
 
 package Process
 
-import Common.API.PlanContext
+import Common.API.{PlanContext, PlanRoute}
 import Common.DBAPI.DidRollbackException
+import Common.{Logging, Metrics, Tracing}
+import org.typelevel.ci.CIString
 import cats.effect.*
 import fs2.concurrent.Topic
 import io.circe.*
 import io.circe.derivation.Configuration
 import io.circe.generic.auto.*
-import io.circe.parser.decode
 import io.circe.syntax.*
 import org.http4s.*
 import org.http4s.client.Client
@@ -17,9 +18,12 @@ import scala.collection.concurrent.TrieMap
 import Common.Serialize.CustomColumnTypes.*
 import Impl.FetchProductsByNameAndMerchantIDMessagePlanner
 import Impl.FetchProductsByMerchantIDMessagePlanner
+import Impl.FetchProductsByIDsMessagePlanner
 import Impl.MerchantRemoveProductMessagePlanner
 import Impl.MerchantAddProductMessagePlanner
 import Common.API.TraceID
+import Objects.ProductService.ProductInfo
+import Utils.ProductCatalogCache
 import org.joda.time.DateTime
 import org.http4s.circe.*
 import java.util.UUID
@@ -28,58 +32,74 @@ import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
 object Routes:
   val projects: TrieMap[String, Topic[IO, String]] = TrieMap.empty
 
-  private def executePlan(messageType: String, str: String): IO[String] =
+  /** 消息名 -> 处理函数，启动时构建一次 */
+  private val planRoutes: Map[String, PlanRoute] = Map(
+    "FetchProductsByNameAndMerchantIDMessage" -> PlanRoute[FetchProductsByNameAndMerchantIDMessagePlanner, Option[List[ProductInfo]]],
+    "FetchProductsByMerchantIDMessage" -> PlanRoute[FetchProductsByMerchantIDMessagePlanner, List[ProductInfo]],
+    "FetchProductsByIDsMessage" -> PlanRoute[FetchProductsByIDsMessagePlanner, List[ProductInfo]],
+    "MerchantRemoveProductMessage" -> PlanRoute[MerchantRemoveProductMessagePlanner, String],
+    "MerchantAddProductMessage" -> PlanRoute[MerchantAddProductMessagePlanner, String]
+  )
+
+  private def executePlan(messageType: String, body: JsonObject, planContext: PlanContext): IO[Json] =
+    planRoutes.get(messageType) match {
+      case Some(route) => route.run(messageType, body, planContext)
+      case None if messageType == "test" =>
+        Utils.Test.test(Json.fromJsonObject(body).noSpaces)(using PlanContext(TraceID(""), 0)).map(Json.fromString)
+      case None =>
+        IO.raiseError(new Exception(s"Unknown type: $messageType"))
+    }
+
+  /** 返回菜单的两条消息带 ETag，取值是响应 JSON 的摘要 */
+  private val catalogMessages = Set("FetchProductsByMerchantIDMessage", "FetchProductsByNameAndMerchantIDMessage")
+
+  /** 商家菜单已缓存时不执行 planner，直接算出本次响应的 ETag；未缓存或参数不合法时为 None */
+  private def cachedCatalogETag(messageType: String, body: JsonObject): Option[String] = {
+    def field(key: String) = body(key).flatMap(_.asString)
     messageType match {
-      case "FetchProductsByNameAndMerchantIDMessage" =>
-        IO(
-          decode[FetchProductsByNameAndMerchantIDMessagePlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for FetchProductsByNameAndMerchantIDMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
       case "FetchProductsByMerchantIDMessage" =>
-        IO(
-          decode[FetchProductsByMerchantIDMessagePlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for FetchProductsByMerchantIDMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
-      case "MerchantRemoveProductMessage" =>
-        IO(
-          decode[MerchantRemoveProductMessagePlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for MerchantRemoveProductMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
-      case "MerchantAddProductMessage" =>
-        IO(
-          decode[MerchantAddProductMessagePlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for MerchantAddProductMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
-
-      case "test" =>
+        field("merchantID").flatMap(ProductCatalogCache.cached).map(_.etag)
+      case "FetchProductsByNameAndMerchantIDMessage" =>
         for {
-          output  <- Utils.Test.test(str)(using  PlanContext(TraceID(""), 0))
-        } yield output
-      case _ =>
-        IO.raiseError(new Exception(s"Unknown type: $messageType"))
+          name <- field("name") if name.trim.nonEmpty && ProductCatalogCache.searchable(name)
+          catalog <- field("merchantID").flatMap(ProductCatalogCache.cached)
+          products = catalog.search(name)
+        } yield ProductCatalogCache.etagOf(Option.when(products.nonEmpty)(products).asJson)
+      case _ => None
     }
+  }
 
-  def handlePostRequest(req: Request[IO]): IO[String] = {
-    req.as[Json].map {
-      bodyJson => {
-        val planContext = PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0)
-        val planContextJson = planContext.asJson
-        val updatedJson = bodyJson.deepMerge(Json.obj("planContext" -> planContextJson))
-        updatedJson.toString
+  private def etagMatches(req: Request[IO], etag: String): Boolean =
+    req.headers.get(CIString("If-None-Match")).exists(_.exists { header =>
+      header.value.split(',').map(_.trim.stripPrefix("W/")).exists(tag => tag == etag || tag == "*")
+    })
+
+  /** 为请求分配新的 TraceID，返回 planContext 与解析后的请求体；请求体从字节流直接解析为 JSON，只解析一次 */
+  def readPostRequest(req: Request[IO]): IO[(PlanContext, JsonObject)] =
+    req.as[Json].flatMap { bodyJson =>
+      bodyJson.asObject match {
+        case Some(body) => IO.pure(PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0) -> body)
+        case None => IO.raiseError(new Exception("Request body must be a JSON object"))
       }
     }
-  }
+
   val service: HttpRoutes[IO] = HttpRoutes.of[IO] {
     case GET -> Root / "health" =>
       Ok("OK")
+
+    case GET -> Root / "metrics" =>
+      Ok(Metrics.render)
+
+    case DELETE -> Root / "metrics" =>
+      IO(Metrics.reset()) >> Ok("OK")
+
+    /** 运行时切换日志模式，便于对比两种模式下的吞吐 */
+    case POST -> Root / "logging" / mode =>
+      mode match {
+        case "production" => Logging.setMode(true) >> Ok("OK")
+        case "development" => Logging.setMode(false) >> Ok("OK")
+        case _ => BadRequest(s"Unknown logging mode: $mode".asJson.toString)
+      }
       
     case GET -> Root / "stream" / projectName =>
       projects.get(projectName) match {
@@ -99,9 +119,25 @@ object Routes:
           }
       }
     case req@POST -> Root / "api" / name =>
-      handlePostRequest(req).flatMap {
-        executePlan(name, _)
-      }.flatMap(Ok(_))
+      readPostRequest(req).flatMap { (planContext, body) =>
+        val header = (key: String) => req.headers.get(CIString(key)).map(_.head.value)
+        cachedCatalogETag(name, body) match {
+          // 客户端缓存的菜单仍是最新的，不执行 planner
+          case Some(etag) if etagMatches(req, etag) =>
+            NotModified().map(_.putHeaders("ETag" -> etag))
+          case _ =>
+            Tracing.continueFrom(header(Tracing.TraceHeader), header(Tracing.ParentSpanHeader)) {
+              Tracing.span(Tracing.Route, name)(Metrics.time(Metrics.Route, name, planContext.traceID)(executePlan(name, body, planContext)))(using planContext)
+            }.flatMap { json =>
+              if (!catalogMessages.contains(name)) Ok(json)
+              else {
+                val etag = ProductCatalogCache.etagOf(json)
+                if (etagMatches(req, etag)) NotModified().map(_.putHeaders("ETag" -> etag))
+                else Ok(json).map(_.putHeaders("ETag" -> etag))
+              }
+            }
+        }
+      }
       .handleErrorWith {
         case e: DidRollbackException =>
           println(s"Rollback error: $e")
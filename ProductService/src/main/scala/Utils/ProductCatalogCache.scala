@@ -0,0 +1,91 @@
+package Utils
+
+import Common.TtlCache
+import Objects.ProductService.ProductInfo
+import cats.effect.IO
+import io.circe.Json
+import io.circe.syntax.*
+
+import java.nio.charset.StandardCharsets
+import java.security.MessageDigest
+import java.util.concurrent.atomic.AtomicLongArray
+
+/**
+ * 一个商家的完整菜单，附带按名称搜索用的本地索引。
+ * 索引把商品名拆成单字和相邻两字，搜索时取查询串中命中商品最少的那个词的倒排表，
+ * 再用 contains 逐个确认，结果与 SQL 的 name LIKE '%name%' 一致，顺序与菜单相同。
+ */
+final class MerchantCatalog(val products: List[ProductInfo]) {
+  private val productVector = products.toVector
+
+  private val postings: Map[String, Array[Int]] =
+    productVector.indices
+      .flatMap(i => MerchantCatalog.tokens(productVector(i).name).map(_ -> i))
+      .groupMap(_._1)(_._2)
+      .view.mapValues(_.distinct.toArray).toMap
+
+  /** 整份菜单作为响应时的 ETag，加载时算一次 */
+  val etag: String = ProductCatalogCache.etagOf(products.asJson)
+
+  def search(name: String): List[ProductInfo] = {
+    val queryTokens = if (name.length == 1) List(name) else MerchantCatalog.bigrams(name)
+    val candidates = queryTokens.map(postings.getOrElse(_, Array.emptyIntArray)).minBy(_.length)
+    candidates.iterator.map(productVector).filter(_.name.contains(name)).toList
+  }
+}
+
+object MerchantCatalog {
+  private def bigrams(text: String): List[String] = text.sliding(2).filter(_.length == 2).toList
+
+  private def tokens(text: String): List[String] = (text.map(_.toString).toList ++ bigrams(text)).distinct
+}
+
+/**
+ * 商家菜单的读穿缓存：FetchProductsByMerchantIDMessage / FetchProductsByNameAndMerchantIDMessage 先查这里，
+ * 未命中时读一次 product_table 并缓存整份菜单；名称搜索只要不含 LIKE 通配符，就在缓存的菜单上用本地索引完成。
+ * 按商家数量有界，超出时淘汰最久未访问的商家。
+ *  - MerchantAddProductMessage / MerchantRemoveProductMessage 在事务提交后调用 invalidate
+ *  - 每个商家有一个写版本号（按哈希分桶），加载前记下版本，写回缓存时版本已变则丢弃，
+ *    避免与写操作并发的读取把旧菜单放回缓存
+ *  - 绕过这两个 planner 直接改 product_table 时收不到通知，ttlMillis 只作为兜底
+ */
+case object ProductCatalogCache {
+  private val maxMerchants = 5000
+  private val ttlMillis = 5 * 60 * 1000L
+  private val versionBuckets = 1024
+
+  private val cache = new TtlCache[String, MerchantCatalog](maxMerchants)
+  private val versions = new AtomicLongArray(versionBuckets)
+
+  /** ETag 取响应 JSON 的摘要：内容不变时重新加载菜单也得到同一个值，客户端缓存依然有效 */
+  def etagOf(json: Json): String =
+    MessageDigest.getInstance("SHA-256").digest(json.noSpaces.getBytes(StandardCharsets.UTF_8))
+      .take(12).map(byte => f"${byte & 0xff}%02x").mkString("\"", "", "\"")
+
+  /** LIKE 中 % 和 _ 是通配符，本地索引按字面匹配，含这些字符的名称查询仍交给数据库 */
+  def searchable(name: String): Boolean = !name.exists(c => c == '%' || c == '_' || c == '\\')
+
+  private def bucket(merchantID: String): Int = (merchantID.hashCode & Int.MaxValue) % versionBuckets
+
+  /** 已缓存时直接返回，不触发加载；路由据此在执行 planner 之前判断 If-None-Match */
+  def cached(merchantID: String): Option[MerchantCatalog] = cache.get(merchantID)
+
+  def catalog(merchantID: String)(load: IO[List[ProductInfo]]): IO[MerchantCatalog] =
+    IO(cache.get(merchantID)).flatMap {
+      case Some(catalog) => IO.pure(catalog)
+      case None =>
+        IO(versions.get(bucket(merchantID))).flatMap { version =>
+          load.map(new MerchantCatalog(_)).flatTap { catalog =>
+            IO(synchronized {
+              if (versions.get(bucket(merchantID)) == version)
+                cache.put(merchantID, catalog, System.currentTimeMillis() + ttlMillis)
+            })
+          }
+        }
+    }
+
+  def invalidate(merchantID: String): IO[Unit] = IO(synchronized {
+    versions.incrementAndGet(bucket(merchantID))
+    cache.remove(merchantID)
+  })
+}
@@ -0,0 +1,27 @@
+package Utils
+
+import APIs.UserCenter.GetUserInfoByToken
+import Common.API.PlanContext
+import Common.TtlCache
+import Objects.UserCenter.UserInfo
+import cats.effect.IO
+
+/**
+ * 调用方的 userToken -> UserInfo 缓存，热点会话不再每次请求都回源 UserCenter。
+ * 调用方收不到令牌轮换的通知，所以只缓存 ttlMillis；本服务只用它判断用户身份和角色，这两项不会变化。
+ */
+case object UserInfoCache {
+  private val maxEntries = 10000
+  private val ttlMillis = 30 * 1000L
+
+  private val cache = new TtlCache[String, UserInfo](maxEntries)
+
+  def getUserInfoByToken(userToken: String)(using PlanContext): IO[UserInfo] =
+    IO(cache.get(userToken)).flatMap {
+      case Some(userInfo) => IO.pure(userInfo)
+      case None =>
+        GetUserInfoByToken(userToken).send.flatTap { userInfo =>
+          IO(cache.put(userToken, userInfo, System.currentTimeMillis() + ttlMillis))
+        }
+    }
+}
@@ -0,0 +1,64 @@
+package APIs.OrderService
+
+import Common.API.API
+import Global.ServiceCenter.OrderServiceCode
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+import Objects.OrderService.OrderAssignment
+
+/**
+ * BatchUpdateRider
+ * desc: 在同一个事务中批量为订单分配骑手，并把订单状态更新为正在配送；只会更新仍处于等待分配骑手状态的订单
+ * @param assignments: OrderAssignment (订单分配列表，每一项包含订单ID与骑手ID)
+ * @return assignedOrderIDs: String (实际分配了骑手的订单ID；已取消或已被分配的订单不在其中)
+ */
+
+case class BatchUpdateRider(
+  assignments: List[OrderAssignment]
+) extends API[List[String]](OrderServiceCode)
+
+
+
+case object BatchUpdateRider{
+
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[BatchUpdateRider] = deriveEncoder
+  private val circeDecoder: Decoder[BatchUpdateRider] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[BatchUpdateRider] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[BatchUpdateRider] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[BatchUpdateRider]() {})) }
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+
+  // Circe + Jackson 兜底的 Encoder
+  given batchUpdateRiderEncoder: Encoder[BatchUpdateRider] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given batchUpdateRiderDecoder: Decoder[BatchUpdateRider] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+}
+
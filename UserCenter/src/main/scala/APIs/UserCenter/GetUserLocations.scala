@@ -0,0 +1,64 @@
+package APIs.UserCenter
+
+import Common.API.API
+import Global.ServiceCenter.UserCenterCode
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+import Objects.UserCenter.UserLocation
+
+/**
+ * GetUserLocations
+ * desc: 批量查询用户的位置坐标，没有登记位置的用户不会出现在结果中
+ * @param userIDs: String (需要查询位置的用户ID列表)
+ * @return locations: UserLocation (已登记位置的用户坐标列表)
+ */
+
+case class GetUserLocations(
+  userIDs: List[String]
+) extends API[List[UserLocation]](UserCenterCode)
+
+
+
+case object GetUserLocations{
+
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[GetUserLocations] = deriveEncoder
+  private val circeDecoder: Decoder[GetUserLocations] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[GetUserLocations] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[GetUserLocations] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[GetUserLocations]() {})) }
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+
+  // Circe + Jackson 兜底的 Encoder
+  given getUserLocationsEncoder: Encoder[GetUserLocations] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given getUserLocationsDecoder: Decoder[GetUserLocations] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+}
+
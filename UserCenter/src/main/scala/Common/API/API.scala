@@ -1,6 +1,7 @@
 package Common.API
 
 import Common.DBAPI.DidRollbackException
+import Common.{Logging, Metrics, Tracing}
 import Common.ServiceUtils.getURI
 import cats.data.NonEmptyList
 import cats.effect.*
@@ -10,13 +11,9 @@ import org.http4s.*
 import org.http4s.Uri.Path
 import org.http4s.circe.*
 import org.http4s.circe.CirceEntityDecoder.*
-import org.http4s.client.Client
-import org.http4s.ember.client.EmberClientBuilder
 import org.typelevel.ci.CIString
-import org.typelevel.log4cats.slf4j.{Slf4jFactory, Slf4jLogger}
-import org.typelevel.log4cats.{Logger, LoggerFactory}
-
-import scala.concurrent.duration.DurationInt
+import org.typelevel.log4cats.slf4j.Slf4jFactory
+import org.typelevel.log4cats.LoggerFactory
 
 implicit val loggerFactory: LoggerFactory[IO] = Slf4jFactory.create[IO]
 
@@ -26,6 +23,8 @@ import scala.compiletime.erasedValue
 abstract class API[T: Decoder](targetService: String):
   type ReturnType = T
 
+  def targetServiceCode: String = targetService
+
   /** 表示当前API是否会产生回复。如果不会产生回复，则这里会复写成false */
   inline def hasReply: Boolean =
     inline erasedValue[ReturnType] match
@@ -42,40 +41,34 @@ abstract class API[T: Decoder](targetService: String):
   def send(using Encoder[this.type], PlanContext): IO[T] = API.send[T, this.type](this)
 
 object API {
+  /** 把已读出的响应体转换为返回类型；响应体只读取一次，日志与解码共用同一个字符串 */
   trait ResponseHandler[T]:
-    def handle(response: Response[IO]): IO[T]
+    def handle(body: String): IO[T]
 
   given ResponseHandler[String] with
-    def handle(response: Response[IO]): IO[String] = response.bodyText.compile.string
+    def handle(body: String): IO[String] = IO.pure(body)
 
   given [T: Decoder]: ResponseHandler[T] with
-    def handle(response: Response[IO]): IO[T] = {
-      response.asJsonDecode[T].flatMap {
-        IO(_)
-      }
-    }
-
-  private var client: Option[Client[IO]] = None
-
-  def init(maximumClientConnection: Int): IO[Unit] = {
-    val clientResource: Resource[IO, Client[IO]] = EmberClientBuilder.default[IO]
-      .withMaxTotal(maximumClientConnection)
-      .withTimeout(30.seconds)
-      .withIdleConnectionTime(30.seconds)
-      .build
-
-    clientResource.use { httpClient =>
-      IO {
-        client = Some(httpClient)
-      }
+    def handle(body: String): IO[T] = IO.fromEither(io.circe.parser.decode[T](body))
+
+  /** 指标中的调用名：db-manager 消息按消息类型归为 db，其余按 "<目标服务>/<消息名>" 归为 send */
+  private def metricLabels(message: API[?]): (String, String) = {
+    val messageName = message.getClass.getSimpleName
+    if (message.targetServiceCode == Global.ServiceCenter.tongWenDBServiceCode) Metrics.DB -> messageName
+    else {
+      val target = Global.ServiceCenter.fullNameMap.get(message.targetServiceCode).map(_.takeWhile(_ != '（')).getOrElse(message.targetServiceCode)
+      Metrics.Send -> s"${target}/${messageName}"
     }
   }
 
-  private given logger: Logger[IO] = Slf4jLogger.getLogger[IO]
+  def send[T: Decoder, A <: API[T] : Encoder](message: A)(using context: PlanContext): IO[T] = {
+    val (kind, name) = metricLabels(message)
+    Tracing.span(kind, name)(Metrics.time(kind, name, context.traceID)(sendUntimed[T, A](message)))
+  }
 
-  def send[T: Decoder, A <: API[T] : Encoder](message: A)(using context: PlanContext): IO[T] =
+  private def sendUntimed[T: Decoder, A <: API[T] : Encoder](message: A)(using context: PlanContext): IO[T] =
     for {
-      _ <- logger.info(s"Preparing to send message ${message}")
+      _ <- Logging.payload(s"Preparing to send message ${message}")
       uri <- message.getURIWithAPIMessageName
       modifiedJson = message.asJson.mapObject { jsonObj =>
         val planContext = Json.obj(
@@ -84,27 +77,26 @@ object API {
         )
         jsonObj.add("planContext", planContext)
       }
+      traceHeaders <- Tracing.propagationHeaders
       request = Request[IO](Method.POST, uri).withEntity(modifiedJson)
+        .putHeaders(traceHeaders.map((key, value) => Header.Raw(CIString(key), value))*)
 
-      result <- client.get.run(request).use { response =>
+      result <- ClientPool.run(message.targetServiceCode, request).use { response =>
         val handler = summon[ResponseHandler[T]] // Summon an instance of ResponseHandler for T
         val rollbackHeader: Option[NonEmptyList[Header.Raw]] = response.headers.get(CIString("X-DidRollback"))
 
-        response.status match {
-          case status if status.isSuccess =>
-            response.bodyText.compile.string.flatMap { body =>
-              IO.println(s"Response body: $body")
-            } >>
-              handler.handle(response)
-          case _ =>
-            response.bodyText.compile.string.flatMap { body =>
+        response.bodyText.compile.string.flatMap { body =>
+          response.status match {
+            case status if status.isSuccess =>
+              Logging.payload(s"Response body: $body") >> handler.handle(body)
+            case _ =>
               rollbackHeader match {
                 case Some(header) =>
                   IO.raiseError(DidRollbackException(body))
                 case _ =>
                   IO.raiseError(new Exception(s"Unexpected response status: ${response.status.code}, body: $body"))
               }
-            }
+          }
         }
       }
     } yield result
@@ -7,5 +7,7 @@ object GlobalVariables {
   lazy val serviceCode : String = UserCenterCode
   val projectIDLength:Int=20
   var isTest:Boolean=false
+  /** 每个用户最多同时有效的会话数，1 表示新登录会顶掉旧令牌，启动时由 ServerConfig 覆盖 */
+  var maxSessionsPerUser:Int=1
 
 }
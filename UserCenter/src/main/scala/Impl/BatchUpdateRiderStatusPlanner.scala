@@ -0,0 +1,58 @@
+package Impl
+
+
+import Objects.UserCenter.{RiderStatus, UserType}
+import Common.API.{PlanContext, Planner}
+import Common.DBAPI._
+import Common.Object.{ParameterList, SqlParameter}
+import Common.ServiceUtils.schemaName
+import Utils.UserTokenCache
+import Utils.UserInfoProcess.publishRiderStatusChanged
+import cats.effect.IO
+import Common.TraceLogger
+import io.circe._
+import io.circe.syntax._
+import io.circe.generic.auto._
+import cats.implicits.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+case class BatchUpdateRiderStatusPlanner(
+    riderIDs: List[String],
+    newStatus: RiderStatus,
+    override val planContext: PlanContext
+) extends Planner[String] {
+
+  private val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  override def plan(using PlanContext): IO[String] = {
+    val distinctRiderIDs = riderIDs.distinct
+    for {
+      // Step 1: 校验输入参数
+      _ <- IO(logger.info(s"开始批量更新骑手状态：共 ${distinctRiderIDs.size} 名骑手，newStatus=${newStatus.toString}"))
+      _ <- if (distinctRiderIDs.exists(_.isEmpty))
+        IO.raiseError(new IllegalArgumentException("riderID cannot be empty"))
+      else IO.unit
+
+      // Step 2: 批量更新（只更新骑手类型的用户，planWithErrorControl 已经开启事务）
+      result <- if (distinctRiderIDs.isEmpty) IO.pure("Success") else updateRiderStatus(distinctRiderIDs)
+      // 骑手状态是 UserInfo 的一部分，提交后失效缓存的旧信息
+      _ <- afterCommit(distinctRiderIDs.traverse_(UserTokenCache.invalidateUser))
+      _ <- afterCommit(publishRiderStatusChanged(distinctRiderIDs, newStatus))
+
+      // Step 3: 返回结果
+      _ <- IO(logger.info(s"批量更新骑手状态完成：${result}"))
+    } yield result
+  }
+
+  private def updateRiderStatus(ids: List[String])(using PlanContext): IO[String] = {
+    val sql = s"UPDATE ${schemaName}.user_info_table SET status = ? WHERE user_id = ? AND user_type = ?"
+    val parameters = ids.map { riderID =>
+      ParameterList(List(
+        SqlParameter("String", newStatus.toString),
+        SqlParameter("String", riderID),
+        SqlParameter("String", UserType.Rider.toString)
+      ))
+    }
+    writeDBList(sql, parameters)
+  }
+}
@@ -9,7 +9,7 @@ import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import cats.effect.IO
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import io.circe.Json
 import org.joda.time.DateTime
 import cats.implicits.*
@@ -35,7 +35,10 @@ case class GetAllIdleRidersPlanner(
                                     override val planContext: PlanContext
                                   ) extends Planner[List[UserInfo]] {
 
-  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  /** 只包含读语句，不开启事务 */
+  override def readOnly: Boolean = true
 
   override def plan(using PlanContext): IO[List[UserInfo]] = {
     for {
@@ -9,7 +9,7 @@ import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import cats.effect.IO
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import org.joda.time.DateTime
 import io.circe.Json
 import io.circe._
@@ -33,51 +33,54 @@ import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
 
 case class GetAllMerchantsPlanner(override val planContext: PlanContext) extends Planner[List[UserInfo]] {
 
-  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  /** 只有一条读语句，不开启事务 */
+  override def readOnly: Boolean = true
 
   override def plan(using planContext: PlanContext): IO[List[UserInfo]] = {
     for {
       _ <- IO(logger.info("开始从UserInfoTable中查询所有用户类型为Merchant的记录"))
 
-      // Step 1: 从UserInfoTable表中查询所有用户类型为Merchant的记录。
-      merchantsJson <- getMerchantRecords()
-      _ <- IO(logger.info(s"成功查询到${merchantsJson.length}条商家记录"))
+      // Step 1: 从UserInfoTable表中一次读出所有用户类型为Merchant的记录，转换为UserInfo对象。
+      // 响应本身就是完整的列表，改用游标分批读取只会多出 DECLARE / FETCH / CLOSE 往返，不会更早返回
+      merchantList <- readMerchantRecords().map(_.map(toUserInfo))
 
-      // Step 2 & 3: 将查询结果逐条转换为UserInfo对象，并返回组装完成的List[UserInfo]。
-      merchantList <- convertToUserInfoList(merchantsJson)
+      // Step 2: 返回组装完成的List[UserInfo]。
       _ <- IO(logger.info(s"完成转换，共${merchantList.length}条商家记录"))
     } yield merchantList
   }
 
-  private def getMerchantRecords()(using PlanContext): IO[List[Json]] = {
+  private def readMerchantRecords()(using PlanContext): IO[List[Json]] = {
     val query = s"""
-         SELECT user_id, name, contact_number, address, user_type, status, create_time
+         SELECT ${GetAllMerchantsPlanner.fields.selectList}
          FROM ${schemaName}.user_info_table
-         WHERE user_type = ?;
+         WHERE user_type = ?
+         ORDER BY create_time, user_id;
        """
     val parameters = List(SqlParameter("String", UserType.Merchant.toString))
 
-    IO(logger.info("开始执行商家查询的数据库指令")) >>
-      IO(logger.info(s"SQL: ${query}")) >>
-      readDBRows(query, parameters)
+    IO(logger.info(s"SQL: ${query}")) >> readDBRows(query, parameters)
   }
 
-  private def convertToUserInfoList(jsonList: List[Json])(using PlanContext): IO[List[UserInfo]] = {
-    IO {
-      logger.info("开始将查询结果转换为UserInfo对象列表")
-      jsonList.map { json =>
-        val userID = decodeField[String](json, "user_id")
-        val name = decodeField[String](json, "name")
-        val contactNumber = decodeField[String](json, "contact_number")
-        val address = decodeField[Option[String]](json, "address")
-        val userType = UserType.fromString(decodeField[String](json, "user_type"))
-        val status = decodeField[Option[String]](json, "status") match {
-          case Some(value) if value.nonEmpty => Some(RiderStatus.fromString(value))
-          case _ => None
-        }
-        val createTime = decodeField[DateTime](json, "create_time")
-        UserInfo(userID, name, contactNumber, userType, address, status, createTime)
-      }
+  private def toUserInfo(json: Json): UserInfo = {
+    val fields = GetAllMerchantsPlanner.fields
+    val status = fields.get[Option[String]](json, "status") match {
+      case Some(value) if value.nonEmpty => Some(RiderStatus.fromString(value))
+      case _ => None
     }
+    UserInfo(
+      fields.get[String](json, "user_id"),
+      fields.get[String](json, "name"),
+      fields.get[String](json, "contact_number"),
+      UserType.fromString(fields.get[String](json, "user_type")),
+      fields.get[Option[String]](json, "address"),
+      status,
+      fields.get[DateTime](json, "create_time")
+    )
   }
-}
\ No newline at end of file
+}
+
+case object GetAllMerchantsPlanner {
+  val fields: FieldMapping = FieldMapping("user_id", "name", "contact_number", "address", "user_type", "status", "create_time")
+}
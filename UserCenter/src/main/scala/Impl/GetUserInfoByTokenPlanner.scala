@@ -4,13 +4,14 @@ package Impl
 import Objects.UserCenter.UserType
 import Objects.UserCenter.UserInfo
 import Objects.UserCenter.RiderStatus
-import Utils.UserInfoProcess.validateUserToken
+import Utils.UserInfoProcess.validateUserSession
+import Utils.UserTokenCache
 import Common.API.{PlanContext, Planner}
 import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import cats.effect.IO
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import org.joda.time.DateTime
 import io.circe._
 import cats.implicits.*
@@ -36,20 +37,36 @@ case class GetUserInfoByTokenPlanner(
                                       override val planContext: PlanContext
                                     ) extends Planner[UserInfo] {
 
-  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  /** 只包含读语句，不开启事务 */
+  override def readOnly: Boolean = true
 
   override def plan(using PlanContext): IO[UserInfo] = {
-    for {
-      // Step 1: Validate the user token
-      _ <- IO(logger.info(s"[Step 1] 开始校验用户令牌格式: userToken=${userToken}"))
-      userID <- validateUserToken(userToken)
+    // Step 0: 命中令牌缓存时直接返回，不再查询会话表和用户信息表
+    IO(UserTokenCache.get(userToken)).flatMap {
+      case Some(userInfo) =>
+        IO(logger.info(s"[Cache] 命中令牌缓存: userID=${userInfo.userID}")).as(userInfo)
+      case None =>
+        for {
+          // 先记下缓存代数，读取期间该用户被失效时不写回缓存
+          generation <- IO(UserTokenCache.currentGeneration)
+
+          // Step 1: Validate the user token
+          _ <- IO(logger.info(s"[Step 1] 开始校验用户令牌格式: userToken=${userToken}"))
+          session <- validateUserSession(userToken)
+          (userID, expireTime) = session
+
+          // Step 2: Fetch user info from UserInfoTable
+          _ <- IO(logger.info(s"[Step 2] 验证成功，开始从数据库获取用户信息: userID=${userID}"))
+          userInfo <- fetchUserInfo(userID)
 
-      // Step 2: Fetch user info from UserInfoTable
-      _ <- IO(logger.info(s"[Step 2] 验证成功，开始从数据库获取用户信息: userID=${userID}"))
-      userInfo <- fetchUserInfo(userID)
-    } yield {
-      logger.info(s"[Result] 成功获取用户信息: ${userInfo}")
-      userInfo
+          // Step 3: 写入缓存，随令牌一起过期
+          _ <- IO(UserTokenCache.put(userToken, userInfo, expireTime, generation))
+        } yield {
+          logger.info(s"[Result] 成功获取用户信息: ${userInfo}")
+          userInfo
+        }
     }
   }
 
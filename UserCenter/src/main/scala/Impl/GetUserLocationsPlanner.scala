@@ -0,0 +1,58 @@
+package Impl
+
+
+import Objects.UserCenter.UserLocation
+import Common.API.{PlanContext, Planner}
+import Common.DBAPI._
+import Common.Object.SqlParameter
+import Common.ServiceUtils.schemaName
+import cats.effect.IO
+import Common.TraceLogger
+import io.circe._
+import io.circe.syntax._
+import io.circe.generic.auto._
+import cats.implicits.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+case class GetUserLocationsPlanner(
+    userIDs: List[String],
+    override val planContext: PlanContext
+) extends Planner[List[UserLocation]] {
+
+  val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  /** 只包含读语句，不开启事务 */
+  override def readOnly: Boolean = true
+
+  override def plan(using PlanContext): IO[List[UserLocation]] = {
+    val distinctUserIDs = userIDs.distinct
+    for {
+      // Step 1: 一次查询取回所有用户的位置
+      _ <- IO(logger.info(s"开始批量查询用户位置，共 ${distinctUserIDs.size} 个用户"))
+      rows <- if (distinctUserIDs.isEmpty) IO.pure(List.empty[Json]) else queryLocations(distinctUserIDs)
+
+      // Step 2: 转换为 UserLocation
+      locations <- IO {
+        rows.map { row =>
+          UserLocation(
+            userID = decodeField[String](row, "user_id"),
+            latitude = decodeField[Double](row, "latitude"),
+            longitude = decodeField[Double](row, "longitude")
+          )
+        }
+      }
+      _ <- IO(logger.info(s"查询到 ${locations.size} 个用户的位置"))
+    } yield locations
+  }
+
+  private def queryLocations(ids: List[String])(using PlanContext): IO[List[Json]] = {
+    val placeholders = ids.map(_ => "?").mkString(", ")
+    val sql =
+      s"""
+         SELECT user_id, latitude, longitude
+         FROM ${schemaName}.user_location_table
+         WHERE user_id IN (${placeholders})
+       """
+    readDBRows(sql, ids.map(id => SqlParameter("String", id)))
+  }
+}
@@ -4,16 +4,17 @@ package Impl
 import Objects.UserCenter.UserType
 import Objects.UserCenter.UserInfo
 import Objects.UserCenter.RiderStatus
-import Utils.UserInfoProcess.validateUserToken
+import Utils.UserInfoProcess.{publishRiderStatusChanged, validateUserToken}
 import Common.API.{PlanContext, Planner}
 import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
+import Utils.UserTokenCache
 import io.circe.Json
 import io.circe.parser.decode
 import io.circe.generic.auto._
 import cats.effect.IO
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import org.joda.time.DateTime
 import cats.implicits._
 import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
@@ -40,7 +41,7 @@ case class UpdateStatusPlanner(
     override val planContext: PlanContext
 ) extends Planner[String] {
 
-  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  val logger = TraceLogger(this.getClass, planContext.traceID)
 
   override def plan(using PlanContext): IO[String] = {
     for {
@@ -57,6 +58,9 @@ case class UpdateStatusPlanner(
       // Step 3: 更新用户状态
       _ <- IO(logger.info(s"用户验证通过，更新用户状态为：newStatus=${newStatus.toString}"))
       updateResult <- updateUserStatus(userID, newStatus)
+      // 骑手状态是 UserInfo 的一部分，提交后失效缓存的旧信息
+      _ <- afterCommit(UserTokenCache.invalidateUser(userID))
+      _ <- afterCommit(publishRiderStatusChanged(List(userID), newStatus))
     } yield {
       // Step 4: 返回更新结果
       logger.info(s"更新状态结果：${updateResult}")
@@ -0,0 +1,64 @@
+package Impl
+
+
+import Utils.UserInfoProcess.validateUserToken
+import Common.API.{PlanContext, Planner}
+import Common.DBAPI._
+import Common.Object.SqlParameter
+import Common.ServiceUtils.schemaName
+import cats.effect.IO
+import Common.TraceLogger
+import org.joda.time.DateTime
+import io.circe._
+import io.circe.syntax._
+import io.circe.generic.auto._
+import cats.implicits.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+case class UpdateUserLocationPlanner(
+    userToken: String,
+    latitude: Double,
+    longitude: Double,
+    override val planContext: PlanContext
+) extends Planner[String] {
+
+  val logger = TraceLogger(this.getClass, planContext.traceID)
+
+  override def plan(using PlanContext): IO[String] = {
+    for {
+      // Step 1: 校验坐标范围
+      _ <- IO(logger.info(s"开始校验坐标：latitude=${latitude}, longitude=${longitude}"))
+      _ <- validateCoordinate()
+
+      // Step 2: 校验用户令牌合法性
+      userID <- validateUserToken(userToken)
+
+      // Step 3: 写入（或覆盖）用户位置
+      _ <- IO(logger.info(s"更新用户位置：userID=${userID}"))
+      result <- upsertLocation(userID)
+    } yield result
+  }
+
+  private def validateCoordinate(): IO[Unit] = {
+    if (latitude.isNaN || latitude < -90 || latitude > 90 || longitude.isNaN || longitude < -180 || longitude > 180) {
+      val errorMessage = s"坐标超出范围：latitude=${latitude}, longitude=${longitude}"
+      IO(logger.error(errorMessage)) >> IO.raiseError(new IllegalArgumentException(errorMessage))
+    } else IO.unit
+  }
+
+  private def upsertLocation(userID: String)(using PlanContext): IO[String] = {
+    val sql =
+      s"""
+         INSERT INTO ${schemaName}.user_location_table (user_id, latitude, longitude, update_time)
+         VALUES (?, ?, ?, TO_TIMESTAMP(?))
+         ON CONFLICT (user_id) DO UPDATE
+         SET latitude = EXCLUDED.latitude, longitude = EXCLUDED.longitude, update_time = EXCLUDED.update_time
+       """
+    writeDB(sql, List(
+      SqlParameter("String", userID),
+      SqlParameter("Double", latitude.toString),
+      SqlParameter("Double", longitude.toString),
+      SqlParameter("Double", (DateTime.now.getMillis.toDouble / 1000).toString)
+    ))
+  }
+}
@@ -6,8 +6,10 @@ import Common.DBAPI.*
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import Utils.UserInfoProcess.generateUserToken
+import Utils.UserTokenCache
+import Global.GlobalVariables
 import cats.effect.IO
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import org.joda.time.DateTime
 import io.circe.*
 import io.circe.syntax.*
@@ -35,7 +37,7 @@ import java.security.MessageDigest
 case class UserLoginPlanner(name: String, password: String, override val planContext: PlanContext)
   extends Planner[String] {
 
-  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  val logger = TraceLogger(this.getClass, planContext.traceID)
 
   override def plan(using PlanContext): IO[String] = {
     for {
@@ -44,14 +46,22 @@ case class UserLoginPlanner(name: String, password: String, override val planCon
       // Step 1: Validate input parameters
       _ <- validateInput()
 
-      // Step 2: Retrieve userID from UserInfoTable
-      userID <- getUserIDByName(name)
+      // Step 2: Retrieve userID and stored password digest in one query (UserInfoTable JOIN UserPasswordTable)
+      credential <- getCredentialByName(name)
 
-      // Step 3: Validate password from UserPasswordTable
-      _ <- validatePassword(userID, password)
+      // Step 3: Validate password
+      _ <- validatePassword(credential._2, password)
+      userID = credential._1
 
       // Step 4.1: Generate user token
-      userToken <- generateUserToken(userID)
+      issued <- generateUserToken(userID)
+      (userToken, revokedTokens) = issued
+      // 提交后清掉失效令牌的缓存：单会话模式下旧令牌已被覆盖，按用户失效；
+      // 多会话模式下该用户的其他会话仍然有效，只失效被清理的令牌
+      _ <- afterCommit(
+        if (GlobalVariables.maxSessionsPerUser <= 1) UserTokenCache.invalidateUser(userID)
+        else UserTokenCache.invalidateTokens(userID, revokedTokens)
+      )
 
     } yield userToken
   }
@@ -64,36 +74,37 @@ case class UserLoginPlanner(name: String, password: String, override val planCon
     else IO.unit
   }
 
-  private def getUserIDByName(name: String)(using PlanContext): IO[String] = {
-    val sql = s"SELECT user_id FROM ${schemaName}.user_info_table WHERE name = ?"
+  private def getCredentialByName(name: String)(using PlanContext): IO[(String, String)] = {
+    val sql =
+      s"""
+         |SELECT i.user_id, p.password
+         |FROM ${schemaName}.user_info_table i
+         |JOIN ${schemaName}.user_password_table p ON p.user_id = i.user_id
+         |WHERE i.name = ?
+       """.stripMargin
     val params = List(SqlParameter("String", name))
 
     for {
       resultOpt <- readDBJsonOptional(sql, params)
-      userID <- resultOpt match {
-        case Some(json) => IO(decodeField[String](json, "user_id"))
+      credential <- resultOpt match {
+        case Some(json) => IO(decodeField[String](json, "user_id") -> decodeField[String](json, "password"))
         case None =>
           IO.raiseError(new IllegalArgumentException("身份验证失败：用户名或密码不正确"))
       }
-    } yield userID
+    } yield credential
   }
 
-  private def validatePassword(userID: String, inputPassword: String)(using PlanContext): IO[Unit] = {
-    // Fetch encrypted password from DB
-    val sql = s"SELECT password FROM ${schemaName}.user_password_table WHERE user_id = ?"
-    val params = List(SqlParameter("String", userID))
+  private def validatePassword(encryptedPassword: String, inputPassword: String): IO[Unit] = {
     val encryptedInput = MessageDigest.getInstance("SHA-256")
-      .digest(password.getBytes("UTF-8"))
+      .digest(inputPassword.getBytes("UTF-8"))
       .map("%02x".format(_))
       .mkString
     for {
-      encryptedPassword <- readDBString(sql, params)
-      // Verify with encrypted password (assuming bcrypt for hashing)
-      isPasswordMatch <- IO(java.util.Objects.equals(encryptedPassword, encryptedInput)) // Replace this with a secure comparison logic
-//      _ <- IO(logger.info(s"encrypted: ${encryptedPassword}, input: ${inputPassword}"))
+      // Verify with encrypted password
+      isPasswordMatch <- IO(MessageDigest.isEqual(encryptedPassword.getBytes("UTF-8"), encryptedInput.getBytes("UTF-8")))
       _ <- if (!isPasswordMatch)
         IO.raiseError(new IllegalArgumentException("身份验证失败：用户名或密码不正确"))
       else IO.unit
     } yield ()
   }
-}
\ No newline at end of file
+}
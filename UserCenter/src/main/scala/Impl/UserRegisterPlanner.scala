@@ -10,7 +10,7 @@ import Common.DBAPI.*
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import cats.effect.IO
-import org.slf4j.LoggerFactory
+import Common.TraceLogger
 import org.joda.time.DateTime
 import io.circe.*
 import io.circe.syntax.*
@@ -42,7 +42,7 @@ case class UserRegisterPlanner(
   override val planContext: PlanContext
 ) extends Planner[String] {
 
-  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+  val logger = TraceLogger(this.getClass, planContext.traceID)
 
   override def plan(using PlanContext): IO[String] = {
     for {
@@ -68,7 +68,9 @@ case class UserRegisterPlanner(
 
       // Step 6: 生成用户令牌并保存到 UserSessionTable
       _ <- IO(logger.info("Step 6: 生成用户令牌并更新至 UserSessionTable"))
-      userToken <- generateUserToken(userID)
+      // 新用户没有旧会话，不需要失效令牌缓存
+      issued <- generateUserToken(userID)
+      (userToken, _) = issued
 
       // Step 7: 返回用户令牌
       _ <- IO(logger.info(s"Step 7: 返回用户令牌: ${userToken}"))
@@ -2,7 +2,7 @@
 package Process
 
 import Common.API.{API, PlanContext, TraceID}
-import Common.DBAPI.{initSchema, writeDB}
+import Common.DBAPI.{IndexDefinition, initSchema, startTransaction, writeDB}
 import Common.ServiceUtils.schemaName
 import Global.ServerConfig
 import cats.effect.IO
@@ -13,13 +13,28 @@ import Process.ProcessUtils.server2DB
 import Global.GlobalVariables
 
 object Init {
+  /** 用户中心的二级索引 */
+  val indexes: List[IndexDefinition] = List(
+    // 登录、注册按用户名查找
+    IndexDefinition("user_info_table_name_idx", "user_info_table", "name"),
+    // GetAllIdleRiders / GetAllMerchants 按用户类型与状态筛选
+    IndexDefinition("user_info_table_type_status_idx", "user_info_table", "user_type, status"),
+    // validateUserToken 按令牌查会话
+    IndexDefinition("user_session_table_token_idx", "user_session_table", "user_token", unique = true),
+    // 多会话模式下按用户清理旧会话
+    IndexDefinition("user_multi_session_table_user_id_idx", "user_multi_session_table", "user_id, generate_time")
+  )
+
   def init(config: ServerConfig): IO[Unit] = {
     given PlanContext = PlanContext(traceID = TraceID(UUID.randomUUID().toString), 0)
     given DBConfig = server2DB(config)
 
     val program: IO[Unit] = for {
       _ <- IO(GlobalVariables.isTest=config.isTest)
-      _ <- API.init(config.maximumClientConnection)
+      _ <- Common.Tracing.init(config.spanExportPath)
+      _ <- Common.Logging.init(config.productionLogging, config.payloadLogSampleRate)
+      _ <- IO(config.elideReadOnlyTransactions.foreach(Common.API.Planner.elideReadOnlyTransactions = _))
+      _ <- IO(config.maxSessionsPerUser.foreach(GlobalVariables.maxSessionsPerUser = _))
       _ <- Common.DBAPI.SwitchDataSourceMessage(projectName = Global.ServiceCenter.projectName).send
       _ <- initSchema(schemaName)
             /** 存储用户的加密密码信息
@@ -78,6 +93,48 @@ object Init {
         """,
         List()
       )
+      /** 多会话表（maxSessionsPerUser > 1 时使用），每个令牌一行，同一用户可以同时持有多个有效令牌
+       * user_token: 用户令牌
+       * user_id: 用户ID
+       * generate_time: 令牌生成时间
+       * expire_time: 令牌过期时间
+       */
+      _ <- writeDB(
+        s"""
+        CREATE TABLE IF NOT EXISTS "${schemaName}"."user_multi_session_table" (
+            user_token VARCHAR NOT NULL PRIMARY KEY,
+            user_id VARCHAR NOT NULL,
+            generate_time TIMESTAMP NOT NULL,
+            expire_time TIMESTAMP NOT NULL
+        );
+         
+        """,
+        List()
+      )
+      /** 用户位置表，调度服务据此就近为订单匹配骑手
+       * user_id: 用户ID
+       * latitude: 纬度
+       * longitude: 经度
+       * update_time: 最近一次上报时间
+       */
+      _ <- writeDB(
+        s"""
+        CREATE TABLE IF NOT EXISTS "${schemaName}"."user_location_table" (
+            user_id VARCHAR NOT NULL PRIMARY KEY,
+            latitude DOUBLE PRECISION NOT NULL,
+            longitude DOUBLE PRECISION NOT NULL,
+            update_time TIMESTAMP NOT NULL
+        );
+         
+        """,
+        List()
+      )
+      // 二级索引：缺失的在后台并发建立，不阻塞服务启动，已有 schema 也由此完成迁移
+      _ <- IndexDefinition.ensureIndexes(schemaName, indexes).start
+      // 会话迁移失败不影响启动，只是切换模式前签发的令牌需要重新登录；
+      // 使用单独的 traceID，避免后台建索引的语句进入迁移的事务
+      _ <- migrateSessions(GlobalVariables.maxSessionsPerUser)(using PlanContext(TraceID(UUID.randomUUID().toString), 0))
+        .handleErrorWith(err => IO(println(s"[Warning] 迁移会话表失败：${err.getMessage}")))
     } yield ()
 
     program.handleErrorWith(err => IO {
@@ -85,5 +142,40 @@ object Init {
       err.printStackTrace()
     })
   }
+
+  /**
+   * 单会话与多会话模式的令牌存在不同的表中。修改 maxSessionsPerUser 后把另一张表中的会话搬到当前模式使用的表，
+   * 已登录的用户不会因此掉线；从多会话切回单会话时每个用户只保留最新的一个会话。
+   * 搬运与清空在同一个事务中完成；只用 Postgres 与本地 SQLite 替身都支持的语法。
+   */
+  private def migrateSessions(maxSessions: Int)(using PlanContext): IO[Unit] = {
+    val singleTable = s""""${schemaName}"."user_session_table""""
+    val multiTable = s""""${schemaName}"."user_multi_session_table""""
+    val (insertSql, sourceTable) =
+      if (maxSessions <= 1) (
+        s"""
+        INSERT INTO ${singleTable} (user_id, user_token, generate_time, expire_time)
+        SELECT m.user_id, m.user_token, m.generate_time, m.expire_time
+        FROM ${multiTable} m
+        WHERE m.user_token = (
+            SELECT MAX(latest.user_token) FROM ${multiTable} latest
+            WHERE latest.user_id = m.user_id
+              AND latest.generate_time = (SELECT MAX(g.generate_time) FROM ${multiTable} g WHERE g.user_id = m.user_id)
+          )
+          AND NOT EXISTS (SELECT 1 FROM ${singleTable} s WHERE s.user_id = m.user_id)
+        """,
+        multiTable
+      ) else (
+        s"""
+        INSERT INTO ${multiTable} (user_token, user_id, generate_time, expire_time)
+        SELECT s.user_token, s.user_id, s.generate_time, s.expire_time
+        FROM ${singleTable} s
+        WHERE NOT EXISTS (SELECT 1 FROM ${multiTable} m WHERE m.user_token = s.user_token)
+        """,
+        singleTable
+      )
+    startTransaction {
+      writeDB(insertSql, List()) >> writeDB(s"DELETE FROM ${sourceTable}", List())
+    }.void
+  }
 }
-    
\ No newline at end of file
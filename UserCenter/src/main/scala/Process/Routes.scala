@@ -1,14 +1,15 @@
 
 package Process
 
-import Common.API.PlanContext
+import Common.API.{PlanContext, PlanRoute}
 import Common.DBAPI.DidRollbackException
+import Common.{Logging, Metrics, Tracing}
+import org.typelevel.ci.CIString
 import cats.effect.*
 import fs2.concurrent.Topic
 import io.circe.*
 import io.circe.derivation.Configuration
 import io.circe.generic.auto.*
-import io.circe.parser.decode
 import io.circe.syntax.*
 import org.http4s.*
 import org.http4s.client.Client
@@ -21,7 +22,11 @@ import Impl.UserLoginPlanner
 import Impl.GetUserInfoByTokenPlanner
 import Impl.UpdateStatusPlanner
 import Impl.UserRegisterPlanner
+import Impl.BatchUpdateRiderStatusPlanner
+import Impl.UpdateUserLocationPlanner
+import Impl.GetUserLocationsPlanner
 import Common.API.TraceID
+import Objects.UserCenter.{UserInfo, UserLocation}
 import org.joda.time.DateTime
 import org.http4s.circe.*
 import java.util.UUID
@@ -30,72 +35,54 @@ import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
 object Routes:
   val projects: TrieMap[String, Topic[IO, String]] = TrieMap.empty
 
-  private def executePlan(messageType: String, str: String): IO[String] =
-    messageType match {
-      case "GetAllIdleRiders" =>
-        IO(
-          decode[GetAllIdleRidersPlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetAllIdleRiders[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
-      case "GetAllMerchants" =>
-        IO(
-          decode[GetAllMerchantsPlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetAllMerchants[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
-      case "UserLogin" =>
-        IO(
-          decode[UserLoginPlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for UserLogin[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
-      case "GetUserInfoByToken" =>
-        IO(
-          decode[GetUserInfoByTokenPlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetUserInfoByToken[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
-      case "UpdateStatus" =>
-        IO(
-          decode[UpdateStatusPlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for UpdateStatus[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
-      case "UserRegister" =>
-        IO(
-          decode[UserRegisterPlanner](str) match
-            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for UserRegister[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
-        ).flatten
-       
+  /** 消息名 -> 处理函数，启动时构建一次 */
+  private val planRoutes: Map[String, PlanRoute] = Map(
+    "GetAllIdleRiders" -> PlanRoute[GetAllIdleRidersPlanner, List[UserInfo]],
+    "GetAllMerchants" -> PlanRoute[GetAllMerchantsPlanner, List[UserInfo]],
+    "UserLogin" -> PlanRoute[UserLoginPlanner, String],
+    "GetUserInfoByToken" -> PlanRoute[GetUserInfoByTokenPlanner, UserInfo],
+    "UpdateStatus" -> PlanRoute[UpdateStatusPlanner, String],
+    "UserRegister" -> PlanRoute[UserRegisterPlanner, String],
+    "BatchUpdateRiderStatus" -> PlanRoute[BatchUpdateRiderStatusPlanner, String],
+    "UpdateUserLocation" -> PlanRoute[UpdateUserLocationPlanner, String],
+    "GetUserLocations" -> PlanRoute[GetUserLocationsPlanner, List[UserLocation]]
+  )
 
-      case "test" =>
-        for {
-          output  <- Utils.Test.test(str)(using  PlanContext(TraceID(""), 0))
-        } yield output
-      case _ =>
+  private def executePlan(messageType: String, body: JsonObject, planContext: PlanContext): IO[Json] =
+    planRoutes.get(messageType) match {
+      case Some(route) => route.run(messageType, body, planContext)
+      case None if messageType == "test" =>
+        Utils.Test.test(Json.fromJsonObject(body).noSpaces)(using PlanContext(TraceID(""), 0)).map(Json.fromString)
+      case None =>
         IO.raiseError(new Exception(s"Unknown type: $messageType"))
     }
 
-  def handlePostRequest(req: Request[IO]): IO[String] = {
-    req.as[Json].map {
-      bodyJson => {
-        val planContext = PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0)
-        val planContextJson = planContext.asJson
-        val updatedJson = bodyJson.deepMerge(Json.obj("planContext" -> planContextJson))
-        updatedJson.toString
+  /** 为请求分配新的 TraceID，返回 planContext 与解析后的请求体；请求体从字节流直接解析为 JSON，只解析一次 */
+  def readPostRequest(req: Request[IO]): IO[(PlanContext, JsonObject)] =
+    req.as[Json].flatMap { bodyJson =>
+      bodyJson.asObject match {
+        case Some(body) => IO.pure(PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0) -> body)
+        case None => IO.raiseError(new Exception("Request body must be a JSON object"))
       }
     }
-  }
+
   val service: HttpRoutes[IO] = HttpRoutes.of[IO] {
     case GET -> Root / "health" =>
       Ok("OK")
+
+    case GET -> Root / "metrics" =>
+      Ok(Metrics.render)
+
+    case DELETE -> Root / "metrics" =>
+      IO(Metrics.reset()) >> Ok("OK")
+
+    /** 运行时切换日志模式，便于对比两种模式下的吞吐 */
+    case POST -> Root / "logging" / mode =>
+      mode match {
+        case "production" => Logging.setMode(true) >> Ok("OK")
+        case "development" => Logging.setMode(false) >> Ok("OK")
+        case _ => BadRequest(s"Unknown logging mode: $mode".asJson.toString)
+      }
       
     case GET -> Root / "stream" / projectName =>
       projects.get(projectName) match {
@@ -115,8 +102,11 @@ object Routes:
           }
       }
     case req@POST -> Root / "api" / name =>
-      handlePostRequest(req).flatMap {
-        executePlan(name, _)
+      readPostRequest(req).flatMap { (planContext, body) =>
+        val header = (key: String) => req.headers.get(CIString(key)).map(_.head.value)
+        Tracing.continueFrom(header(Tracing.TraceHeader), header(Tracing.ParentSpanHeader)) {
+          Tracing.span(Tracing.Route, name)(Metrics.time(Metrics.Route, name, planContext.traceID)(executePlan(name, body, planContext)))(using planContext)
+        }
       }.flatMap(Ok(_))
       .handleErrorWith {
         case e: DidRollbackException =>
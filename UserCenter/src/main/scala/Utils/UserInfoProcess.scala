@@ -17,18 +17,27 @@ import Common.API.PlanContext
 import Common.DBAPI.{decodeField, readDBJsonOptional}
 import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
 import Common.API.{PlanContext}
+import APIs.DispatcherService.PublishDispatchEvents
+import Objects.DispatcherService.{DispatchEvent, DispatchEventType}
+import Objects.UserCenter.RiderStatus
+import Global.GlobalVariables
 
 case object UserInfoProcess {
   private val logger = LoggerFactory.getLogger(getClass)
   //process plan code 预留标志位，不要删除
-    def validateUserToken(userToken: String)(using PlanContext): IO[String] = {
+    def validateUserToken(userToken: String)(using PlanContext): IO[String] =
+      validateUserSession(userToken).map(_._1)
+
+    /** 校验令牌并返回 (userID, 令牌过期时间) */
+    def validateUserSession(userToken: String)(using PlanContext): IO[(String, DateTime)] = {
   // // val logger = LoggerFactory.getLogger(getClass)  // 同文后端处理: logger 统一  // 同文后端处理: logger 统一
       logger.info(s"[validateUserToken] 开始验证用户令牌的有效性：userToken=${userToken}")
     
+      val sessionTable = if (GlobalVariables.maxSessionsPerUser <= 1) "user_session_table" else "user_multi_session_table"
       val query =
         s"""
            SELECT user_id, expire_time
-           FROM ${schemaName}.user_session_table
+           FROM ${schemaName}.${sessionTable}
            WHERE user_token = ?
          """
       val params = List(SqlParameter("String", userToken))
@@ -36,7 +45,7 @@ case object UserInfoProcess {
       for {
         // 查询数据库是否存在满足条件的数据
         userSessionOpt <- readDBJsonOptional(query, params)
-        userID <- userSessionOpt match {
+        session <- userSessionOpt match {
           case Some(json) =>
             val userID = decodeField[String](json, "user_id")
             val expireTime = decodeField[DateTime](json, "expire_time")
@@ -49,7 +58,7 @@ case object UserInfoProcess {
               IO.raiseError(new Exception(errorMessage))
             } else {
               logger.info(s"[validateUserToken] 令牌未过期：expireTime=${expireTime}")
-              IO.pure(userID)
+              IO.pure(userID -> expireTime)
             }
     
           case None =>
@@ -58,11 +67,15 @@ case object UserInfoProcess {
             IO.raiseError(new Exception(errorMessage))
         }
       } yield {
-        logger.info(s"[validateUserToken] 验证成功，返回userID=${userID}")
-        userID
+        logger.info(s"[validateUserToken] 验证成功，返回userID=${session._1}")
+        session
       }
     }
-    def generateUserToken(userID: String)(using PlanContext): IO[String] = {
+    /**
+     * 签发新令牌，返回新令牌以及多会话模式下因超出上限或过期被清理的令牌（单会话模式下为空，旧令牌由 upsert 覆盖）。
+     * 令牌缓存的失效由调用方在事务提交后完成。
+     */
+    def generateUserToken(userID: String)(using PlanContext): IO[(String, List[String])] = {
   // // val logger = LoggerFactory.getLogger("generateUserToken")  // 同文后端处理: logger 统一  // 同文后端处理: logger 统一
     
       logger.info(s"开始为用户 ${userID} 生成新的 userToken")
@@ -70,53 +83,81 @@ case object UserInfoProcess {
       val newUserToken = java.util.UUID.randomUUID().toString
       val generateTime = DateTime.now
       val expireTime = generateTime.plusHours(1) // Token 过期时间为1小时
+      val maxSessions = GlobalVariables.maxSessionsPerUser
     
-      val checkSql = s"""
-        SELECT user_token
-        FROM ${schemaName}.user_session_table
-        WHERE user_id = ?
+      for {
+        revokedTokens <- if (maxSessions <= 1) upsertSingleSession(userID, newUserToken, generateTime, expireTime).as(Nil)
+                         else insertSession(userID, newUserToken, generateTime, expireTime, maxSessions)
+        _ <- IO(logger.info(s"成功为用户 ${userID} 生成的 userToken: ${newUserToken}"))
+      } yield newUserToken -> revokedTokens
+    }
+
+    /**
+     * 单会话模式：一条 upsert 语句完成签发，user_id 上的主键保证同一用户并发登录时只保留最后一个令牌。
+     */
+    private def upsertSingleSession(userID: String, userToken: String, generateTime: DateTime, expireTime: DateTime)(using PlanContext): IO[String] = {
+      val upsertSql = s"""
+        INSERT INTO ${schemaName}.user_session_table (user_id, user_token, generate_time, expire_time)
+        VALUES (?, ?, TO_TIMESTAMP(?), TO_TIMESTAMP(?))
+        ON CONFLICT (user_id) DO UPDATE
+        SET user_token = EXCLUDED.user_token, generate_time = EXCLUDED.generate_time, expire_time = EXCLUDED.expire_time
       """.stripMargin
-      val checkParams = List(SqlParameter("String", userID))
-    
+      IO(logger.info(s"写入 userID=${userID} 的会话（单会话 upsert）")) >>
+        writeDB(upsertSql, List(
+          SqlParameter("String", userID),
+          SqlParameter("String", userToken),
+          SqlParameter("Double", (generateTime.getMillis.toDouble / 1000).toString),
+          SqlParameter("Double", (expireTime.getMillis.toDouble / 1000).toString)
+        ))
+    }
+
+    /**
+     * 多会话模式：每次登录插入一行新会话，再清理该用户已过期的会话以及超出 maxSessions 的最早会话。
+     * 并发登录各自插入不同的令牌，互不覆盖。
+     */
+    private def insertSession(userID: String, userToken: String, generateTime: DateTime, expireTime: DateTime, maxSessions: Int)(using PlanContext): IO[List[String]] = {
       val insertSql = s"""
-        INSERT INTO ${schemaName}.user_session_table (user_id, user_token, generate_time, expire_time)
+        INSERT INTO ${schemaName}.user_multi_session_table (user_token, user_id, generate_time, expire_time)
         VALUES (?, ?, TO_TIMESTAMP(?), TO_TIMESTAMP(?))
       """.stripMargin
-      val insertParams = List(
-        SqlParameter("String", userID),
-        SqlParameter("String", newUserToken),
-        SqlParameter("Double", (generateTime.getMillis.toDouble / 1000).toString),
-        SqlParameter("Double", (expireTime.getMillis.toDouble / 1000).toString)
-      )
-    
-      val updateSql = s"""
-        UPDATE ${schemaName}.user_session_table
-        SET user_token = ?, generate_time = TO_TIMESTAMP(?), expire_time = TO_TIMESTAMP(?)
+      val pruneSql = s"""
+        DELETE FROM ${schemaName}.user_multi_session_table
         WHERE user_id = ?
+          AND user_token NOT IN (
+            SELECT user_token
+            FROM ${schemaName}.user_multi_session_table
+            WHERE user_id = ? AND expire_time > TO_TIMESTAMP(?)
+            ORDER BY generate_time DESC
+            LIMIT ?
+          )
+        RETURNING user_token
       """.stripMargin
-      val updateParams = List(
-        SqlParameter("String", newUserToken),
-        SqlParameter("Double", (generateTime.getMillis.toDouble / 1000).toString),
-        SqlParameter("Double", (expireTime.getMillis.toDouble / 1000).toString),
-        SqlParameter("String", userID)
-      )
-    
       for {
-        _ <- IO(logger.info(s"检查数据库中是否存在 userID=${userID} 的记录"))
-        userExistsOpt <- readDBJsonOptional(checkSql, checkParams)
-    
-        _ <- userExistsOpt match {
-          case Some(_) =>
-            IO(logger.info(s"找到已存在 userID=${userID} 的记录，更新 userToken")) >>
-            writeDB(updateSql, updateParams) >> 
-            IO(logger.info(s"更新成功: userToken=${newUserToken}"))
-          case None =>
-            IO(logger.info(s"未找到 userID=${userID} 的记录，插入新 userToken")) >>
-            writeDB(insertSql, insertParams) >>
-            IO(logger.info(s"插入成功: userToken=${newUserToken}"))
-        }
-    
-        _ <- IO(logger.info(s"成功为用户 ${userID} 生成的 userToken: ${newUserToken}"))
-      } yield newUserToken
+        _ <- IO(logger.info(s"写入 userID=${userID} 的会话（多会话，最多 ${maxSessions} 个）"))
+        _ <- writeDB(insertSql, List(
+          SqlParameter("String", userToken),
+          SqlParameter("String", userID),
+          SqlParameter("Double", (generateTime.getMillis.toDouble / 1000).toString),
+          SqlParameter("Double", (expireTime.getMillis.toDouble / 1000).toString)
+        ))
+        pruned <- readDBRows(pruneSql, List(
+          SqlParameter("String", userID),
+          SqlParameter("String", userID),
+          SqlParameter("Double", (generateTime.getMillis.toDouble / 1000).toString),
+          SqlParameter("Int", maxSessions.toString)
+        ))
+      } yield pruned.map(row => decodeField[String](row, "user_token"))
     }
+
+    /**
+     * 把骑手状态变更异步推送给调度服务，不等待结果，推送失败只记录日志，不影响当前请求。
+     * 只应在事务提交后调用（见 Planner.afterCommit），否则调度服务可能把随后被回滚的状态当作空闲骑手。
+     */
+    def publishRiderStatusChanged(riderIDs: List[String], newStatus: RiderStatus)(using PlanContext): IO[Unit] =
+      if (riderIDs.isEmpty) IO.unit
+      else PublishDispatchEvents(riderIDs.map { riderID =>
+        DispatchEvent(eventType = DispatchEventType.RiderStatusChanged, riderID = Some(riderID), riderStatus = Some(newStatus))
+      }).send
+        .handleErrorWith(e => IO(logger.warn(s"推送骑手状态事件失败：${e.getMessage}")))
+        .start.void
 }
@@ -0,0 +1,64 @@
+package Utils
+
+import Common.TtlCache
+import Objects.UserCenter.UserInfo
+import cats.effect.IO
+import org.joda.time.DateTime
+
+import java.util.concurrent.atomic.{AtomicLong, AtomicLongArray}
+import scala.collection.concurrent.TrieMap
+
+/**
+ * userToken -> UserInfo 缓存，条目在令牌的 expire_time 过期。
+ * 令牌轮换（UserLogin）或用户信息变更（如骑手状态）的事务提交后按 userID 失效该用户的全部令牌。
+ *  - 每次失效把全局代数加一，并记到该用户所在的桶（按 userID 哈希分桶）
+ *  - GetUserInfoByToken 在查询会话表之前记下当前代数，写回缓存时若该用户的桶在此之后被失效过则丢弃，
+ *    避免与写操作并发的读取把提交前的令牌或用户信息放回缓存
+ */
+case object UserTokenCache {
+  private val maxEntries = 100000
+  private val generationBuckets = 1024
+
+  // userID -> 该用户已缓存的令牌，用于按用户失效
+  private val tokensByUser: TrieMap[String, Set[String]] = TrieMap.empty
+
+  private val cache = new TtlCache[String, UserInfo](maxEntries, (token, userInfo) => unindex(userInfo.userID, token))
+
+  private val generation = new AtomicLong(0)
+  // 每个桶最近一次失效时的代数
+  private val invalidatedAt = new AtomicLongArray(generationBuckets)
+
+  private def bucket(userID: String): Int = (userID.hashCode & Int.MaxValue) % generationBuckets
+
+  def get(userToken: String): Option[UserInfo] = cache.get(userToken)
+
+  /** 读取会话和用户信息之前调用，结果传给 put */
+  def currentGeneration: Long = generation.get
+
+  /** readGeneration 之后该用户被失效过时不写入：读到的可能是失效前的数据 */
+  def put(userToken: String, userInfo: UserInfo, expireTime: DateTime, readGeneration: Long): Unit = synchronized {
+    if (invalidatedAt.get(bucket(userInfo.userID)) <= readGeneration) {
+      cache.put(userToken, userInfo, expireTime.getMillis)
+      tokensByUser.updateWith(userInfo.userID)(tokens => Some(tokens.getOrElse(Set.empty) + userToken))
+    }
+  }
+
+  /** 在写操作的事务提交后调用（见 Planner.afterCommit） */
+  def invalidateUser(userID: String): IO[Unit] = IO(synchronized {
+    invalidatedAt.set(bucket(userID), generation.incrementAndGet())
+    tokensByUser.remove(userID).foreach(_.foreach(cache.remove))
+  })
+
+  /**
+   * 只失效该用户的部分令牌（多会话模式下被清理的会话），其他会话的缓存保留。
+   * 同样推进该用户的代数，正在读取被清理令牌的请求不会把它放回缓存
+   */
+  def invalidateTokens(userID: String, userTokens: List[String]): IO[Unit] =
+    IO.whenA(userTokens.nonEmpty)(IO(synchronized {
+      invalidatedAt.set(bucket(userID), generation.incrementAndGet())
+      userTokens.foreach(cache.remove)
+    }))
+
+  private def unindex(userID: String, userToken: String): Unit =
+    tokensByUser.updateWith(userID)(_.map(_ - userToken).filter(_.nonEmpty))
+}
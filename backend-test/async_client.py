@@ -0,0 +1,138 @@
+"""
+基于 asyncio + aiohttp 的异步调用层。
+
+每个服务端口各自维护一个 ClientSession（连接池 + keep-alive），
+单个进程即可并发发出上千个请求，客户端开销不再淹没服务端耗时。
+依赖 aiohttp：pip install -r requirements.txt
+
+用法示例：
+    async with AsyncServiceClient() as client:
+        user = await register_user(client, user_type=CUSTOMER)
+        token = await login(client, user["name"], user["password"])
+"""
+import json
+import time
+
+import aiohttp
+
+import test as harness
+from test import (
+    CUSTOMER, PASSWORD, DEFAULT_CONTACT_NUMBER,
+    USER_SERVICE, ORDER_SERVICE, PRODUCT_SERVICE,
+    gen_url, gen_name,
+)
+
+# ----------------------
+# 客户端
+# ----------------------
+
+class ApiResponse:
+    """与 requests.Response 用法一致的最小响应对象（status_code / text / json()）"""
+
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class AsyncServiceClient:
+    """按服务端口分别池化连接的异步客户端"""
+
+    def __init__(self, limit_per_service: int = 1000, keepalive_timeout: float = 30, timeout: float = 30):
+        self.limit_per_service = limit_per_service
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._sessions = {}
+
+    def session_for(self, service: str) -> aiohttp.ClientSession:
+        session = self._sessions.get(service)
+        if session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit_per_service,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._sessions[service] = session
+        return session
+
+    async def call_api(self, service: str, call_name: str, **args) -> ApiResponse:
+        for hook in harness.CALL_HOOKS:
+            await hook.async_before_call(call_name)
+        start = time.perf_counter()
+        status_code = None
+        try:
+            async with self.session_for(service).post(gen_url(service, call_name), json=args) as response:
+                text = await response.text()
+                status_code = response.status
+                return ApiResponse(status_code, text)
+        finally:
+            for hook in harness.CALL_HOOKS:
+                hook.after_call(call_name, time.perf_counter() - start, status_code)
+
+    async def close(self):
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+# ----------------------
+# 异步版业务辅助函数（与 test.py 中的同名函数一一对应）
+# ----------------------
+
+async def register_user(client, name=None, user_type=CUSTOMER, password=PASSWORD, contact_number=DEFAULT_CONTACT_NUMBER, address=""):
+    if name is None:
+        name = gen_name()
+
+    response = await client.call_api(USER_SERVICE, "UserRegister",
+                                     name=name,
+                                     contactNumber=contact_number,
+                                     password=password,
+                                     userType=user_type,
+                                     address=address)
+
+    assert response.status_code == 200, f"注册失败：{response.text}"
+    token = response.json()
+    assert isinstance(token, str) and len(token) > 0, "注册返回的 token 异常"
+
+    return {
+        "name": name,
+        "password": password
+    }
+
+async def login(client, name, password):
+    response = await client.call_api(USER_SERVICE, "UserLogin", name=name, password=password)
+    assert response.status_code == 200, f"登录失败：{response.text}"
+    return response.json()
+
+async def get_user_info_by_token(client, token: str):
+    return await client.call_api(USER_SERVICE, "GetUserInfoByToken", userToken=token)
+
+async def add_product(client, merchant_token, name, price, description):
+    return await client.call_api(PRODUCT_SERVICE, "MerchantAddProductMessage",
+                                 merchantToken=merchant_token,
+                                 name=name,
+                                 price=price,
+                                 description=description)
+
+async def fetch_products_by_merchant_id(client, merchant_id: str):
+    return await client.call_api(PRODUCT_SERVICE, "FetchProductsByMerchantIDMessage", merchantID=merchant_id)
+
+async def create_order(client, customer_token, merchant_id, product_list, destination_address):
+    return await client.call_api(ORDER_SERVICE, "CreateOrder",
+                                 customerToken=customer_token,
+                                 merchantID=merchant_id,
+                                 productList=product_list,
+                                 destinationAddress=destination_address)
+
+async def query_orders_by_user(client, user_token: str):
+    return await client.call_api(ORDER_SERVICE, "QueryOrdersByUser", userToken=user_token)
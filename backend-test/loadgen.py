@@ -0,0 +1,240 @@
+"""
+压测模式：按给定并发和目标 RPS 重放 test.py 中的业务流程，
+统计每个 /api/<call_name> 接口的 p50/p95/p99 延迟与错误率。
+
+用法示例：
+    python loadgen.py --concurrency 32 --rps 200 --duration 60
+    python loadgen.py --async --concurrency 2000 --duration 60   # 单进程异步模式
+"""
+import argparse
+import asyncio
+import math
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import async_client
+import test as harness
+from test import (
+    CUSTOMER, MERCHANT, USER_SERVICE, ORDER_SERVICE,
+    call_api, register_user, get_user_info_by_token,
+    add_product, fetch_products_by_merchant_id, create_order,
+)
+
+# ----------------------
+# 统计与限流
+# ----------------------
+
+def percentile(sorted_values, p):
+    """在已排序的列表上取第 p 百分位（最近秩法）"""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(p / 100 * len(sorted_values)))) - 1
+    return sorted_values[rank]
+
+
+class LatencyRecorder:
+    """按 call_name 记录每次调用的耗时与是否出错"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def before_call(self, call_name):
+        pass
+
+    async def async_before_call(self, call_name):
+        pass
+
+    def after_call(self, call_name, elapsed, status_code):
+        with self._lock:
+            self.latencies[call_name].append(elapsed)
+            if status_code != 200:
+                self.errors[call_name] += 1
+
+    def report(self, wall_time):
+        lines = [
+            f"{'endpoint':<40}{'count':>8}{'rps':>9}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'err%':>8}"
+        ]
+        for call_name in sorted(self.latencies):
+            values = sorted(self.latencies[call_name])
+            count = len(values)
+            lines.append(
+                f"{'/api/' + call_name:<40}{count:>8}{count / wall_time:>9.1f}"
+                f"{percentile(values, 50) * 1000:>10.1f}"
+                f"{percentile(values, 95) * 1000:>10.1f}"
+                f"{percentile(values, 99) * 1000:>10.1f}"
+                f"{self.errors[call_name] / count * 100:>8.2f}"
+            )
+        return "\n".join(lines)
+
+
+class RateLimiter:
+    """令牌桶限流，保证所有线程合计发出的请求不超过 rps（rps <= 0 表示不限流）"""
+
+    def __init__(self, rps):
+        self.interval = 1.0 / rps if rps > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_time = time.perf_counter()
+
+    def _reserve(self):
+        """预约下一个发送时间，返回需要等待的秒数"""
+        with self._lock:
+            now = time.perf_counter()
+            wait = self._next_time - now
+            self._next_time = max(self._next_time, now) + self.interval
+        return wait
+
+    def before_call(self, call_name):
+        if self.interval == 0.0:
+            return
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def async_before_call(self, call_name):
+        if self.interval == 0.0:
+            return
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def after_call(self, call_name, elapsed, status_code):
+        pass
+
+# ----------------------
+# 业务流程
+# ----------------------
+
+def login(name, password):
+    response = call_api(USER_SERVICE, "UserLogin", name=name, password=password)
+    assert response.status_code == 200, f"登录失败：{response.text}"
+    return response.json()
+
+
+def order_flow():
+    """register_user → UserLogin → add_product → create_order → QueryOrdersByUser"""
+    customer = register_user(user_type=CUSTOMER)
+    customer_token = login(customer["name"], customer["password"])
+
+    merchant = register_user(user_type=MERCHANT, address="上海市南京东路1号")
+    merchant_token = login(merchant["name"], merchant["password"])
+    merchant_id = get_user_info_by_token(merchant_token).json()["userID"]
+
+    add_product(merchant_token, "招牌奶茶", 15.9, "每日现做")
+    product_info = fetch_products_by_merchant_id(merchant_id).json()[0]
+
+    create_order(customer_token, merchant_id, [product_info], "上海市人民广场B座")
+    call_api(ORDER_SERVICE, "QueryOrdersByUser", userToken=customer_token)
+
+
+async def async_order_flow(client):
+    """order_flow 的异步版本，所有请求走 AsyncServiceClient 的连接池"""
+    customer = await async_client.register_user(client, user_type=CUSTOMER)
+    customer_token = await async_client.login(client, customer["name"], customer["password"])
+
+    merchant = await async_client.register_user(client, user_type=MERCHANT, address="上海市南京东路1号")
+    merchant_token = await async_client.login(client, merchant["name"], merchant["password"])
+    merchant_id = (await async_client.get_user_info_by_token(client, merchant_token)).json()["userID"]
+
+    await async_client.add_product(client, merchant_token, "招牌奶茶", 15.9, "每日现做")
+    product_info = (await async_client.fetch_products_by_merchant_id(client, merchant_id)).json()[0]
+
+    await async_client.create_order(client, customer_token, merchant_id, [product_info], "上海市人民广场B座")
+    await async_client.query_orders_by_user(client, customer_token)
+
+
+def run_load(concurrency, rps, duration, iterations):
+    """
+    以 concurrency 个线程循环执行 order_flow，直到达到 duration 秒或累计 iterations 次流程
+    :return: (LatencyRecorder, 实际耗时秒数, 失败的流程数)
+    """
+    recorder = LatencyRecorder()
+    limiter = RateLimiter(rps)
+    harness.CALL_HOOKS[:] = [limiter, recorder]
+
+    deadline = time.perf_counter() + duration if duration > 0 else None
+    counter_lock = threading.Lock()
+    state = {"started": 0, "failed": 0}
+
+    def worker():
+        while True:
+            with counter_lock:
+                if iterations > 0 and state["started"] >= iterations:
+                    return
+                state["started"] += 1
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            try:
+                order_flow()
+            except Exception as e:
+                with counter_lock:
+                    state["failed"] += 1
+                print(f"❌ 流程失败：{e}")
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for _ in range(concurrency):
+                executor.submit(worker)
+    finally:
+        harness.CALL_HOOKS[:] = []
+    return recorder, time.perf_counter() - start, state["failed"]
+
+
+async def run_load_async(concurrency, rps, duration, iterations):
+    """run_load 的异步版本：concurrency 个协程共享同一个 AsyncServiceClient"""
+    recorder = LatencyRecorder()
+    limiter = RateLimiter(rps)
+    harness.CALL_HOOKS[:] = [limiter, recorder]
+
+    deadline = time.perf_counter() + duration if duration > 0 else None
+    state = {"started": 0, "failed": 0}
+
+    async def worker(client):
+        while True:
+            if iterations > 0 and state["started"] >= iterations:
+                return
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            state["started"] += 1
+            try:
+                await async_order_flow(client)
+            except Exception as e:
+                state["failed"] += 1
+                print(f"❌ 流程失败：{e}")
+
+    start = time.perf_counter()
+    try:
+        async with async_client.AsyncServiceClient(limit_per_service=concurrency) as client:
+            await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    finally:
+        harness.CALL_HOOKS[:] = []
+    return recorder, time.perf_counter() - start, state["failed"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="eTuan 后端压测")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发线程数")
+    parser.add_argument("--rps", type=float, default=0, help="所有接口合计的目标每秒请求数，0 表示不限流")
+    parser.add_argument("--duration", type=float, default=30, help="压测时长（秒），0 表示只按 --iterations 控制")
+    parser.add_argument("--iterations", type=int, default=0, help="最多执行的流程次数，0 表示不限")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="使用 asyncio 单进程并发，而不是线程池")
+    args = parser.parse_args()
+
+    if args.duration <= 0 and args.iterations <= 0:
+        parser.error("--duration 和 --iterations 至少需要指定一个")
+
+    if args.use_async:
+        recorder, wall_time, failed = asyncio.run(
+            run_load_async(args.concurrency, args.rps, args.duration, args.iterations))
+    else:
+        recorder, wall_time, failed = run_load(args.concurrency, args.rps, args.duration, args.iterations)
+    print(recorder.report(wall_time))
+    print(f"总耗时 {wall_time:.1f}s，失败流程数 {failed}")
+
+
+if __name__ == "__main__":
+    main()
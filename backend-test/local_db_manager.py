@@ -0,0 +1,384 @@
+"""
+本地 db-manager 替身：在单机上代替外部的 db-manager（A000002，端口 10002），
+让四个服务和 backend-test 不依赖 Postgres 即可运行与压测。
+
+- 协议与 Common/DBAPI 中的消息一致：POST /api/<MessageName>，body 为消息 JSON（附带 planContext）
+  * 返回 String 的消息（WriteDB、ReadDBValue、StartTransaction ...）直接返回纯文本
+  * ReadDBRowsMessage 返回 JSON 数组，字段名按 snakeToCamel 规则转换（user_id -> userID）
+  * 出错时返回 400，body 为错误信息，服务端 API.send 会据此抛出异常
+- 存储使用 SQLite，每个 schema 对应一个 ATTACH 的数据库文件（WAL 模式）
+- Common.DBAPI.IndexDefinition 的建索引语句改写为 SQLite 语法，索引有效性查询（pg_index）按 sqlite_master 回答
+- 事务按 planContext.traceID 绑定连接：StartTransaction 时 BEGIN，EndTransaction 时 COMMIT / ROLLBACK
+- 事务内的 DECLARE / FETCH FORWARD / CLOSE 游标语句用 SQLite 游标模拟，事务结束时一并关闭
+- 记录每条 SQL 的耗时，GET /stats 返回按（消息类型, SQL）聚合的统计
+
+用法示例：
+    python local_db_manager.py                   # 数据放在临时目录，进程退出即丢弃
+    python local_db_manager.py --data-dir ./db   # 数据持久化到 ./db
+"""
+import argparse
+import json
+import math
+import os
+import queue
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ServiceUtils.portMap("A000002") = 2 + 10000
+DB_MANAGER_PORT = 10002
+
+# ----------------------
+# SQL 与参数转换（Postgres -> SQLite）
+# ----------------------
+
+# 时间统一以毫秒时间戳存储，与 Common 中 DateTime 的 Long 编解码保持一致
+_SQL_REWRITES = [
+    (re.compile(r"TO_TIMESTAMP\(\s*\?\s*\)", re.IGNORECASE), "CAST(ROUND(? * 1000) AS INTEGER)"),
+    (re.compile(r"\bNOW\(\)", re.IGNORECASE), "CAST(ROUND((julianday('now') - 2440587.5) * 86400000) AS INTEGER)"),
+    (re.compile(r"\bILIKE\b", re.IGNORECASE), "LIKE"),
+]
+
+
+# Common.DBAPI.IndexDefinition 生成的建索引语句：SQLite 的 schema 前缀写在索引名上，且没有 USING 与操作符类
+_CREATE_INDEX = re.compile(
+    r'CREATE\s+(UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+"([^"]+)"\s+ON\s+"([^"]+)"\."([^"]+)"\s+USING\s+\w+\s*\((.*)\)',
+    re.IGNORECASE | re.DOTALL)
+_OPERATOR_CLASS = re.compile(r"\s+\w+_ops\b", re.IGNORECASE)
+# Common.DBAPI.streamDBRows 使用的服务端游标
+_DECLARE_CURSOR = re.compile(r"^DECLARE\s+(\w+)\s+(?:NO\s+SCROLL\s+)?CURSOR\s+FOR\s+(.*)$", re.IGNORECASE | re.DOTALL)
+_FETCH_CURSOR = re.compile(r"^FETCH\s+FORWARD\s+(\d+)\s+FROM\s+(\w+)$", re.IGNORECASE)
+_CLOSE_CURSOR = re.compile(r"^CLOSE\s+(\w+)$", re.IGNORECASE)
+_INDEX_VALIDITY_QUERY = re.compile(r"\bFROM\s+pg_class\b.*\bpg_index\b", re.IGNORECASE | re.DOTALL)
+
+
+def translate_sql(sql):
+    for pattern, replacement in _SQL_REWRITES:
+        sql = pattern.sub(replacement, sql)
+    sql = _CREATE_INDEX.sub(
+        lambda m: f'CREATE {m.group(1) or ""}INDEX IF NOT EXISTS "{m.group(3)}"."{m.group(2)}" '
+                  f'ON "{m.group(4)}" ({_OPERATOR_CLASS.sub("", m.group(5))})',
+        sql)
+    sql = re.sub(r"\bINDEX\s+CONCURRENTLY\b", "INDEX", sql, flags=re.IGNORECASE)
+    return sql.strip()
+
+
+def convert_parameter(parameter):
+    data_type = parameter["dataType"].lower()
+    value = parameter["value"]
+    if data_type in ("int", "long"):
+        return int(value)
+    if data_type == "double":
+        return float(value)
+    if data_type == "boolean":
+        return 1 if value.lower() == "true" else 0
+    if data_type == "datetime":
+        return int(float(value))
+    return value
+
+
+def snake_to_camel(snake):
+    """与 Common.DBAPI.snakeToCamel 保持一致"""
+    head, *tail = snake.split("_")
+    return head + "".join("ID" if part == "id" else part[:1].upper() + part[1:] for part in tail)
+
+# ----------------------
+# 存储
+# ----------------------
+
+class _Connection(sqlite3.Connection):
+    """记录已 ATTACH 的 schema，新 schema 出现后按需补挂"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.attached = set()
+
+
+class SqliteBackend:
+    """管理 schema 文件、自动提交连接池以及按 traceID 绑定的事务连接"""
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.schemas = set()
+        self.project_name = None
+        self._schema_lock = threading.Lock()
+        self._idle = queue.LifoQueue()
+        self._transactions = {}
+        self._transactions_lock = threading.Lock()
+        # (traceID, 游标名) -> sqlite3.Cursor，只存在于事务连接上
+        self.cursors = {}
+
+    def _connect(self):
+        connection = sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False,
+                                     timeout=30, factory=_Connection)
+        connection.execute("PRAGMA busy_timeout = 30000")
+        self._attach_schemas(connection)
+        return connection
+
+    def _attach_schemas(self, connection):
+        for schema in self.schemas - connection.attached:
+            connection.execute("ATTACH DATABASE ? AS " + _quote(schema), (os.path.join(self.data_dir, schema + ".db"),))
+            connection.execute(f"PRAGMA {_quote(schema)}.journal_mode = WAL")
+            connection.attached.add(schema)
+
+    def init_schema(self, schema):
+        with self._schema_lock:
+            self.schemas.add(schema)
+        return "Success"
+
+    def acquire(self, trace_id):
+        """返回 (connection, 是否为事务连接)"""
+        with self._transactions_lock:
+            connection = self._transactions.get(trace_id)
+        if connection is not None:
+            return connection, True
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+        self._attach_schemas(connection)
+        return connection, False
+
+    def release(self, connection, in_transaction):
+        if not in_transaction:
+            self._idle.put(connection)
+
+    def start_transaction(self, trace_id):
+        connection, in_transaction = self.acquire(trace_id)
+        if in_transaction:
+            raise RuntimeError(f"Transaction already started for traceID={trace_id}")
+        connection.execute("BEGIN")
+        with self._transactions_lock:
+            self._transactions[trace_id] = connection
+        return "Success"
+
+    def end_transaction(self, trace_id, commit):
+        with self._transactions_lock:
+            connection = self._transactions.pop(trace_id, None)
+        if connection is None:
+            raise RuntimeError(f"No transaction for traceID={trace_id}")
+        with self._transactions_lock:
+            for key in [key for key in self.cursors if key[0] == trace_id]:
+                self.cursors.pop(key).close()
+        try:
+            connection.execute("COMMIT" if commit else "ROLLBACK")
+        finally:
+            self._idle.put(connection)
+        return "Success"
+
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+# ----------------------
+# 耗时统计
+# ----------------------
+
+class QueryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+
+    def record(self, message_type, sql, elapsed):
+        key = (message_type, " ".join(sql.split()))
+        with self._lock:
+            self.samples[key].append(elapsed)
+
+    def snapshot(self):
+        with self._lock:
+            items = [(key, sorted(values)) for key, values in self.samples.items()]
+        result = []
+        for (message_type, sql), values in items:
+            count = len(values)
+            result.append({
+                "messageType": message_type,
+                "sql": sql,
+                "count": count,
+                "totalMs": sum(values) * 1000,
+                "p50Ms": values[max(0, math.ceil(0.50 * count) - 1)] * 1000,
+                "p95Ms": values[max(0, math.ceil(0.95 * count) - 1)] * 1000,
+                "p99Ms": values[max(0, math.ceil(0.99 * count) - 1)] * 1000,
+                "maxMs": values[-1] * 1000,
+            })
+        result.sort(key=lambda item: item["totalMs"], reverse=True)
+        return result
+
+# ----------------------
+# 消息处理
+# ----------------------
+
+class LocalDBManager:
+    def __init__(self, data_dir):
+        self.backend = SqliteBackend(data_dir)
+        self.stats = QueryStats()
+
+    def handle(self, message_type, body):
+        """处理一条消息，返回 (是否为 JSON, 返回值)"""
+        trace_id = body.get("planContext", {}).get("traceID", "")
+        handler = getattr(self, "handle_" + message_type, None)
+        if handler is None:
+            raise ValueError(f"Unknown message type: {message_type}")
+        return handler(trace_id, body)
+
+    def handle_SwitchDataSourceMessage(self, trace_id, body):
+        self.backend.project_name = body["projectName"]
+        return False, "Success"
+
+    def handle_InitSchemaMessage(self, trace_id, body):
+        return False, self.backend.init_schema(body["schemaName"])
+
+    def handle_StartTransactionMessage(self, trace_id, body):
+        return False, self.backend.start_transaction(trace_id)
+
+    def handle_EndTransactionMessage(self, trace_id, body):
+        return False, self.backend.end_transaction(trace_id, body["commit"])
+
+    def _require_transaction(self, trace_id, statement):
+        with self.backend._transactions_lock:
+            if trace_id not in self.backend._transactions:
+                raise RuntimeError(f"{statement} can only be used in transaction blocks")
+
+    def _execute(self, message_type, trace_id, sql, run):
+        connection, in_transaction = self.backend.acquire(trace_id)
+        start = time.perf_counter()
+        try:
+            return run(connection, translate_sql(sql))
+        finally:
+            self.stats.record(message_type, sql, time.perf_counter() - start)
+            self.backend.release(connection, in_transaction)
+
+    def handle_ReadDBRowsMessage(self, trace_id, body):
+        def run(connection, sql):
+            if _INDEX_VALIDITY_QUERY.search(sql):
+                # IndexDefinition 查询索引是否存在且有效；SQLite 中建好的索引总是有效的
+                schema, index_name = [convert_parameter(p) for p in body["parameters"]]
+                found = connection.execute(f"SELECT 1 FROM {_quote(schema)}.sqlite_master WHERE type = 'index' AND name = ?",
+                                           (index_name,)).fetchone()
+                return [{"indisvalid": True}] if found else []
+            fetch = _FETCH_CURSOR.match(sql)
+            if fetch:
+                with self.backend._transactions_lock:
+                    cursor = self.backend.cursors.get((trace_id, fetch.group(2).lower()))
+                if cursor is None:
+                    raise LookupError(f"cursor {fetch.group(2)} does not exist")
+                columns = [snake_to_camel(description[0]) for description in cursor.description]
+                return [dict(zip(columns, row)) for row in cursor.fetchmany(int(fetch.group(1)))]
+            cursor = connection.execute(sql, [convert_parameter(p) for p in body["parameters"]])
+            columns = [snake_to_camel(description[0]) for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return True, self._execute("ReadDBRowsMessage", trace_id, body["sqlQuery"], run)
+
+    def handle_ReadDBValueMessage(self, trace_id, body):
+        def run(connection, sql):
+            row = connection.execute(sql, [convert_parameter(p) for p in body["parameters"]]).fetchone()
+            if row is None:
+                raise LookupError("ReadDBValueMessage returned no rows")
+            return "" if row[0] is None else str(row[0])
+        return False, self._execute("ReadDBValueMessage", trace_id, body["sqlQuery"], run)
+
+    def handle_WriteDBMessage(self, trace_id, body):
+        def run(connection, sql):
+            declare = _DECLARE_CURSOR.match(sql)
+            close = _CLOSE_CURSOR.match(sql)
+            if declare:
+                self._require_transaction(trace_id, "DECLARE CURSOR")
+                cursor = connection.execute(declare.group(2), [convert_parameter(p) for p in body["parameters"]])
+                with self.backend._transactions_lock:
+                    self.backend.cursors[(trace_id, declare.group(1).lower())] = cursor
+            elif close:
+                with self.backend._transactions_lock:
+                    cursor = self.backend.cursors.pop((trace_id, close.group(1).lower()), None)
+                if cursor is None:
+                    raise LookupError(f"cursor {close.group(1)} does not exist")
+                cursor.close()
+            else:
+                connection.execute(sql, [convert_parameter(p) for p in body["parameters"]])
+            return "Success"
+        return False, self._execute("WriteDBMessage", trace_id, body["sqlStatement"], run)
+
+    def handle_WriteDBListMessage(self, trace_id, body):
+        def run(connection, sql):
+            connection.executemany(sql, [[convert_parameter(p) for p in item["l"]] for item in body["parameters"]])
+            return "Success"
+        return False, self._execute("WriteDBListMessage", trace_id, body["sqlStatement"], run)
+
+
+def make_handler(manager):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status, content_type, payload):
+            data = payload.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, "text/plain; charset=utf-8", "OK")
+            elif self.path == "/stats":
+                self._reply(200, "application/json", json.dumps(manager.stats.snapshot(), ensure_ascii=False))
+            else:
+                self._reply(404, "text/plain; charset=utf-8", "Not Found")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            message_type = self.path.rsplit("/", 1)[-1]
+            try:
+                is_json, result = manager.handle(message_type, body)
+            except Exception as e:
+                self._reply(400, "text/plain; charset=utf-8", f"{type(e).__name__}: {e}")
+                return
+            if is_json:
+                self._reply(200, "application/json", json.dumps(result, ensure_ascii=False))
+            else:
+                self._reply(200, "text/plain; charset=utf-8", result)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_local_db_manager(port=DB_MANAGER_PORT, data_dir=None, host="127.0.0.1"):
+    """
+    在后台线程中启动 db-manager 替身，返回 (server, manager)。
+    调用 server.shutdown() 停止服务；manager.stats.snapshot() 获取 SQL 耗时统计。
+    """
+    if data_dir is None:
+        data_dir = tempfile.mkdtemp(prefix="etuan-db-")
+    os.makedirs(data_dir, exist_ok=True)
+    manager = LocalDBManager(data_dir)
+    server = ThreadingHTTPServer((host, port), make_handler(manager))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, manager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地 db-manager 替身（SQLite）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DB_MANAGER_PORT)
+    parser.add_argument("--data-dir", default=None, help="SQLite 文件目录，默认使用临时目录")
+    args = parser.parse_args()
+
+    server, manager = start_local_db_manager(args.port, args.data_dir, args.host)
+    print(f"✅ db-manager 替身已启动：http://{args.host}:{args.port}，数据目录 {manager.backend.data_dir}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        for item in manager.stats.snapshot()[:20]:
+            print(f"{item['totalMs']:>10.1f}ms  x{item['count']:<6} p99={item['p99Ms']:.2f}ms  "
+                  f"[{item['messageType']}] {item['sql'][:100]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+日志模式对比压测：依次把所有服务切到开发模式、生产模式（POST /logging/<mode>），
+在两种模式下用 loadgen 的 order_flow 跑同样的负载，对比吞吐和延迟。
+
+用法示例：
+    python logging_bench.py --concurrency 16 --duration 30
+    python logging_bench.py --modes production development --rounds 2
+"""
+import argparse
+
+from loadgen import run_load, percentile
+from metrics_report import SERVICES
+from test import get_session
+
+MODES = ["development", "production"]
+
+
+def set_logging_mode(mode):
+    for name, port in SERVICES.items():
+        response = get_session().post(f"http://localhost:{port}/logging/{mode}")
+        assert response.status_code == 200, f"{name} 切换日志模式失败：{response.text}"
+
+
+def run_mode(mode, concurrency, duration):
+    """切换到 mode 后压测 duration 秒，返回 (请求数/秒, p50 毫秒, p95 毫秒, 失败流程数)"""
+    set_logging_mode(mode)
+    recorder, wall_time, failed = run_load(concurrency, 0, duration, 0)
+    latencies = sorted(value for values in recorder.latencies.values() for value in values)
+    return (
+        len(latencies) / wall_time,
+        percentile(latencies, 50) * 1000,
+        percentile(latencies, 95) * 1000,
+        failed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="开发/生产日志模式吞吐对比")
+    parser.add_argument("--concurrency", type=int, default=16, help="并发线程数")
+    parser.add_argument("--duration", type=float, default=30, help="每种模式每轮的压测时长（秒）")
+    parser.add_argument("--rounds", type=int, default=1, help="轮数，多轮时两种模式交替运行以抵消预热影响")
+    parser.add_argument("--warmup", type=float, default=5, help="正式统计前的预热时长（秒），0 表示不预热")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES, help="参与对比的模式及运行顺序")
+    args = parser.parse_args()
+
+    if args.warmup > 0:
+        run_load(args.concurrency, 0, args.warmup, 0)
+
+    results = {mode: [] for mode in args.modes}
+    try:
+        for _ in range(args.rounds):
+            for mode in args.modes:
+                results[mode].append(run_mode(mode, args.concurrency, args.duration))
+    finally:
+        # 压测结束后恢复为默认的开发模式
+        set_logging_mode("development")
+
+    print(f"{'mode':<14}{'req/s':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'failed':>8}")
+    throughput = {}
+    for mode, rounds in results.items():
+        rps = sum(r[0] for r in rounds) / len(rounds)
+        p50 = sum(r[1] for r in rounds) / len(rounds)
+        p95 = sum(r[2] for r in rounds) / len(rounds)
+        failed = sum(r[3] for r in rounds)
+        throughput[mode] = rps
+        print(f"{mode:<14}{rps:>10.1f}{p50:>10.1f}{p95:>10.1f}{failed:>8}")
+
+    if "development" in throughput and "production" in throughput and throughput["development"] > 0:
+        change = (throughput["production"] / throughput["development"] - 1) * 100
+        print(f"生产模式吞吐相对开发模式：{change:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+抓取各服务 GET /metrics 暴露的延迟直方图，按阶段（route / send / db）汇总并打印最慢的环节。
+每个阶段附带最慢一次调用的 TraceID，可据此在对应服务的日志中定位请求。
+最后列出各服务发往每个目标服务的连接池占用情况（etuan_client_*），saturated 表示发出时连接已用满、需要排队的请求数。
+
+用法示例：
+    python metrics_report.py --reset          # 压测前清空各服务的指标
+    python loadgen.py --duration 60
+    python metrics_report.py --top 20         # 压测后按总耗时列出最慢的 20 个阶段
+    python metrics_report.py --sort p95
+"""
+import argparse
+import re
+from collections import defaultdict
+
+from test import USER_SERVICE, ORDER_SERVICE, PRODUCT_SERVICE, DISPATCHER_SERVICE, get_session
+
+SERVICES = {
+    "UserCenter": USER_SERVICE,
+    "OrderService": ORDER_SERVICE,
+    "ProductService": PRODUCT_SERVICE,
+    "DispatcherService": DISPATCHER_SERVICE,
+}
+
+_SAMPLE = re.compile(r'^(\w+)\{(.*)\}\s+(\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(text):
+    """把 Prometheus 文本解析为 {(kind, name): {"buckets": [(le, 累计数)], "sum", "count", "errors", "slowest"}}"""
+    stages = defaultdict(lambda: {"buckets": [], "sum": 0.0, "count": 0, "errors": 0, "slowest": []})
+    for line in text.splitlines():
+        match = _SAMPLE.match(line.strip())
+        if not match:
+            continue
+        metric, raw_labels, value = match.groups()
+        labels = dict(_LABEL.findall(raw_labels))
+        if "kind" not in labels:
+            continue
+        stage = stages[(labels["kind"], labels["name"])]
+        if metric == "etuan_latency_milliseconds_bucket":
+            stage["buckets"].append((float(labels["le"]), int(float(value))))
+        elif metric == "etuan_latency_milliseconds_sum":
+            stage["sum"] = float(value)
+        elif metric == "etuan_latency_milliseconds_count":
+            stage["count"] = int(float(value))
+        elif metric == "etuan_errors_total":
+            stage["errors"] = int(float(value))
+        elif metric == "etuan_slowest_milliseconds":
+            stage["slowest"].append((float(value), labels["trace_id"]))
+    return dict(stages)
+
+
+def parse_client_pools(text):
+    """把 etuan_client_* 解析为 {target: {"in_flight", "in_flight_max", "pool_limit", "requests_total", "saturated_total"}}"""
+    pools = defaultdict(dict)
+    for line in text.splitlines():
+        match = _SAMPLE.match(line.strip())
+        if not match or not match.group(1).startswith("etuan_client_"):
+            continue
+        metric, raw_labels, value = match.groups()
+        labels = dict(_LABEL.findall(raw_labels))
+        pools[labels["target"]][metric[len("etuan_client_"):]] = int(float(value))
+    return dict(pools)
+
+
+def bucket_quantile(buckets, q):
+    """按直方图桶估计分位数（取所在桶的上界）"""
+    buckets = sorted(buckets)
+    if not buckets or buckets[-1][1] == 0:
+        return 0.0
+    target = q * buckets[-1][1]
+    previous_bound = 0.0
+    for bound, cumulative in buckets:
+        if cumulative >= target:
+            return previous_bound if bound == float("inf") else bound
+        previous_bound = bound
+    return previous_bound
+
+
+def scrape(services=SERVICES):
+    """返回 ([(service, kind, name, stage)], [(service, target, pool)])，无法连接的服务会被跳过并打印提示"""
+    rows, pools = [], []
+    for service, port in services.items():
+        try:
+            response = get_session().get(f"http://localhost:{port}/metrics", timeout=5)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"⚠️ 无法抓取 {service} 的指标：{e}")
+            continue
+        for (kind, name), stage in parse_metrics(response.text).items():
+            rows.append((service, kind, name, stage))
+        for target, pool in sorted(parse_client_pools(response.text).items()):
+            pools.append((service, target, pool))
+    return rows, pools
+
+
+def reset(services=SERVICES):
+    for service, port in services.items():
+        try:
+            get_session().delete(f"http://localhost:{port}/metrics", timeout=5).raise_for_status()
+            print(f"已清空 {service} 的指标")
+        except Exception as e:
+            print(f"⚠️ 无法清空 {service} 的指标：{e}")
+
+
+def report(rows, top=15, sort="total"):
+    sort_keys = {
+        "total": lambda row: row[3]["sum"],
+        "p95": lambda row: bucket_quantile(row[3]["buckets"], 0.95),
+        "max": lambda row: max((millis for millis, _ in row[3]["slowest"]), default=0.0),
+    }
+    rows = sorted((row for row in rows if row[3]["count"] > 0), key=sort_keys[sort], reverse=True)[:top]
+    lines = [f"{'service':<18}{'kind':<7}{'name':<48}{'count':>8}{'total(ms)':>12}{'mean(ms)':>10}"
+             f"{'p95(ms)≤':>10}{'max(ms)':>10}{'err':>6}  slowest traceID"]
+    for service, kind, name, stage in rows:
+        slowest_millis, slowest_trace = max(stage["slowest"], default=(0.0, "-"))
+        lines.append(
+            f"{service:<18}{kind:<7}{name[:47]:<48}{stage['count']:>8}{stage['sum']:>12.1f}"
+            f"{stage['sum'] / stage['count']:>10.2f}{bucket_quantile(stage['buckets'], 0.95):>10.0f}"
+            f"{slowest_millis:>10.1f}{stage['errors']:>6}  {slowest_trace}")
+    return "\n".join(lines)
+
+
+def report_client_pools(pools):
+    lines = [f"{'service':<18}{'target':<20}{'limit':>8}{'inflight':>10}{'peak':>8}{'requests':>10}{'saturated':>11}"]
+    for service, target, pool in pools:
+        if pool.get("requests_total", 0) == 0:
+            continue
+        lines.append(
+            f"{service:<18}{target:<20}{pool.get('pool_limit', 0):>8}{pool.get('in_flight', 0):>10}"
+            f"{pool.get('in_flight_max', 0):>8}{pool.get('requests_total', 0):>10}{pool.get('saturated_total', 0):>11}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="汇总各服务 /metrics 中最慢的阶段")
+    parser.add_argument("--top", type=int, default=15, help="打印的阶段数")
+    parser.add_argument("--sort", choices=["total", "p95", "max"], default="total", help="排序依据")
+    parser.add_argument("--reset", action="store_true", help="清空各服务的指标后退出")
+    args = parser.parse_args()
+
+    if args.reset:
+        reset()
+        return
+    rows, pools = scrape()
+    print(report(rows, args.top, args.sort))
+    print()
+    print(report_client_pools(pools))
+
+
+if __name__ == "__main__":
+    main()
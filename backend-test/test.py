@@ -1,6 +1,12 @@
+# 串行运行：pytest test.py
+# 并行运行：pytest -n auto test.py（需要 pytest-xdist，见 requirements.txt；每个 worker 进程使用独立的用户名命名空间）
+import json
+import os
+import uuid
 import pytest
 import requests
-import random
+import threading
+import time
 
 # ----------------------
 # 常量定义
@@ -42,11 +48,44 @@ DEFAULT_CONTACT_NUMBER = "13800000000"
 def gen_url(service: str, call_name: str) -> str:  # 参数名改为 call_name
     return f"http://localhost:{service}/api/{call_name}"
 
+# 调用钩子：压测等模式下挂载，需实现 before_call(call_name)、async_before_call(call_name)
+# 与 after_call(call_name, elapsed, status_code)；status_code 为 None 表示请求未拿到响应（连接失败、超时等）
+CALL_HOOKS = []
+
+# 每个线程复用一个 Session，保持 keep-alive 连接，避免每次调用都重新建连
+_thread_local = threading.local()
+
+def get_session() -> requests.Session:
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        _thread_local.session = session
+    return session
+
+# 会话级 fixture 登录的用户名；重新登录会让 fixture 中缓存的 token 失效，call_api 直接拒绝
+SESSION_USER_NAMES = set()
+
 def call_api(service: str, call_name: str, **args) -> requests.Response:
-    return requests.post(gen_url(service, call_name), json=args, verify=False)
+    assert not (call_name == "UserLogin" and args.get("name") in SESSION_USER_NAMES), \
+        f"{args.get('name')} 是会话级 fixture 的用户，重新登录会让其他用例共享的 token 失效，请改用 register_and_login 新建用户"
+    for hook in CALL_HOOKS:
+        hook.before_call(call_name)
+    start = time.perf_counter()
+    status_code = None
+    try:
+        response = get_session().post(gen_url(service, call_name), json=args, verify=False)
+        status_code = response.status_code
+        return response
+    finally:
+        for hook in CALL_HOOKS:
+            hook.after_call(call_name, time.perf_counter() - start, status_code)
+
+# pytest-xdist 会为每个 worker 设置 PYTEST_XDIST_WORKER（gw0、gw1 ...），串行运行时为 main
+WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER", "main")
 
 def gen_name() -> str:
-    return str(random.randint(0, 10**8))
+    # worker 前缀 + uuid，多进程并行、多次运行之间都不会重名
+    return f"{WORKER_ID}_{uuid.uuid4().hex}"
 
 # ----------------------
 # 测试用例
@@ -145,6 +184,39 @@ def register_user(name=None, user_type=CUSTOMER, password=PASSWORD, contact_numb
         "password": password
     }
 
+def register_and_login(user_type=CUSTOMER, address=""):
+    """
+    注册并登录一个新用户，返回 name、password、token 与 userID。
+    """
+    user = register_user(user_type=user_type, address=address)
+    login_response = call_api(USER_SERVICE, "UserLogin", name=user["name"], password=user["password"])
+    assert login_response.status_code == 200, f"登录失败：{login_response.text}"
+    token = login_response.json()
+    user_info = get_user_info_by_token(token).json()
+    return {**user, "token": token, "userID": user_info["userID"]}
+
+# ----------------------
+# 会话级缓存的已登录用户（每个 xdist worker 各一份）
+# 只用于不会改变用户状态的用例；登录后记入 SESSION_USER_NAMES，之后再对其调用 UserLogin 会直接断言失败
+# ----------------------
+
+def session_user(user_type, address=""):
+    user = register_and_login(user_type=user_type, address=address)
+    SESSION_USER_NAMES.add(user["name"])
+    return user
+
+@pytest.fixture(scope="session")
+def customer_session():
+    return session_user(CUSTOMER)
+
+@pytest.fixture(scope="session")
+def merchant_session():
+    return session_user(MERCHANT, address="上海市南京东路1号")
+
+@pytest.fixture(scope="session")
+def rider_session():
+    return session_user(RIDER)
+
 def test_user_login_success():
     # 1. 注册用户
     user = register_user()
@@ -290,15 +362,9 @@ def test_update_rider_status_success():
     print("✅ 骑手状态更新成功")
 
 
-def test_update_rider_status_invalid_value():
-    # 1. 注册并登录一个骑手
-    rider = register_user(user_type=RIDER)
-    name = rider["name"]
-    password = rider["password"]
-
-    login_response = call_api(USER_SERVICE, "UserLogin", name=name, password=password)
-    assert login_response.status_code == 200
-    token = login_response.json()
+def test_update_rider_status_invalid_value(rider_session):
+    # 1. 使用已登录的骑手
+    token = rider_session["token"]
 
     # 2. 使用非法状态尝试更新
     invalid_status = "未知状态"
@@ -308,15 +374,9 @@ def test_update_rider_status_invalid_value():
     print("✅ 非法状态更新被拒绝")
 
 
-def test_update_rider_status_non_rider_forbidden():
-    # 1. 注册并登录一个顾客
-    customer = register_user(user_type=CUSTOMER)
-    name = customer["name"]
-    password = customer["password"]
-
-    login_response = call_api(USER_SERVICE, "UserLogin", name=name, password=password)
-    assert login_response.status_code == 200
-    token = login_response.json()
+def test_update_rider_status_non_rider_forbidden(customer_session):
+    # 1. 使用已登录的顾客
+    token = customer_session["token"]
 
     # 2. 尝试更新状态（应失败）
     update_response = update_rider_status(token, RIDESTATUS_IDLE)
@@ -324,6 +384,41 @@ def test_update_rider_status_non_rider_forbidden():
 
     print("✅ 非骑手用户无法更新骑手状态")
 
+def update_user_location(token: str, latitude: float, longitude: float):
+    response = call_api(USER_SERVICE, "UpdateUserLocation", userToken=token, latitude=latitude, longitude=longitude)
+    return response
+
+def get_user_locations(user_ids):
+    response = call_api(USER_SERVICE, "GetUserLocations", userIDs=user_ids)
+    return response
+
+def test_update_user_location_success():
+    # 1. 注册并登录骑手
+    rider = register_and_login(user_type=RIDER)
+
+    # 2. 上报两次位置，后一次覆盖前一次
+    assert update_user_location(rider["token"], 31.2304, 121.4737).status_code == 200
+    update_response = update_user_location(rider["token"], 31.2397, 121.4998)
+    assert update_response.status_code == 200, f"更新位置失败：{update_response.text}"
+
+    # 3. 查询位置，未登记位置的用户不返回
+    locations_response = get_user_locations([rider["userID"], "nonexistent_user_id"])
+    assert locations_response.status_code == 200
+    locations = locations_response.json()
+    assert len(locations) == 1
+    assert locations[0]["userID"] == rider["userID"]
+    assert abs(locations[0]["latitude"] - 31.2397) < 1e-6
+    assert abs(locations[0]["longitude"] - 121.4998) < 1e-6
+
+    print("✅ 骑手位置上报与查询成功")
+
+
+def test_update_user_location_out_of_range_should_fail(rider_session):
+    update_response = update_user_location(rider_session["token"], 91.0, 121.4737)
+    assert update_response.status_code != 200
+
+    print("✅ 超出范围的坐标被拒绝")
+
 def get_all_idle_riders():
     response = call_api(USER_SERVICE, "GetAllIdleRiders")
     return response
@@ -442,15 +537,9 @@ def test_merchant_add_product_success():
 
     print("✅ 商家添加商品成功")
 
-def test_merchant_add_product_with_empty_name_should_fail():
-    # 1. 注册并登录商家
-    merchant = register_user(user_type=MERCHANT, address="上海市南京东路1号")
-    name = merchant["name"]
-    password = merchant["password"]
-
-    login_response = call_api(USER_SERVICE, "UserLogin", name=name, password=password)
-    assert login_response.status_code == 200
-    token = login_response.json()
+def test_merchant_add_product_with_empty_name_should_fail(merchant_session):
+    # 1. 使用已登录的商家
+    token = merchant_session["token"]
 
     # 2. 尝试添加商品，名称为空
     response = add_product(token, "", 15.9, "无名称的商品")
@@ -461,15 +550,9 @@ def test_merchant_add_product_with_empty_name_should_fail():
     print("✅ 空名称添加商品失败（预期行为）")
 
 
-def test_merchant_add_product_with_negative_price_should_fail():
-    # 1. 登录商家
-    merchant = register_user(user_type=MERCHANT, address="上海市南京东路1号")
-    name = merchant["name"]
-    password = merchant["password"]
-
-    login_response = call_api(USER_SERVICE, "UserLogin", name=name, password=password)
-    assert login_response.status_code == 200
-    token = login_response.json()
+def test_merchant_add_product_with_negative_price_should_fail(merchant_session):
+    # 1. 使用已登录的商家
+    token = merchant_session["token"]
 
     # 2. 尝试添加商品，价格为负数
     response = add_product(token, "招牌奶茶", -1, "价格非法")
@@ -779,16 +862,9 @@ def test_merchant_remove_product_success():
     print("✅ 商家成功删除商品")
 
 
-def test_merchant_remove_nonexistent_product():
-    # 1. 注册一个商家
-    merchant = register_user(user_type=MERCHANT, address="上海市南京东路1号")
-    name = merchant["name"]
-    password = merchant["password"]
-
-    # 2. 登录获取 token
-    login_response = call_api(USER_SERVICE, "UserLogin", name=name, password=password)
-    assert login_response.status_code == 200
-    token = login_response.json()
+def test_merchant_remove_nonexistent_product(merchant_session):
+    # 1~2. 使用已登录的商家
+    token = merchant_session["token"]
 
     # 3. 尝试删除一个不存在的商品
     nonexistent_name = "不存在的商品"
@@ -800,16 +876,9 @@ def test_merchant_remove_nonexistent_product():
     print("✅ 删除不存在的商品返回 ProductNotFound")
 
 
-def test_remove_product_by_non_merchant_forbidden():
-    # 1. 注册一个顾客
-    customer = register_user(user_type=CUSTOMER)
-    name = customer["name"]
-    password = customer["password"]
-
-    # 2. 登录获取 token
-    login_response = call_api(USER_SERVICE, "UserLogin", name=name, password=password)
-    assert login_response.status_code == 200
-    token = login_response.json()
+def test_remove_product_by_non_merchant_forbidden(customer_session):
+    # 1~2. 使用已登录的顾客
+    token = customer_session["token"]
 
     # 3. 尝试删除商品（应失败）
     remove_response = remove_product(token, "招牌奶茶")
@@ -894,26 +963,10 @@ def test_create_order_success():
 
     print("✅ 顾客成功创建订单")
 
-def test_create_order_with_empty_product_list_should_fail():
-    # 1. 注册并登录顾客
-    customer = register_user(user_type=CUSTOMER)
-    name = customer["name"]
-    password = customer["password"]
-    login_response = call_api(USER_SERVICE, "UserLogin", name=name, password=password)
-    assert login_response.status_code == 200
-    customer_token = login_response.json()
-
-    # 2. 注册并登录商家
-    merchant = register_user(user_type=MERCHANT, address="上海市南京东路1号")
-    merchant_name = merchant["name"]
-    merchant_password = merchant["password"]
-    merchant_login_response = call_api(USER_SERVICE, "UserLogin", name=merchant_name, password=merchant_password)
-    assert merchant_login_response.status_code == 200
-    merchant_token = merchant_login_response.json()
-
-    # 获取商家ID
-    merchant_info = get_user_info_by_token(merchant_token).json()
-    merchant_id = merchant_info["userID"]
+def test_create_order_with_empty_product_list_should_fail(customer_session, merchant_session):
+    # 1~2. 使用已登录的顾客和商家
+    customer_token = customer_session["token"]
+    merchant_id = merchant_session["userID"]
 
     # 3. 商品列表为空
     product_list = []
@@ -925,14 +978,9 @@ def test_create_order_with_empty_product_list_should_fail():
 
     print("✅ 商品列表为空时创建订单失败（预期行为）")
 
-def test_create_order_with_nonexistent_merchant_id_should_fail():
-    # 1. 注册并登录顾客
-    customer = register_user(user_type=CUSTOMER)
-    name = customer["name"]
-    password = customer["password"]
-    login_response = call_api(USER_SERVICE, "UserLogin", name=name, password=password)
-    assert login_response.status_code == 200
-    customer_token = login_response.json()
+def test_create_order_with_nonexistent_merchant_id_should_fail(customer_session):
+    # 1. 使用已登录的顾客
+    customer_token = customer_session["token"]
 
     # 2. 使用一个不存在的商家ID
     nonexistent_merchant_id = "nonexistent_merchant_id_123"
@@ -947,26 +995,41 @@ def test_create_order_with_nonexistent_merchant_id_should_fail():
 
     print("✅ 使用不存在的商家ID创建订单失败（预期行为）")
 
-def test_create_order_by_non_customer_should_fail():
-    # 1. 注册并登录骑手
-    rider = register_user(user_type=RIDER)
-    name = rider["name"]
-    password = rider["password"]
-    login_response = call_api(USER_SERVICE, "UserLogin", name=name, password=password)
-    assert login_response.status_code == 200
-    rider_token = login_response.json()
+def test_create_order_uses_stored_product_price(customer_session):
+    merchant = register_and_login(MERCHANT, address="上海市南京东路1号")
+    add_product(merchant["token"], "招牌奶茶", 15.9, "每日现做")
+    product = fetch_products_by_merchant_id(merchant["userID"]).json()[0]
 
-    # 2. 注册并登录商家
-    merchant = register_user(user_type=MERCHANT, address="上海市南京东路1号")
-    merchant_name = merchant["name"]
-    merchant_password = merchant["password"]
-    merchant_login_response = call_api(USER_SERVICE, "UserLogin", name=merchant_name, password=merchant_password)
-    assert merchant_login_response.status_code == 200
-    merchant_token = merchant_login_response.json()
+    # 客户端篡改价格和名称，服务端应按商品库中的信息下单
+    tampered = {**product, "price": 0.01, "name": "免费奶茶"}
+    order_response = create_order(customer_session["token"], merchant["userID"], [tampered], "上海市人民广场B座")
+    assert order_response.status_code == 200
 
-    # 获取商家ID
-    merchant_info = get_user_info_by_token(merchant_token).json()
-    merchant_id = merchant_info["userID"]
+    stored = get_order_details(order_response.json()).json()["productList"][0]
+    assert abs(stored["price"] - 15.9) < 1e-6
+    assert stored["name"] == "招牌奶茶"
+
+    print("✅ 下单按商品库中的价格重新定价")
+
+def test_create_order_with_other_merchants_product_should_fail(customer_session):
+    merchant = register_and_login(MERCHANT, address="上海市南京东路1号")
+    other_merchant = register_and_login(MERCHANT, address="上海市南京东路2号")
+    add_product(other_merchant["token"], "招牌奶茶", 15.9, "每日现做")
+    other_product = fetch_products_by_merchant_id(other_merchant["userID"]).json()[0]
+
+    order_response = create_order(customer_session["token"], merchant["userID"], [other_product], "上海市人民广场B座")
+    assert order_response.status_code == 400
+
+    unknown_product = {**other_product, "productID": "nonexistent_product_id"}
+    order_response = create_order(customer_session["token"], other_merchant["userID"], [unknown_product], "上海市人民广场B座")
+    assert order_response.status_code == 400
+
+    print("✅ 订单中包含不属于该商家或不存在的商品时下单失败（预期行为）")
+
+def test_create_order_by_non_customer_should_fail(rider_session, merchant_session):
+    # 1~2. 使用已登录的骑手和商家
+    rider_token = rider_session["token"]
+    merchant_id = merchant_session["userID"]
 
     # 3. 构造商品列表
     product_list = []
@@ -1065,6 +1128,28 @@ def test_get_order_details_success():
 
     print("✅ 顾客成功获取订单详情，字段验证通过")
 
+def test_order_items_keep_order():
+    customer = register_and_login(CUSTOMER)
+    merchant = register_and_login(MERCHANT, address="上海市南京东路1号")
+    customer_token, merchant_token, merchant_id = customer["token"], merchant["token"], merchant["userID"]
+
+    add_product(merchant_token, "招牌奶茶", 15.9, "每日现做")
+    add_product(merchant_token, "芝士蛋糕", 22.5, "当日现烤")
+    products = {p["name"]: p for p in fetch_products_by_merchant_id(merchant_id).json()}
+    # 同一商品出现两次也要按下单顺序原样保存
+    product_list = [products["芝士蛋糕"], products["招牌奶茶"], products["芝士蛋糕"]]
+
+    order_id = create_order(customer_token, merchant_id, product_list, "上海市人民广场B座").json()
+
+    details = get_order_details(order_id).json()
+    assert [p["productID"] for p in details["productList"]] == [p["productID"] for p in product_list]
+    assert [p["description"] for p in details["productList"]] == [p["description"] for p in product_list]
+
+    orders = call_api(ORDER_SERVICE, "QueryOrdersByUser", userToken=customer_token).json()
+    assert [p["name"] for p in orders[0]["productList"]] == ["芝士蛋糕", "招牌奶茶", "芝士蛋糕"]
+
+    print("✅ 订单商品明细按下单顺序保存，详情与列表一致")
+
 def test_get_order_details_with_invalid_order_id_should_fail():
     invalid_order_id = "invalid_order_id_123"
     response = get_order_details(invalid_order_id)
@@ -1224,4 +1309,183 @@ def test_query_orders_by_user_with_invalid_token():
     assert response.status_code != 200 or response.json() == "Unauthorized", \
         "Expected unauthorized response for invalid token"
 
-    print("✅ 使用无效token查询订单返回错误")
\ No newline at end of file
+    print("✅ 使用无效token查询订单返回错误")
+
+def query_orders_by_user_page(token: str, **filters):
+    """
+    调用 QueryOrdersByUserPage 接口，filters 可包含 pageSize、cursor、orderStatus、startTime、endTime（毫秒时间戳）
+    """
+    return call_api(ORDER_SERVICE, "QueryOrdersByUserPage", userToken=token, **filters)
+
+def create_orders_for_new_customer(order_count: int):
+    """
+    注册新的顾客与商家，商家上架一个商品，顾客下 order_count 个订单，返回顾客会话与订单ID列表。
+    """
+    customer = register_and_login(user_type=CUSTOMER)
+    merchant = register_and_login(user_type=MERCHANT, address="上海市南京东路1号")
+    add_product(merchant["token"], "招牌奶茶", 15.9, "每日现做")
+    product_info = fetch_products_by_merchant_id(merchant["userID"]).json()[0]
+    product_list = [{
+        "productID": product_info["productID"],
+        "merchantID": product_info["merchantID"],
+        "name": product_info["name"],
+        "price": product_info["price"],
+        "description": product_info["description"]
+    }]
+
+    order_ids = []
+    for _ in range(order_count):
+        order_response = create_order(customer["token"], merchant["userID"], product_list, "上海市人民广场B座")
+        assert order_response.status_code == 200
+        order_ids.append(order_response.json())
+    return customer, order_ids
+
+def test_query_orders_by_user_page_walks_all_orders():
+    customer, order_ids = create_orders_for_new_customer(5)
+
+    # 每页 2 个，按游标翻页直到 nextCursor 为空
+    seen = []
+    cursor = None
+    for _ in range(10):
+        filters = {"pageSize": 2} if cursor is None else {"pageSize": 2, "cursor": cursor}
+        response = query_orders_by_user_page(customer["token"], **filters)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["orders"]) <= 2
+        seen.extend(page["orders"])
+        cursor = page.get("nextCursor")
+        if cursor is None:
+            break
+
+    seen_ids = [order["orderID"] for order in seen]
+    assert sorted(seen_ids) == sorted(order_ids), "翻页结果应恰好覆盖全部订单且不重复"
+    order_times = [order["orderTime"] for order in seen]
+    assert order_times == sorted(order_times, reverse=True), "订单应按下单时间倒序返回"
+    for order in seen:
+        assert order["customerID"] == customer["userID"]
+        assert order["productList"][0]["name"] == "招牌奶茶"
+
+    # 旧的不分页接口仍返回全部订单
+    legacy_response = call_api(ORDER_SERVICE, "QueryOrdersByUser", userToken=customer["token"])
+    assert legacy_response.status_code == 200
+    assert len(legacy_response.json()) == len(order_ids)
+
+    print("✅ 分页查询按游标遍历全部订单")
+
+def test_query_orders_by_user_page_filters():
+    customer, order_ids = create_orders_for_new_customer(3)
+
+    # 按状态筛选：新订单都处于等待出餐
+    waiting = query_orders_by_user_page(customer["token"], orderStatus="等待出餐").json()
+    assert len(waiting["orders"]) == len(order_ids)
+    assert waiting.get("nextCursor") is None
+    delivering = query_orders_by_user_page(customer["token"], orderStatus="正在配送").json()
+    assert delivering["orders"] == []
+
+    # 按时间范围筛选：区间 [最早下单时间, 最晚下单时间] 之外没有订单
+    order_times = sorted(order["orderTime"] for order in waiting["orders"])
+    in_range = query_orders_by_user_page(customer["token"], startTime=order_times[0], endTime=order_times[-1] + 1).json()
+    assert len(in_range["orders"]) == len(order_ids)
+    before = query_orders_by_user_page(customer["token"], endTime=order_times[0]).json()
+    assert before["orders"] == []
+
+    print("✅ 分页查询的状态与时间范围筛选生效")
+
+def test_query_orders_by_user_page_invalid_arguments_should_fail(customer_session):
+    token = customer_session["token"]
+    assert query_orders_by_user_page(token, pageSize=0).status_code == 400
+    assert query_orders_by_user_page(token, pageSize=1000).status_code == 400
+    assert query_orders_by_user_page(token, cursor="not-a-cursor").status_code == 400
+    assert query_orders_by_user_page(token, startTime=2000, endTime=1000).status_code == 400
+
+    print("✅ 非法分页参数被拒绝")
+
+def test_dispatch_scheduler_stats():
+    response = get_session().get(f"http://localhost:{DISPATCHER_SERVICE}/dispatch/stats")
+    assert response.status_code == 200
+    stats = response.json()
+    for key in ("cycles", "ordersAssigned", "lastCycleMillis", "intervalMillis", "backlog", "idleRiders", "oldestPendingAgeMillis"):
+        assert key in stats
+    assert 0 < stats["intervalMillis"] <= 10000
+    assert stats["cycles"] >= stats["cycleErrors"]
+
+    print("✅ 调度器统计接口返回周期、积压与间隔信息")
+
+def test_client_pool_metrics():
+    from metrics_report import parse_client_pools
+
+    response = get_session().get(f"http://localhost:{ORDER_SERVICE}/metrics")
+    assert response.status_code == 200
+    pools = parse_client_pools(response.text)
+    # 订单服务访问 db-manager 与商品服务，各有独立的连接池
+    for target in ("db-manager", "productservice"):
+        assert target in pools
+        assert pools[target]["pool_limit"] > 0
+        assert pools[target]["in_flight"] <= pools[target]["in_flight_max"]
+    assert pools["db-manager"]["requests_total"] > 0
+
+    print("✅ /metrics 按目标服务导出连接池占用")
+
+def read_order_events(response, count):
+    """从 SSE 响应中读取 count 个订单事件（跳过心跳等注释行）"""
+    events = []
+    for line in response.iter_lines(decode_unicode=True):
+        if line and line.startswith("data:"):
+            events.append(json.loads(line[len("data:"):].strip()))
+            if len(events) == count:
+                break
+    return events
+
+def test_order_stream_pushes_order_events():
+    customer = register_and_login(CUSTOMER)
+    merchant = register_and_login(MERCHANT, address="上海市南京东路1号")
+    add_product(merchant["token"], "招牌奶茶", 15.9, "每日现做")
+    product = fetch_products_by_merchant_id(merchant["userID"]).json()[0]
+
+    stream_url = f"http://localhost:{ORDER_SERVICE}/stream/orders"
+    with requests.get(stream_url, params={"userToken": customer["token"]}, stream=True, timeout=10) as customer_stream, \
+            requests.get(stream_url, params={"userToken": merchant["token"]}, stream=True, timeout=10) as merchant_stream:
+        assert customer_stream.status_code == 200
+        assert customer_stream.headers["Content-Type"].startswith("text/event-stream")
+
+        order_id = create_order(customer["token"], merchant["userID"], [product], "上海市人民广场B座").json()
+        call_api(ORDER_SERVICE, "UpdateOrderStatus", orderID=order_id, newStatus="等待分配骑手")
+
+        for stream in (customer_stream, merchant_stream):
+            created, updated = read_order_events(stream, 2)
+            assert created["orderID"] == updated["orderID"] == order_id
+            assert created["customerID"] == customer["userID"]
+            assert updated["orderStatus"] == "等待分配骑手"
+
+    assert requests.get(stream_url, params={"userToken": "invalid-token"}, timeout=10).status_code == 400
+
+    print("✅ 订单创建与状态变更实时推送给顾客和商家")
+
+def test_product_catalog_etag_and_invalidation():
+    merchant = register_and_login(MERCHANT, address="上海市南京东路1号")
+    token, merchant_id = merchant["token"], merchant["userID"]
+    add_product(token, "招牌奶茶", 15.9, "每日现做")
+
+    url = gen_url(PRODUCT_SERVICE, "FetchProductsByMerchantIDMessage")
+    first = get_session().post(url, json={"merchantID": merchant_id})
+    assert first.status_code == 200 and "ETag" in first.headers
+    etag = first.headers["ETag"]
+
+    # 菜单未变化时带上 ETag 重新验证，返回 304 且没有响应体
+    revalidated = get_session().post(url, json={"merchantID": merchant_id}, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304 and revalidated.content == b""
+
+    # 上新后缓存失效，旧 ETag 不再命中，新菜单立即可见，名称搜索也走新菜单
+    add_product(token, "芝士奶盖", 18.0, "当日现做")
+    changed = get_session().post(url, json={"merchantID": merchant_id}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert {p["name"] for p in changed.json()} == {"招牌奶茶", "芝士奶盖"}
+    assert [p["name"] for p in fetch_product_by_name_and_merchant_id(merchant_id, "奶盖").json()] == ["芝士奶盖"]
+    assert len(fetch_product_by_name_and_merchant_id(merchant_id, "奶").json()) == 2
+
+    # 下架后同样立即生效
+    assert remove_product(token, "芝士奶盖").json() == "Success"
+    assert fetch_product_by_name_and_merchant_id(merchant_id, "奶盖").json() is None
+    assert [p["name"] for p in fetch_products_by_merchant_id(merchant_id).json()] == ["招牌奶茶"]
+
+    print("✅ 菜单缓存支持 ETag 重新验证，上新与下架后立即失效")
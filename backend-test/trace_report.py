@@ -0,0 +1,152 @@
+"""
+读取各服务导出的 span（server_config.json 中 spanExportPath 指定的目录，默认 ../spans），
+span 导出默认关闭，分析前先在各服务的 server_config.json 中加上 "spanExportPath": "../spans" 并重启服务；
+还原指定调用链的调用树，并计算关键路径：从入口 span 开始，逐层找出真正阻塞父 span 结束的子 span，
+按"自身耗时"（扣除关键路径上子 span 后剩余的时间）定位造成尾延迟的那一跳。
+
+用法示例：
+    python trace_report.py --list 10                  # 列出最慢的 10 条调用链
+    python trace_report.py --list 10 --name CreateOrder
+    python trace_report.py --trace <traceID>          # 打印调用树与关键路径
+    python trace_report.py --slowest CreateOrder      # 直接分析最慢的一次 CreateOrder
+"""
+import argparse
+import glob
+import json
+import os
+from collections import defaultdict
+
+DEFAULT_SPAN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "spans")
+
+# 子 span 与父 span 的时间在不同服务中测得，允许少量误差
+CLOCK_TOLERANCE_MICROS = 1000
+
+
+def load_spans(span_dir):
+    """返回 {traceID: [span, ...]}"""
+    traces = defaultdict(list)
+    for path in glob.glob(os.path.join(span_dir, "*.jsonl")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    span = json.loads(line)
+                    span["endMicros"] = span["startMicros"] + span["durationMicros"]
+                    traces[span["traceID"]].append(span)
+    return traces
+
+
+def build_tree(spans):
+    """返回 (根 span 列表, {spanID: [子 span]})，父 span 缺失的 span 也视为根"""
+    by_id = {span["spanID"]: span for span in spans}
+    children = defaultdict(list)
+    roots = []
+    for span in spans:
+        parent = span.get("parentSpanID")
+        if parent in by_id:
+            children[parent].append(span)
+        else:
+            roots.append(span)
+    for items in children.values():
+        items.sort(key=lambda s: s["startMicros"])
+    roots.sort(key=lambda s: s["startMicros"])
+    return roots, children
+
+
+def critical_path(span, children):
+    """
+    返回关键路径 [(span, 自身耗时微秒)]。
+    从父 span 的结束时刻往前，每次选结束得最晚、且在当前时刻之前结束的子 span，
+    之后把时刻移到该子 span 的开始，直到没有子 span；异步（在父 span 结束后才结束）的子 span 不阻塞父 span。
+    """
+    cursor = span["endMicros"] + CLOCK_TOLERANCE_MICROS
+    blocking = []
+    for child in sorted(children.get(span["spanID"], []), key=lambda s: s["endMicros"], reverse=True):
+        if child["endMicros"] <= cursor and child["startMicros"] >= span["startMicros"] - CLOCK_TOLERANCE_MICROS:
+            blocking.append(child)
+            cursor = child["startMicros"]
+    blocking.reverse()
+    self_micros = max(0, span["durationMicros"] - sum(child["durationMicros"] for child in blocking))
+    path = [(span, self_micros)]
+    for child in blocking:
+        path.extend(critical_path(child, children))
+    return path
+
+
+def describe(span):
+    error = f"  ❌ {span['error']}" if span.get("error") else ""
+    return f"[{span['service']}] {span['kind']}:{span['name']}{error}"
+
+
+def print_tree(span, children, trace_start, depth=0):
+    offset = (span["startMicros"] - trace_start) / 1000
+    print(f"{offset:>9.2f}ms {span['durationMicros'] / 1000:>9.2f}ms  {'  ' * depth}{describe(span)}")
+    for child in children.get(span["spanID"], []):
+        print_tree(child, children, trace_start, depth + 1)
+
+
+def report_trace(trace_id, spans):
+    roots, children = build_tree(spans)
+    trace_start = min(span["startMicros"] for span in spans)
+    print(f"调用链 {trace_id}，共 {len(spans)} 个 span")
+    print(f"{'开始':>11} {'耗时':>10}")
+    for root in roots:
+        print_tree(root, children, trace_start)
+
+    root = max(roots, key=lambda s: s["durationMicros"])
+    path = critical_path(root, children)
+    total = root["durationMicros"] or 1
+    print(f"\n关键路径（入口 {describe(root)}，{root['durationMicros'] / 1000:.2f}ms）：")
+    print(f"{'耗时(ms)':>10}{'自身(ms)':>10}{'自身占比':>9}  span")
+    for span, self_micros in path:
+        print(f"{span['durationMicros'] / 1000:>10.2f}{self_micros / 1000:>10.2f}{self_micros / total:>9.1%}  {describe(span)}")
+    culprit, culprit_micros = max(path, key=lambda item: item[1])
+    print(f"\n自身耗时最多的一跳：{describe(culprit)}，{culprit_micros / 1000:.2f}ms（localTraceID={culprit['localTraceID']}）")
+
+
+def root_span(spans):
+    roots, _ = build_tree(spans)
+    return max(roots, key=lambda s: s["durationMicros"])
+
+
+def slowest_traces(traces, name=None, limit=10):
+    candidates = []
+    for trace_id, spans in traces.items():
+        root = root_span(spans)
+        if name is None or root["name"] == name:
+            candidates.append((root["durationMicros"], trace_id, root))
+    candidates.sort(reverse=True)
+    return candidates[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="还原调用链并分析关键路径")
+    parser.add_argument("--dir", default=DEFAULT_SPAN_DIR, help="span 目录（各服务的 spanExportPath）")
+    parser.add_argument("--trace", help="要分析的 traceID")
+    parser.add_argument("--slowest", metavar="NAME", help="分析入口名为 NAME 的最慢调用链")
+    parser.add_argument("--list", type=int, default=0, help="列出最慢的 N 条调用链")
+    parser.add_argument("--name", help="配合 --list，只列出入口名为 NAME 的调用链")
+    args = parser.parse_args()
+
+    traces = load_spans(args.dir)
+    if not traces:
+        parser.error(f"{args.dir} 中没有 span，请确认各服务配置了 spanExportPath")
+
+    if args.list:
+        for duration, trace_id, root in slowest_traces(traces, args.name, args.list):
+            print(f"{duration / 1000:>10.2f}ms  {trace_id}  {describe(root)}")
+    elif args.trace:
+        if args.trace not in traces:
+            parser.error(f"找不到调用链 {args.trace}")
+        report_trace(args.trace, traces[args.trace])
+    elif args.slowest:
+        found = slowest_traces(traces, args.slowest, 1)
+        if not found:
+            parser.error(f"没有入口名为 {args.slowest} 的调用链")
+        report_trace(found[0][1], traces[found[0][1]])
+    else:
+        parser.error("需要指定 --trace、--slowest 或 --list 之一")
+
+
+if __name__ == "__main__":
+    main()